@@ -19,6 +19,8 @@ from __future__ import unicode_literals
 import sys
 import os
 import re
+import stat
+import tempfile
 import threading
 import shutil
 
@@ -35,6 +37,11 @@ else:
 # Lock to protect the file's writing operation
 file_store_content_lock = threading.Lock()
 
+# Permissions of the new files, the temporary files are private
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+NEW_FILE_MODE = 0o666 & ~_UMASK
+
 
 class NinjaIOException(Exception):
     """
@@ -215,6 +222,39 @@ def store_file_content(fileName, content, addExtension=True, newFile=False):
     return os.path.abspath(fileName)
 
 
+def write_atomic(path, data, sync=True):
+    """Write data (bytes) to path through a temporary file in the same
+    folder renamed over it, so path is never left half written. The file
+    keeps its permissions, with sync the data is on disk before the
+    rename."""
+    # Replace the file a link points to, not the link
+    path = os.path.realpath(path)
+    folder, name = os.path.split(path)
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        mode = NEW_FILE_MODE
+    fd, temp_path = tempfile.mkstemp(
+        prefix='.{}.'.format(name), suffix='.nsp', dir=folder)
+    try:
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+            if sync:
+                os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
 def open_project(path):
     """Return a dict structure containing the info inside a folder."""
     return open_project_with_extensions(settings.SUPPORTED_EXTENSIONS)
@@ -14,9 +14,13 @@
 #
 # You should have received a copy of the GNU General Public License
 # along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>. #
+import collections
 import os
-from PyQt4.QtCore import QObject
-from PyQt4.QtCore import SIGNAL, QThread
+import threading
+
+from PyQt5.QtCore import QObject
+from PyQt5.QtCore import QThread
+from PyQt5.QtCore import pyqtSignal
 
 from ninja_ide.tools.logger import NinjaLogger
 logger = NinjaLogger('ninja_ide.core.file_handling.filesystem_notifications.Watcher')
@@ -28,6 +32,11 @@ DELETED = 3
 RENAME = 4
 REMOVE = 5
 
+# Polling interval (ms) after a change, it doubles up to the maximum
+# while the files do not change
+MIN_POLL_INTERVAL = 500
+MAX_POLL_INTERVAL = 4000
+
 
 def do_stat(file_path):
     status = None
@@ -38,47 +47,73 @@ def do_stat(file_path):
     return status
 
 
+def _token(status):
+    """What tells a version of a file from another one, None if the file
+    does not exist."""
+    if status is None:
+        return None
+    return status.st_mtime_ns, status.st_size, status.st_ino
+
+
 class SingleFileWatcher(QThread):
+    """Poll the watched files, used where the files can not be watched
+    by the system."""
+
     def __init__(self, callback):
         self._watches = dict()
         self._do_run = True
         self._emit_call = callback
+        self._interval = MIN_POLL_INTERVAL
+        self._wake = threading.Event()
         super(SingleFileWatcher, self).__init__()
 
     def stop_running(self):
         self._do_run = False
+        self._wake.set()
 
-    def add_watch(self, file_to_watch):
+    def add_watch(self, file_to_watch, report_missing=True):
+        if file_to_watch in self._watches:
+            return
         status = do_stat(file_to_watch)
-        #only add if the file still exists
-        if (file_to_watch not in self._watches) and status:
-            self._watches[file_to_watch] = do_stat(file_to_watch)
-        elif not status:
+        # A missing file is still watched, to notice when it comes back
+        self._watches[file_to_watch] = _token(status)
+        if not status and report_missing:
             self._emit_call(DELETED, file_to_watch)
+        # Poll often again, the new file is likely to change
+        self._interval = MIN_POLL_INTERVAL
 
     def is_empty(self):
         return len(self._watches) == 0
 
     def del_watch(self, file_to_unwatch):
-        if file_to_unwatch in self._watches:
-            self._watches.pop(file_to_unwatch)
+        self._watches.pop(file_to_unwatch, None)
 
     def tick(self):
-        keys = list(self._watches.keys())
-        for each_file in keys:
-            status = do_stat(each_file)
-            if not status:
+        """Report the changes since the last tick, return True if there
+        were some."""
+        changed = False
+        for each_file, token in list(self._watches.items()):
+            current = _token(do_stat(each_file))
+            if current == token or each_file not in self._watches:
+                continue
+            self._watches[each_file] = current
+            changed = True
+            if current is None:
                 self._emit_call(DELETED, each_file)
-                self.del_watch(each_file)
-            if status.st_mtime > self._watches[each_file].st_mtime:
+            elif token is None:
+                self._emit_call(ADDED, each_file)
+            else:
                 self._emit_call(MODIFIED, each_file)
-                self._watches[each_file] = status
+        return changed
 
     def run(self):
         while self._do_run:
-            self.tick()
-            QThread.msleep(1000)
-        self.deleteLater()
+            if self.tick():
+                self._interval = MIN_POLL_INTERVAL
+            else:
+                self._interval = min(self._interval * 2, MAX_POLL_INTERVAL)
+            self._wake.wait(self._interval / 1000)
+            self._wake.clear()
 
 
 class BaseWatcher(QObject):
@@ -89,36 +124,52 @@ class BaseWatcher(QObject):
 # fileChanged(int, QString)  [added, deleted, modified, rename, remove]
 ###############################################################################
 
+    fileChanged = pyqtSignal(int, 'QString')
+
     def __init__(self):
         super(BaseWatcher, self).__init__()
         self._single_file_watcher = None
+        # The same file can be watched by several owners
+        self._file_watches = collections.Counter()
         self.allow_kill = True
 
     def add_file_watch(self, file_path):
+        self._file_watches[file_path] += 1
+        if self._file_watches[file_path] == 1:
+            self._start_file_watch(file_path)
+
+    def remove_file_watch(self, file_path):
+        if file_path not in self._file_watches:
+            return
+        self._file_watches[file_path] -= 1
+        if not self._file_watches[file_path]:
+            del self._file_watches[file_path]
+            self._stop_file_watch(file_path)
+
+    def _start_file_watch(self, file_path, report_missing=True):
+        """Watch file_path, polling it unless the platform does better.
+        A missing file is reported deleted if report_missing."""
         if not self._single_file_watcher:
             self._single_file_watcher = \
                 SingleFileWatcher(self._emit_signal_on_change)
-            self.connect(self._single_file_watcher,
-                SIGNAL("destroyed(QObject*)"), self.on_destroy)
             self._single_file_watcher.start()
-        self._single_file_watcher.add_watch(file_path)
+        self._single_file_watcher.add_watch(file_path, report_missing)
 
-    def remove_file_watch(self, file_path):
+    def _stop_file_watch(self, file_path):
         if self._single_file_watcher:
             self._single_file_watcher.del_watch(file_path)
             if self._single_file_watcher.is_empty() and self.allow_kill:
-                self._single_file_watcher.stop_running()
-                self._single_file_watcher.quit()
+                self._stop_single_file_watcher()
 
-    def on_destroy(self):
+    def _stop_single_file_watcher(self):
+        self._single_file_watcher.stop_running()
         self._single_file_watcher.wait()
         self._single_file_watcher = None
 
     def shutdown_notification(self):
-        if hasattr(self, "_single_file_watcher") and self._single_file_watcher:
-            self._single_file_watcher.stop_running()
-            self._single_file_watcher.quit()
+        if self._single_file_watcher:
+            self._stop_single_file_watcher()
 
     def _emit_signal_on_change(self, event, path):
         DEBUG("About to emit the signal" + repr(event))
-        #self.emit(SIGNAL("fileChanged(int, QString)"), event, path)
+        self.fileChanged.emit(event, path)
@@ -17,11 +17,13 @@
 
 from __future__ import absolute_import
 
+import ctypes
+import ctypes.util
+import errno
 import os
+import struct
 
-from PyQt4.QtCore import QThread
-from pyinotify import ProcessEvent, IN_CREATE, IN_DELETE, IN_DELETE_SELF, \
-                        IN_MODIFY, WatchManager, Notifier, ExcludeFilter
+from PyQt5.QtCore import QSocketNotifier
 
 from ninja_ide.tools.logger import NinjaLogger
 logger = NinjaLogger('ninja_ide.core.file_handling.filesystem_notifications.linux')
@@ -37,103 +39,219 @@ MODIFIED = base_watcher.MODIFIED
 #from ninja_ide.core.file_handling.filesystem_notifications.base_watcher import ADDED, \
 #                                            DELETED, REMOVE, RENAME, MODIFIED
 
-mask = IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MODIFY
+# From <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
 
+# Folders are watched, not files: a file replaced by a rename (as
+# editors save) keeps being watched
+mask = (IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+        IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
 
-class NinjaProcessEvent(ProcessEvent):
+_EVENT = struct.Struct('iIII')
 
-    def __init__(self, process_callback):
-        self._process_callback = process_callback
-        ProcessEvent.__init__(self)
+_libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+# Without inotify this raises AttributeError, and the watcher that polls
+# is used instead (see __init__)
+_inotify_init1 = _libc.inotify_init1
+_inotify_add_watch = _libc.inotify_add_watch
+_inotify_add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+_inotify_rm_watch = _libc.inotify_rm_watch
 
-    def process_IN_CREATE(self, event):
-        self._process_callback((ADDED, event.pathname))
 
-    def process_IN_DELETE(self, event):
-        self._process_callback((DELETED, event.pathname))
+def _event_type(event_mask):
+    if event_mask & (IN_CREATE | IN_MOVED_TO):
+        return ADDED
+    if event_mask & (IN_DELETE | IN_MOVED_FROM):
+        return DELETED
+    return MODIFIED
 
-    def process_IN_DELETE_SELF(self, event):
-        self._process_callback((DELETED, event.pathname))
 
-    def process_IN_MODIFY(self, event):
-        self._process_callback((MODIFIED, event.pathname))
+class NinjaFileSystemWatcher(base_watcher.BaseWatcher):
+    """Watch files and folder trees with one inotify instance, read in
+    the thread of the watcher. Falls back to polling the files if
+    inotify can not be used."""
 
-    def process_IN_MOVED_TO(self, event):
-        self._process_callback((REMOVE, event.pathname))
+    def __init__(self):
+        self.watching_paths = {}
+        super(NinjaFileSystemWatcher, self).__init__()
+        self._ignore_hidden = ('.git', '.hg', '.svn', '.bzr')
+        self._fd = None
+        self._notifier = None
+        # {folder: watch descriptor} and back
+        self._folders = {}
+        self._descriptors = {}
+        # {folder: names of the files watched in it}
+        self._files = {}
+        # {folder: root of the watched tree that has it}
+        self._tree_folders = {}
 
-    def process_IN_MOVED_FROM(self, event):
-        self._process_callback((REMOVE, event.pathname))
+    def _start_inotify(self):
+        """Create the inotify instance if needed, return False if it can
+        not be used."""
+        if self._fd is None:
+            fd = _inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if fd < 0:
+                logger.warning("inotify is not available: {}".format(
+                    os.strerror(ctypes.get_errno())))
+                return False
+            self._fd = fd
+            self._notifier = QSocketNotifier(fd, QSocketNotifier.Read, self)
+            self._notifier.activated.connect(self._read_events)
+        return True
 
-    def process_IN_MOVE_SELF(self, event):
-        self._process_callback((RENAME, event.pathname))
+    def _watch_folder(self, folder):
+        if folder in self._folders:
+            return True
+        if not self._start_inotify():
+            return False
+        descriptor = _inotify_add_watch(
+            self._fd, os.fsencode(folder), mask)
+        if descriptor < 0:
+            DEBUG("Can not watch {}: {}".format(
+                folder, os.strerror(ctypes.get_errno())))
+            return False
+        self._folders[folder] = descriptor
+        self._descriptors[descriptor] = folder
+        return True
 
+    def _unwatch_folder(self, folder):
+        if folder in self._files or folder in self._tree_folders:
+            return
+        descriptor = self._folders.pop(folder, None)
+        if descriptor is not None:
+            self._descriptors.pop(descriptor, None)
+            _inotify_rm_watch(self._fd, descriptor)
 
-class QNotifier(QThread):
-    def __init__(self, wm, processor):
-        self.event_queue = list()
-        self._processor = processor
-        self.notifier = Notifier(wm,
-                            NinjaProcessEvent(self.event_queue.append))
-        self.notifier.coalesce_events(True)
-        self.keep_running = True
-        QThread.__init__(self)
+    def _start_file_watch(self, file_path):
+        folder, name = os.path.split(file_path)
+        if self._watch_folder(folder):
+            self._files.setdefault(folder, set()).add(name)
+        else:
+            # The folder is gone or out of inotify watches
+            base_watcher.BaseWatcher._start_file_watch(self, file_path)
 
-    def run(self):
-        while self.keep_running:
-            try:
-                self.notifier.process_events()
-            except OSError:
-                pass  # OSError: [Errno 2] No such file or directory happens
-            e_dict = {}
-            while len(self.event_queue):
-                e_type, e_path = self.event_queue.pop(0)
-                e_dict.setdefault(e_path, []).append(e_type)
-
-            keys = list(e_dict.keys())
-            while len(keys):
-                key = keys.pop(0)
-                event = e_dict.pop(key)
-                if (ADDED in event) and (DELETED in event):
-                    event = [e for e in event if e not in (ADDED, DELETED)]
-                for each_event in event:
-                    self._processor(each_event, key)
-            if self.notifier.check_events():
-                self.notifier.read_events()
-
-        self.notifier.stop()
+    def _stop_file_watch(self, file_path):
+        folder, name = os.path.split(file_path)
+        names = self._files.get(folder)
+        if names is not None and name in names:
+            names.discard(name)
+            if not names:
+                del self._files[folder]
+                self._unwatch_folder(folder)
+        else:
+            base_watcher.BaseWatcher._stop_file_watch(self, file_path)
 
+    def add_watch(self, path):
+        """Watch the tree of folders under path."""
+        if path in self.watching_paths:
+            return
+        self.watching_paths[path] = path
+        self._watch_tree(path, path)
 
-class NinjaFileSystemWatcher(base_watcher.BaseWatcher):
+    def _watch_tree(self, root, path):
+        for folder, folders, _ in os.walk(path):
+            folders[:] = [name for name in folders
+                          if name not in self._ignore_hidden]
+            if self._watch_folder(folder):
+                self._tree_folders[folder] = root
 
-    def __init__(self):
-        self.watching_paths = {}
-        super(NinjaFileSystemWatcher, self).__init__()
-        self._ignore_hidden = ('.git', '.hg', '.svn', '.bzr')
-
-    def add_watch(self, path):
+    def remove_watch(self, path):
         if path not in self.watching_paths:
+            return
+        del self.watching_paths[path]
+        for folder, root in list(self._tree_folders.items()):
+            if root == path:
+                del self._tree_folders[folder]
+                self._unwatch_folder(folder)
+
+    def _read_events(self):
+        events = []
+        while True:
             try:
-                wm = WatchManager()
-                notifier = QNotifier(wm, self._emit_signal_on_change)
-                notifier.start()
-                exclude = ExcludeFilter([os.path.join(path, folder)
-                    for folder in self._ignore_hidden])
-                wm.add_watch(path, mask, rec=True, auto_add=True,
-                    exclude_filter=exclude)
-                self.watching_paths[path] = notifier
-            except (OSError, IOError):
-                pass
-                #Shit happens, most likely temp file
+                data = os.read(self._fd, 64 * 1024)
+            except OSError as reason:
+                if reason.errno == errno.EINTR:
+                    continue
+                break
+            if not data:
+                break
+            offset = 0
+            while offset < len(data):
+                descriptor, event_mask, _, size = _EVENT.unpack_from(
+                    data, offset)
+                offset += _EVENT.size
+                name = os.fsdecode(
+                    data[offset:offset + size].rstrip(b'\0'))
+                offset += size
+                events.append((descriptor, event_mask, name))
+        # A file is usually written with several events, report it once
+        reported = set()
+        for event in self._process(events):
+            if event not in reported:
+                reported.add(event)
+                self._emit_signal_on_change(*event)
 
-    def remove_watch(self, path):
-        if path in self.watching_paths:
-            notifier = self.watching_paths.pop(path)
-            notifier.keep_running = False
-            notifier.quit()
+    def _process(self, events):
+        """Yield the (event, path) of the inotify events that matter."""
+        for descriptor, event_mask, name in events:
+            if event_mask & IN_Q_OVERFLOW:
+                # Events were lost, let the owners check their files
+                for folder, names in list(self._files.items()):
+                    for each_name in names:
+                        yield MODIFIED, os.path.join(folder, each_name)
+                continue
+            folder = self._descriptors.get(descriptor)
+            if folder is None:
+                continue
+            if event_mask & (IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED):
+                # The folder is gone, and so are its files. They are
+                # polled until they come back
+                for each_name in self._files.pop(folder, ()):
+                    path = os.path.join(folder, each_name)
+                    base_watcher.BaseWatcher._start_file_watch(
+                        self, path, report_missing=False)
+                    # A folder is deleted once it is empty, the deletes
+                    # of its files were reported already
+                    if not event_mask & IN_DELETE_SELF:
+                        yield DELETED, path
+                if not event_mask & IN_IGNORED:
+                    _inotify_rm_watch(self._fd, descriptor)
+                self._descriptors.pop(descriptor, None)
+                self._folders.pop(folder, None)
+                self._tree_folders.pop(folder, None)
+                continue
+            path = os.path.join(folder, name)
+            root = self._tree_folders.get(folder)
+            if root is not None:
+                if name in self._ignore_hidden:
+                    continue
+                if event_mask & IN_ISDIR and event_mask & (
+                        IN_CREATE | IN_MOVED_TO):
+                    self._watch_tree(root, path)
+                yield _event_type(event_mask), path
+            elif name in self._files.get(folder, ()):
+                yield _event_type(event_mask), path
 
     def shutdown_notification(self):
         base_watcher.BaseWatcher.shutdown_notification(self)
-        for each_path in self.watching_paths:
-            notifier = self.watching_paths[each_path]
-            notifier.keep_running = False
-            notifier.quit()
+        if self._fd is not None:
+            self._notifier.setEnabled(False)
+            os.close(self._fd)
+            self._fd = None
+            self._folders.clear()
+            self._descriptors.clear()
+            self._files.clear()
+            self._tree_folders.clear()
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Decide which files of a project are not worth indexing.
+
+Patterns follow the .gitignore syntax: a pattern without a slash
+matches a name at any depth, a pattern with a slash is relative to the
+folder of its .gitignore, a trailing slash only matches folders, '**'
+matches any number of folders and '!' re-includes what an earlier
+pattern excluded. The last matching pattern wins."""
+
+import os
+import re
+
+# Version control metadata, caches, dependencies and build output
+DEFAULT_EXCLUDES = (
+    '.git/',
+    '.hg/',
+    '.svn/',
+    '.bzr/',
+    '__pycache__/',
+    '.tox/',
+    '.mypy_cache/',
+    '.pytest_cache/',
+    'node_modules/',
+    '*.egg-info/',
+    '/build/',
+    '/dist/',
+    '*.py[co]',
+)
+
+GITIGNORE = '.gitignore'
+
+# A folder with this file is a virtualenv
+VIRTUALENV_MARKER = 'pyvenv.cfg'
+
+
+def _translate(pattern):
+    """Return a regular expression for a glob pattern."""
+    parts = []
+    index = 0
+    length = len(pattern)
+    while index < length:
+        char = pattern[index]
+        if pattern.startswith('**/', index):
+            parts.append('(?:.*/)?')
+            index += 3
+            continue
+        if pattern.startswith('**', index):
+            parts.append('.*')
+            index += 2
+            continue
+        if char == '*':
+            parts.append('[^/]*')
+        elif char == '?':
+            parts.append('[^/]')
+        elif char == '[':
+            end = pattern.find(']', index + 1)
+            if end == -1:
+                parts.append(re.escape(char))
+            else:
+                content = pattern[index + 1:end]
+                if content.startswith('!'):
+                    content = '^' + content[1:]
+                parts.append('[{}]'.format(content.replace('\\', '\\\\')))
+                index = end
+        else:
+            parts.append(re.escape(char))
+        index += 1
+    return ''.join(parts)
+
+
+class _Rule(object):
+
+    def __init__(self, base, pattern):
+        self.negate = pattern.startswith('!')
+        if self.negate:
+            pattern = pattern[1:]
+        self.dir_only = pattern.endswith('/')
+        pattern = pattern.rstrip('/')
+        # Patterns with a slash are relative to the base folder
+        self.anchored = '/' in pattern
+        pattern = pattern.lstrip('/')
+        self.base = base
+        self.regex = re.compile(_translate(pattern) + r'\Z')
+
+    def matches(self, relative, name, is_dir):
+        if self.dir_only and not is_dir:
+            return False
+        if self.base:
+            if not relative.startswith(self.base + '/'):
+                return False
+            relative = relative[len(self.base) + 1:]
+        if self.anchored:
+            return self.regex.match(relative) is not None
+        return self.regex.match(name) is not None
+
+
+class IgnoreRules(object):
+    """Ignore patterns of a project folder."""
+
+    def __init__(self, root, patterns=()):
+        self._root = root
+        self._rules = []
+        self.add_patterns('', DEFAULT_EXCLUDES)
+        self.add_patterns('', patterns)
+        self.load_gitignore(root)
+
+    def add_patterns(self, base, patterns):
+        for pattern in patterns:
+            pattern = pattern.strip()
+            if pattern and not pattern.startswith('#'):
+                self._rules.append(_Rule(base, pattern))
+
+    def load_gitignore(self, folder):
+        """Add the patterns of the .gitignore of folder, if any."""
+        try:
+            with open(os.path.join(folder, GITIGNORE)) as f:
+                patterns = f.read().splitlines()
+        except (OSError, UnicodeDecodeError):
+            return
+        base = os.path.relpath(folder, self._root)
+        base = '' if base == os.curdir else base.replace(os.sep, '/')
+        self.add_patterns(base, patterns)
+
+    def is_ignored(self, path, is_dir=False):
+        """Return True if path (absolute or relative to the root) is
+        excluded. The parents of path are not checked."""
+        if os.path.isabs(path):
+            path = os.path.relpath(path, self._root)
+        relative = path.replace(os.sep, '/')
+        name = relative.rpartition('/')[2]
+        if is_dir and os.path.isfile(
+                os.path.join(self._root, path, VIRTUALENV_MARKER)):
+            return True
+        ignored = False
+        for rule in self._rules:
+            if ignored != rule.negate:
+                # Only a rule of the opposite kind can change the result
+                continue
+            if rule.matches(relative, name, is_dir):
+                ignored = not rule.negate
+        return ignored
@@ -15,22 +15,20 @@
 # You should have received a copy of the GNU General Public License
 # along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
 
+import codecs
 import os
 import shutil
 
 from PyQt5.QtCore import QObject
-from PyQt5.QtCore import QFile
-from PyQt5.QtCore import QFileSystemWatcher
-from PyQt5.QtCore import QIODevice
-from PyQt5.QtCore import QTextStream
 from PyQt5.QtCore import pyqtSignal
 
 from ninja_ide import translations
 # FIXME: Obtain these form a getter
 from ninja_ide.core import settings
+from ninja_ide.core.file_handling import filesystem_notifications
 from ninja_ide.tools.utils import SignalFlowControl
 from .file_manager import NinjaIOException, NinjaNoFileNameException, \
-    get_file_encoding, get_basename, get_file_extension
+    get_file_encoding, get_basename, get_file_extension, write_atomic
 
 from ninja_ide.tools.logger import NinjaLogger
 logger = NinjaLogger('ninja_ide.core.file_handling.nfile')
@@ -81,7 +79,11 @@ class NFile(QObject):
         self._file_path = path
         self.__created = False
         self.__watcher = None
-        self.__mtime = None
+        # Path watched for changes, None if not watching
+        self.__watched_path = None
+        # Stat of the file as we last saw it, the change notifications
+        # of our own saves have the same
+        self.__token = None
         super(NFile, self).__init__()
         if not self._exists():
             self.__created = True
@@ -120,21 +122,44 @@ class NFile(QObject):
         return self._file_path
 
     def start_watching(self):
-        """Create a file system watcher and connect its fileChanged
-        SIGNAL to our _file_changed SLOT"""
+        """Connect the fileChanged SIGNAL of the file system watcher
+        shared by the files to our _file_changed SLOT"""
         if self.__watcher is None:
-            self.__watcher = QFileSystemWatcher(self)
-            self.__watcher.fileChanged['const QString&'].connect(
-                self._file_changed)
+            self.__watcher = filesystem_notifications.NinjaFileSystemWatcher
+            self.__watcher.fileChanged[int, 'QString'].connect(
+                self._on_file_event)
         if self._file_path is not None:
-            self.__mtime = os.path.getmtime(self._file_path)
-            self.__watcher.addPath(self._file_path)
+            self.__token = self._stat_token()
+            self._watch(self._file_path)
+
+    def _watch(self, path):
+        """Watch path instead of the path watched before, None to stop
+        watching."""
+        if self.__watcher is None or path == self.__watched_path:
+            return
+        if self.__watched_path is not None:
+            self.__watcher.remove_file_watch(self.__watched_path)
+        self.__watched_path = path
+        if path is not None:
+            self.__watcher.add_file_watch(path)
+
+    def _on_file_event(self, event, path):
+        # The watcher reports the changes of all the watched files
+        if path == self._file_path:
+            self._file_changed(path)
+
+    def _stat_token(self):
+        try:
+            stat = os.stat(self._file_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
 
     def _file_changed(self, path):
         if self._exists():
-            current_mtime = os.path.getmtime(self._file_path)
-            if current_mtime != self.__mtime:
-                self.__mtime = current_mtime
+            current_token = self._stat_token()
+            if current_token != self.__token:
+                self.__token = current_token
                 self.fileChanged.emit()
         # FIXME: for swap file
         # else:
@@ -172,60 +197,47 @@ class NFile(QObject):
 
     def save(self, content, path=None):
         """
-        Write a temporary file with .tnj extension and copy it over the
-        original one.
-        .nsf = Ninja Swap File
+        Encode content with the codec of its coding line (UTF-8 if none)
+        and write it to a temporary .nsp file renamed over the original
+        one, so the file is never left half written.
+        .nsp = Ninja Swap File
         # FIXME: Where to locate addExtension, does not fit here
         """
-        new_path = False
+        old_path = self._file_path
         if path:
             self.attach_to_path(path)
-            new_path = True
 
         save_path = self._file_path
 
         if not save_path:
             raise NinjaNoFileNameException("I am asked to write a "
                                            "file but no one told me where")
-        swap_save_path = "%s.nsp" % save_path
-
-        # If we have a file system watcher, remove the file path
-        # from its watch list until we are done making changes.
-        if self.__watcher is not None:
-            self.__watcher.removePath(save_path)
 
-        flags = QIODevice.WriteOnly | QIODevice.Truncate
-        f = QFile(swap_save_path)
+        try:
+            encoding = codecs.lookup(get_file_encoding(content)).name
+        except LookupError:
+            encoding = 'utf-8'
         if settings.use_platform_specific_eol():
-            flags |= QIODevice.Text
-
-        if not f.open(flags):
-            raise NinjaIOException(f.errorString())
-
-        stream = QTextStream(f)
-        encoding = get_file_encoding(content)
-        if encoding:
-            stream.setCodec(encoding)
-
-        encoded_stream = stream.codec().fromUnicode(content)
-        f.write(encoded_stream)
-        f.flush()
-        f.close()
-        # SIGNAL: Will save (temp, definitive) to warn folder to do something
-        self.willSave.emit(swap_save_path, save_path)
-        self.__mtime = os.path.getmtime(swap_save_path)
-        shutil.move(swap_save_path, save_path)
+            content = content.replace('\n', os.linesep)
+        try:
+            data = content.encode(encoding)
+        except UnicodeEncodeError as reason:
+            raise NinjaIOException(reason)
+
+        # SIGNAL: Will save (previous, definitive) to warn folder to do
+        # something
+        self.willSave.emit(old_path or '', save_path)
+        try:
+            write_atomic(save_path, data, sync=settings.SYNC_ON_SAVE)
+        except OSError as reason:
+            raise NinjaIOException(reason)
+        # The watcher notifies our own save too, it is ignored because
+        # the file is what we just wrote
+        self.__token = self._stat_token()
         self.reset_state()
 
-        # If we have a file system watcher, add the saved path back
-        # to its watch list, otherwise create a watcher and start
-        # watching
         if self.__watcher is not None:
-            if new_path:
-                # self.__watcher.removePath(self.__watcher.files()[0])
-                self.__watcher.addPath(self._file_path)
-            else:
-                self.__watcher.addPath(save_path)
+            self._watch(save_path)
         else:
             self.start_watching()
         return self
@@ -272,11 +284,8 @@ class NFile(QObject):
                                         new_path)
                 if signal_handler.stopped():
                     return
-            if self.__watcher is not None:
-                self.__watcher.removePath(self._file_path)
             shutil.move(self._file_path, new_path)
-            if self.__watcher:
-                self.__watcher.addPath(new_path)
+            self._watch(new_path)
         self._file_path = new_path
 
     def copy(self, new_path):
@@ -312,8 +321,7 @@ class NFile(QObject):
             signal_handler = SignalFlowControl()
             self.willDelete.emit(signal_handler, self)
             if not signal_handler.stopped():
-                if self.__watcher is not None:
-                    self.__watcher.removePath(self._file_path)
+                self._watch(None)
                 os.remove(self._file_path)
 
     def close(self, force_close=False):
@@ -326,5 +334,4 @@ class NFile(QObject):
         self.fileClosing.emit(self._file_path, force_close)
 
     def remove_watcher(self):
-        if self.__watcher is not None:
-            self.__watcher.removePath(self._file_path)
+        self._watch(None)
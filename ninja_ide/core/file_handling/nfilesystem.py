@@ -24,6 +24,7 @@ from PyQt5.QtCore import QDir
 from PyQt5.QtCore import pyqtSignal
 
 from ninja_ide.core.file_handling.nfile import NFile
+from ninja_ide.core.file_handling.project_watcher import ProjectWatcher
 from ninja_ide.tools.logger import NinjaLogger
 
 logger = NinjaLogger('ninja_ide.core.file_handling.nfilesystem')
@@ -33,9 +34,12 @@ class NVirtualFileSystem(QObject):
     # Signals
     projectOpened = pyqtSignal('QString')
     projectClosed = pyqtSignal('QString')
+    # (event, path) using project_watcher ADDED/MODIFIED/DELETED codes
+    projectFileChanged = pyqtSignal(int, 'QString')
 
     def __init__(self, *args, **kwargs):
         self.__tree = {}
+        self.__project_watchers = {}
         self.__watchables = {}
         self.__projects = {}
         # bc maps are cheap but my patience is not
@@ -59,8 +63,15 @@ class NVirtualFileSystem(QObject):
             logger.debug(pext)
             qfsm.setNameFilters(pext)
             self.__projects[project_path] = project
+            watcher = ProjectWatcher(
+                project_path, project.excluded_patterns, self)
+            watcher.fileChanged[int, 'QString'].connect(
+                self.projectFileChanged.emit)
+            # The files of the project are known once it is walked
+            watcher.ready.connect(
+                lambda: self.projectOpened.emit(project_path))
+            self.__project_watchers[project_path] = watcher
             self.__check_files_for(project_path)
-            self.projectOpened.emit(project_path)
         else:
             qfsm = self.__projects[project_path]
         return qfsm
@@ -80,6 +91,10 @@ class NVirtualFileSystem(QObject):
                 if self.__reverse_project_map[nfile] == project_root:
                     del self.__tree[nfile.file_path]
                     nfile.close()
+            watcher = self.__project_watchers.pop(project_path, None)
+            if watcher is not None:
+                watcher.stop()
+                watcher.deleteLater()
             # This might not be needed just being extra cautious
             del self.__projects[project_path].model
             del self.__projects[project_path]
@@ -134,6 +149,25 @@ class NVirtualFileSystem(QObject):
     def get_projects(self):
         return self.__projects
 
+    def get_project_watcher(self, project_path):
+        return self.__project_watchers.get(project_path, None)
+
+    def get_project_files(self, project_path, extensions=None):
+        """Return the paths of the files of the project that are not
+        excluded, only the ones with one of the extensions if given."""
+        watcher = self.__project_watchers.get(project_path, None)
+        if watcher is None:
+            return []
+        return list(watcher.files(extensions))
+
+    def is_ignored(self, path):
+        """Return True if path is excluded from the project that
+        contains it (False if it does not belong to a project)."""
+        for project_path, watcher in self.__project_watchers.items():
+            if path.startswith(project_path + os.sep):
+                return watcher.is_ignored(path)
+        return False
+
     def get_project_for_file(self, filename):
         nfile = self.get_file(filename)
         project = self.__reverse_project_map.get(nfile, None)
@@ -19,19 +19,22 @@ import os
 import hashlib
 
 from PyQt5.QtCore import QObject
-from PyQt5.QtCore import QFile
-from PyQt5.QtCore import QTextStream
-from PyQt5.QtCore import QIODevice
 from PyQt5.QtCore import QTimer
 from PyQt5.QtCore import pyqtSlot
+from PyQt5.QtGui import QTextCursor
 
 from ninja_ide.core import settings
+from ninja_ide.core.file_handling import swap_journal
 from ninja_ide.gui.ide import IDE
 from ninja_ide import resources
 from ninja_ide.tools.logger import NinjaLogger
 
 logger = NinjaLogger(__name__)
 
+# The snapshot is written again when the journal gets bigger than this
+# and than the snapshot
+COMPACT_SIZE = 256 * 1024
+
 # TODO: handle untitled files
 
 
@@ -44,7 +47,10 @@ class NSwapFile(QObject):
     Hot exit is triggered when the IDE is closed.
 
     If the auto-save feature is enabled, Ninja will create backup
-    files periodically.
+    files periodically. The backup is a snapshot of the text plus a
+    journal of the edits made after it (see swap_journal), so autosaving
+    writes the edits and not the whole text. The files are written by
+    the swap_journal.SwapWriter thread.
     """
 
     def __init__(self, neditable):
@@ -53,6 +59,14 @@ class NSwapFile(QObject):
         self.__dirty = False
 
         self.__filename = None
+        self.__writer = swap_journal.writer()
+        # Generation of the snapshot written, 0 if there is not one
+        self.__generation = 0
+        self.__snapshot_size = 0
+        self.__journal_size = 0
+        # Edits not written to the journal yet
+        self.__records = []
+        self.__records_size = 0
 
         self.__timer = QTimer(self)
         self.__timer.setSingleShot(True)
@@ -73,17 +87,30 @@ class NSwapFile(QObject):
 
     @pyqtSlot()
     def _autosave(self):
-        if self._neditable.editor.is_modified:
-            flags = QIODevice.WriteOnly
-            f = QFile(self.filename())
-            if not f.open(flags):
-                raise IOError(f.errorString())
-            content = self._neditable.editor.text
-            stream = QTextStream(f)
-            encoded_stream = stream.codec().fromUnicode(content)
-            f.write(encoded_stream)
-            f.flush()
-            f.close()
+        if not self._neditable.editor.is_modified:
+            # Undone back to the saved text
+            self.__remove()
+            return
+        journal_size = self.__journal_size + self.__records_size
+        if not self.__generation or journal_size > max(
+                COMPACT_SIZE, self.__snapshot_size):
+            self.__write_snapshot()
+        elif self.__records:
+            data = b''.join(self.__records)
+            self.__records = []
+            self.__records_size = 0
+            self.__journal_size += len(data)
+            self.__writer.submit(swap_journal.append, self.filename(), data)
+
+    def __write_snapshot(self):
+        content = self._neditable.editor.text
+        self.__generation += 1
+        self.__snapshot_size = len(content)
+        self.__journal_size = 0
+        self.__records = []
+        self.__records_size = 0
+        self.__writer.submit(swap_journal.write_snapshot, self.filename(),
+                             content, self.__generation)
 
     def filename(self):
         if self.__filename is None:
@@ -104,17 +131,24 @@ class NSwapFile(QObject):
     @pyqtSlot()
     def _on_ide_going_down(self):
         if not self._neditable.new_document:
+            self.__timer.stop()
             self._autosave()
+            self.__writer.flush()
 
     @pyqtSlot()
     def _on_file_saved(self):
         self.__remove()
 
     def __remove(self):
+        self.__timer.stop()
+        self.__generation = 0
+        self.__records = []
+        self.__records_size = 0
         if self.exists():
             logger.debug("Removing backup file...")
-            os.remove(self.filename())
-            self.__dirty = False
+        # After the writes of the file still queued
+        self.__writer.submit(swap_journal.remove, self.filename())
+        self.__dirty = False
 
     @property
     def dirty(self):
@@ -124,15 +158,41 @@ class NSwapFile(QObject):
     def _on_file_loaded(self):
         if self._neditable.new_document:
             return
-        if os.path.exists(self.filename()):
+        # A remove of the file closed before may be queued
+        self.__writer.flush()
+        try:
+            content = swap_journal.read(self.filename())
+        except (OSError, UnicodeError):
+            logger.exception("Could not read the backup file")
+            content = None
+        if content is not None:
             logger.debug("Reloaded...")
             self.__dirty = True
-            with open(self.filename()) as fp:
-                content = fp.read()
             self._neditable.editor.text = content
             self._neditable.document.setModified(True)
+        self._neditable.document.contentsChange.connect(
+            self._on_contents_change)
         self._neditable.editor.textChanged.connect(self._on_text_changed)
 
+    @pyqtSlot(int, int, int)
+    def _on_contents_change(self, position, removed, added):
+        if not self.__generation:
+            # The next autosave writes a snapshot
+            return
+        text = ''
+        if added:
+            document = self._neditable.document
+            cursor = QTextCursor(document)
+            cursor.setPosition(position)
+            # The edits at the end count the last paragraph separator
+            cursor.setPosition(
+                min(position + added, document.characterCount() - 1),
+                QTextCursor.KeepAnchor)
+            text = cursor.selectedText().replace('\u2029', '\n')
+        record = swap_journal.encode_record(position, removed, text)
+        self.__records.append(record)
+        self.__records_size += len(record)
+
     @pyqtSlot()
     def _on_text_changed(self):
         if not self._neditable.editor.is_modified or not settings.AUTOSAVE:
@@ -0,0 +1,296 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+import os
+
+from PyQt5.QtGui import QGuiApplication
+from PyQt5.QtCore import Qt
+from PyQt5.QtCore import QObject
+from PyQt5.QtCore import QFileSystemWatcher
+from PyQt5.QtCore import QThread
+from PyQt5.QtCore import QTimer
+from PyQt5.QtCore import pyqtSignal
+
+from ninja_ide.core.file_handling.ignore_rules import GITIGNORE
+from ninja_ide.core.file_handling.ignore_rules import IgnoreRules
+from ninja_ide.tools.logger import NinjaLogger
+
+logger = NinjaLogger(__name__)
+DEBUG = logger.debug
+
+# Same codes used by filesystem_notifications.base_watcher
+ADDED = 1
+MODIFIED = 2
+DELETED = 3
+
+# Time to wait for a burst of directory events to settle before diffing
+SETTLE_DELAY = 300
+# A file rewritten in place changes no folder, the known files are
+# checked again this often and when the IDE gets the focus back
+RESCAN_INTERVAL = 60 * 1000
+
+
+def _snapshot(folder, rules):
+    """Return {name: (mtime, is_dir)} for the direct children of folder
+    that are not ignored."""
+    entries = {}
+    try:
+        iterator = os.scandir(folder)
+    except OSError:
+        return entries
+    for entry in iterator:
+        try:
+            is_dir = entry.is_dir(follow_symlinks=False)
+            mtime = entry.stat(follow_symlinks=False).st_mtime
+        except OSError:
+            continue
+        if rules.is_ignored(entry.path, is_dir):
+            continue
+        entries[entry.name] = (mtime, is_dir)
+    return entries
+
+
+class _WalkThread(QThread):
+    """Take the snapshots of folders, and of all their subfolders if
+    recursive, out of the GUI thread."""
+
+    def __init__(self, folders, rules, recursive):
+        super(_WalkThread, self).__init__()
+        self._folders = folders
+        self._rules = rules
+        self._recursive = recursive
+        self.snapshots = {}
+
+    def run(self):
+        folders = list(self._folders)
+        while folders and not self.isInterruptionRequested():
+            folder = folders.pop()
+            if (self._recursive and
+                    os.path.isfile(os.path.join(folder, GITIGNORE))):
+                self._rules.load_gitignore(folder)
+            entries = _snapshot(folder, self._rules)
+            self.snapshots[folder] = entries
+            if self._recursive:
+                for name, (_, is_dir) in entries.items():
+                    if is_dir:
+                        folders.append(os.path.join(folder, name))
+
+
+class ProjectWatcher(QObject):
+    """Watch every folder of a project and report file level changes.
+
+    QFileSystemWatcher only tells us that a directory changed, so we keep
+    a cheap snapshot of each folder and diff it once the events settle.
+    The snapshots are the file index of the project: the files excluded
+    by the ignore rules are neither listed nor watched. The folders are
+    walked in a thread, ready is emitted once the whole project is
+    known."""
+
+    fileChanged = pyqtSignal(int, 'QString')
+    ready = pyqtSignal()
+
+    def __init__(self, root_path, excludes=(), parent=None):
+        super(ProjectWatcher, self).__init__(parent)
+        self._root_path = root_path
+        self._rules = IgnoreRules(root_path, excludes)
+        self._snapshots = {}
+        self._pending = set()
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged['const QString&'].connect(
+            self._on_directory_changed)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(SETTLE_DELAY)
+        self._timer.timeout.connect(self._process_pending)
+        self._walks = []
+        self._rescanning = False
+        self._is_ready = False
+        self._rescan_timer = QTimer(self)
+        self._rescan_timer.setInterval(RESCAN_INTERVAL)
+        self._rescan_timer.timeout.connect(self.rescan)
+        application = QGuiApplication.instance()
+        if application is not None:
+            application.applicationStateChanged.connect(
+                self._on_application_state_changed)
+        self._add_tree(root_path)
+
+    @property
+    def root_path(self):
+        return self._root_path
+
+    def is_ready(self):
+        return self._is_ready
+
+    def entries(self, extensions=None):
+        """Iterate over (path, mtime) of the files currently known, only
+        the ones with one of the extensions if given."""
+        if extensions is not None:
+            extensions = tuple(extensions)
+        # Snapshots are replaced, never modified, so this is safe to
+        # call from other threads
+        for folder, entries in list(self._snapshots.items()):
+            for name, (mtime, is_dir) in entries.items():
+                if is_dir:
+                    continue
+                if extensions is None or name.endswith(extensions):
+                    yield os.path.join(folder, name), mtime
+
+    def files(self, extensions=None):
+        """Iterate over the paths of the files currently known."""
+        for path, _ in self.entries(extensions):
+            yield path
+
+    def is_ignored(self, path):
+        """Return True if path or one of its folders is excluded."""
+        relative = os.path.relpath(path, self._root_path)
+        if relative.startswith(os.pardir):
+            return True
+        parts = relative.split(os.sep)
+        for index in range(1, len(parts) + 1):
+            is_dir = index < len(parts)
+            if self._rules.is_ignored(os.sep.join(parts[:index]), is_dir):
+                return True
+        return False
+
+    def rescan(self):
+        """Look for the files modified in place in the background."""
+        if not self._is_ready or self._rescanning:
+            return
+        self._rescanning = True
+        self._walk(list(self._snapshots.keys()), False, self._on_rescanned)
+
+    def stop(self):
+        self._timer.stop()
+        self._rescan_timer.stop()
+        # Snapshots taken for a closed project are of no use
+        for thread in self._walks:
+            thread.requestInterruption()
+        for thread in self._walks:
+            thread.wait()
+        del self._walks[:]
+        folders = self._watcher.directories()
+        if folders:
+            self._watcher.removePaths(folders)
+        self._snapshots.clear()
+        self._pending.clear()
+
+    def _walk(self, folders, recursive, done):
+        thread = _WalkThread(folders, self._rules, recursive)
+        thread.finished.connect(lambda: self._on_walked(thread, done))
+        self._walks.append(thread)
+        thread.start()
+
+    def _on_walked(self, thread, done):
+        if thread not in self._walks:
+            # Stopped meanwhile
+            return
+        self._walks.remove(thread)
+        done(thread.snapshots)
+
+    def _add_tree(self, root):
+        self._walk([root], True,
+                   lambda snapshots: self._on_tree_walked(root, snapshots))
+
+    def _on_tree_walked(self, root, snapshots):
+        if self._is_ready:
+            parent, name = os.path.split(root)
+            entry = self._snapshots.get(parent, {}).get(name)
+            if entry is None or not entry[1]:
+                # Removed while it was walked
+                return
+        folders = [folder for folder in snapshots
+                   if folder not in self._snapshots]
+        if folders:
+            self._watcher.addPaths(folders)
+        for folder in folders:
+            self._snapshots[folder] = snapshots[folder]
+        if not self._is_ready:
+            self._is_ready = True
+            self._rescan_timer.start()
+            self.ready.emit()
+            return
+        # A folder created in the project
+        for folder in folders:
+            for name, (_, is_dir) in snapshots[folder].items():
+                if not is_dir:
+                    self.fileChanged.emit(ADDED, os.path.join(folder, name))
+
+    def _on_rescanned(self, snapshots):
+        self._rescanning = False
+        # Files added or removed meanwhile are reported by the folder
+        # events, only the mtimes are compared
+        for folder, new in snapshots.items():
+            old = self._snapshots.get(folder)
+            if old is None:
+                continue
+            entries = None
+            for name, (mtime, is_dir) in new.items():
+                if is_dir or name not in old or old[name][0] == mtime:
+                    continue
+                if entries is None:
+                    entries = dict(old)
+                entries[name] = (mtime, is_dir)
+                self.fileChanged.emit(MODIFIED, os.path.join(folder, name))
+            if entries is not None:
+                self._snapshots[folder] = entries
+
+    def _on_application_state_changed(self, state):
+        if state == Qt.ApplicationActive:
+            self.rescan()
+
+    def _remove_tree(self, root):
+        prefix = root + os.sep
+        for folder in list(self._snapshots.keys()):
+            if folder == root or folder.startswith(prefix):
+                entries = self._snapshots.pop(folder)
+                self._watcher.removePath(folder)
+                for name, (_, is_dir) in entries.items():
+                    if not is_dir:
+                        self.fileChanged.emit(
+                            DELETED, os.path.join(folder, name))
+
+    def _on_directory_changed(self, folder):
+        self._pending.add(folder)
+        self._timer.start()
+
+    def _process_pending(self):
+        pending, self._pending = self._pending, set()
+        for folder in pending:
+            if folder not in self._snapshots:
+                continue
+            if not os.path.isdir(folder):
+                self._remove_tree(folder)
+                continue
+            old = self._snapshots[folder]
+            new = _snapshot(folder, self._rules)
+            self._snapshots[folder] = new
+            for name in old.keys() - new.keys():
+                path = os.path.join(folder, name)
+                if old[name][1]:
+                    self._remove_tree(path)
+                else:
+                    self.fileChanged.emit(DELETED, path)
+            for name in new.keys() - old.keys():
+                path = os.path.join(folder, name)
+                if new[name][1]:
+                    self._add_tree(path)
+                else:
+                    self.fileChanged.emit(ADDED, path)
+            for name in new.keys() & old.keys():
+                if not new[name][1] and new[name][0] != old[name][0]:
+                    self.fileChanged.emit(
+                        MODIFIED, os.path.join(folder, name))
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Format of the swap files of the editors.
+
+A swap file is a snapshot of the text of the editor plus a journal of
+the edits made after it, so autosaving writes the edits and not the
+whole text. Both files start with the same header and generation, a
+journal of another generation (left by a crash while compacting) is
+ignored. An edit record is the position and the number of characters
+removed, in the UTF-16 units of QTextDocument, and the inserted text
+in UTF-8. Swap files written before the journal (the plain text) are
+still read."""
+
+import os
+import queue
+import struct
+import threading
+
+from ninja_ide.core.file_handling import file_manager
+from ninja_ide.tools.logger import NinjaLogger
+
+logger = NinjaLogger(__name__)
+
+HEADER = b'NINJA-SWAP 1 '
+JOURNAL_SUFFIX = '.journal'
+
+# position, removed characters, inserted bytes
+_RECORD = struct.Struct('<III')
+
+
+def journal_path(path):
+    return path + JOURNAL_SUFFIX
+
+
+def _header(generation):
+    return HEADER + '{}\n'.format(generation).encode('ascii')
+
+
+def _split_header(data):
+    """Return (generation, rest of data), generation is None if data
+    has no header."""
+    if not data.startswith(HEADER):
+        return None, data
+    end = data.find(b'\n')
+    try:
+        return int(data[len(HEADER):end]), data[end + 1:]
+    except ValueError:
+        return None, data
+
+
+def encode_record(position, removed, text):
+    data = text.encode('utf-8', 'surrogatepass')
+    return _RECORD.pack(position, removed, len(data)) + data
+
+
+def decode_records(data):
+    """Yield the (position, removed, text) of the records in data, a
+    record cut by a crash ends it."""
+    offset = 0
+    while offset + _RECORD.size <= len(data):
+        position, removed, size = _RECORD.unpack_from(data, offset)
+        offset += _RECORD.size
+        if offset + size > len(data):
+            return
+        text = data[offset:offset + size].decode('utf-8', 'surrogatepass')
+        offset += size
+        yield position, removed, text
+
+
+def replay(text, records):
+    """Return text with the edits of records applied."""
+    # Positions count UTF-16 units, like QTextDocument does
+    buffer = bytearray(text.encode('utf-16-le', 'surrogatepass'))
+    for position, removed, inserted in records:
+        length = len(buffer) // 2
+        start = min(position, length)
+        # The edits at the end of the document count the last paragraph
+        # separator, that is not part of the text
+        end = min(position + removed, length)
+        buffer[start * 2:end * 2] = inserted.encode(
+            'utf-16-le', 'surrogatepass')
+    return buffer.decode('utf-16-le', 'surrogatepass')
+
+
+def write_snapshot(path, text, generation):
+    """Write text as the snapshot of path and start an empty journal."""
+    file_manager.write_atomic(
+        path, _header(generation) + text.encode('utf-8', 'surrogatepass'),
+        sync=False)
+    file_manager.write_atomic(
+        journal_path(path), _header(generation), sync=False)
+
+
+def append(path, data):
+    """Append the encoded records data to the journal of path."""
+    with open(journal_path(path), 'ab') as journal:
+        journal.write(data)
+
+
+def read(path):
+    """Return the text saved in the swap file path, None if there is
+    not one."""
+    try:
+        with open(path, 'rb') as snapshot:
+            data = snapshot.read()
+    except FileNotFoundError:
+        return None
+    generation, data = _split_header(data)
+    text = data.decode('utf-8', 'surrogatepass')
+    if generation is None:
+        return text
+    try:
+        with open(journal_path(path), 'rb') as journal:
+            journal_generation, data = _split_header(journal.read())
+    except FileNotFoundError:
+        return text
+    if journal_generation != generation:
+        return text
+    return replay(text, decode_records(data))
+
+
+def remove(path):
+    for name in (path, journal_path(path)):
+        try:
+            os.remove(name)
+        except FileNotFoundError:
+            pass
+
+
+class SwapWriter(threading.Thread):
+    """Thread doing the writes of the swap files in order, out of the
+    GUI thread."""
+
+    def __init__(self):
+        super(SwapWriter, self).__init__(name='SwapWriter', daemon=True)
+        self._queue = queue.Queue()
+
+    def submit(self, function, *args):
+        self._queue.put((function, args))
+
+    def flush(self):
+        """Block until the submitted writes are done."""
+        self._queue.join()
+
+    def run(self):
+        while True:
+            function, args = self._queue.get()
+            try:
+                function(*args)
+            except (OSError, UnicodeError):
+                logger.exception("Could not write the swap file")
+            finally:
+                self._queue.task_done()
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def writer():
+    """Return the SwapWriter shared by all the editors."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = SwapWriter()
+            _writer.start()
+        return _writer
@@ -95,6 +95,14 @@ CUSTOM_SCREEN_RESOLUTION = ""
 
 AUTOSAVE = True
 AUTOSAVE_DELAY = 1500
+# Wait for the disk when saving, a crash right after can not lose it
+SYNC_ON_SAVE = True
+# Find in files stops showing matches beyond this number
+FIND_IN_FILES_MAX_MATCHES = 5000
+# Find in files skips the files bigger than this, in KB (0: no limit)
+FIND_IN_FILES_MAX_FILE_SIZE = 1024
+# Keep a trigram index of each project to narrow the files searched
+FIND_IN_FILES_INDEX = True
 # 0: Disable
 # 1: Enable
 # 2: Alternative Dir
@@ -219,6 +227,9 @@ MAX_REMEMBER_EDITORS = 50
 
 # IGNORE_PEP8_LIST = []
 CHECK_STYLE = FIND_ERRORS = True
+# A checker slower than this (milliseconds) is skipped for sources as big
+# as the one that took too long, 0 means no budget
+CHECKERS_TIME_BUDGET = 3000
 # FIND_ERRORS = ERRORS_HIGHLIGHT_LINE = CHECK_STYLE = CHECK_HIGHLIGHT_LINE = False
 # CODE_COMPLETION = COMPLETE_DECLARATIONS = SHOW_MIGRATION_TIPS = True
 # UNDERLINE_NOT_BACKGROUND = VALID_2TO3 = AND_AT_LAST_LINE = True
@@ -444,8 +455,10 @@ def clean_locator_db(qsettings):
     last_clean = should_clean_locator_knowledge()
     if last_clean is not None:
         file_path = os.path.join(resources.NINJA_KNOWLEDGE_PATH, 'locator.db')
-        if os.path.isfile(file_path):
-            os.remove(file_path)
+        # The write ahead log and its index go with the database
+        for path in (file_path, file_path + '-wal', file_path + '-shm'):
+            if os.path.isfile(path):
+                os.remove(path)
         qsettings.setValue("ide/cleanLocator", last_clean)
 
 
@@ -489,6 +502,7 @@ def load_settings():
     # global ERRORS_HIGHLIGHT_LINE
     global FIND_ERRORS
     global CHECK_STYLE
+    global CHECKERS_TIME_BUDGET
     # global CHECK_HIGHLIGHT_LINE
     # global SHOW_MIGRATION_TIPS
     # global CODE_COMPLETION
@@ -525,6 +539,10 @@ def load_settings():
     global RELOAD_FILE
     global CUSTOM_SCREEN_RESOLUTION
     global HDPI
+    global FIND_IN_FILES_MAX_MATCHES
+    global FIND_IN_FILES_MAX_FILE_SIZE
+    global FIND_IN_FILES_INDEX
+    global SYNC_ON_SAVE
     global HIGHLIGHT_CURRENT_LINE
     global HIGHLIGHT_CURRENT_LINE_MODE
     global BRACE_MATCHING
@@ -553,6 +571,13 @@ def load_settings():
     CUSTOM_SCREEN_RESOLUTION = qsettings.value(
         "ide/interface/customScreenResolution", "", type=str)
     HDPI = qsettings.value("ide/interface/autoHdpi", False, type=bool)
+    FIND_IN_FILES_MAX_MATCHES = qsettings.value(
+        "ide/findInFiles/maxMatches", 5000, type=int)
+    FIND_IN_FILES_MAX_FILE_SIZE = qsettings.value(
+        "ide/findInFiles/maxFileSize", 1024, type=int)
+    FIND_IN_FILES_INDEX = qsettings.value(
+        "ide/findInFiles/index", True, type=bool)
+    SYNC_ON_SAVE = qsettings.value("ide/syncOnSave", True, type=bool)
     # Fix later
     # try:
     # for key in sessionDict:
@@ -668,6 +693,8 @@ def load_settings():
     #    'preferences/editor/errorsInLine', True, type=bool)
     CHECK_STYLE = qsettings.value('editor/display/check_style',
                                   True, type=bool)
+    CHECKERS_TIME_BUDGET = qsettings.value(
+        "editor/checkers/time_budget", 3000, type=int)
     AUTOCOMPLETE_BRACKETS = qsettings.value(
         "editor/intellisense/autocomplete_brackets", True, type=bool)
     AUTOCOMPLETE_QUOTES = qsettings.value(
@@ -58,6 +58,7 @@ import tokenize
 import warnings
 
 from fnmatch import fnmatch
+from operator import attrgetter
 from optparse import OptionParser
 
 try:
@@ -1515,6 +1516,24 @@ def init_checks_registry():
 init_checks_registry()
 
 
+def compile_checks(checks):
+    """Precompute how to call each check.
+
+    Return (name, check, arguments getter, uses checker_state) tuples, the
+    getter fetches all the arguments from the checker in a single call.
+    """
+    compiled = []
+    for name, check, argument_names in checks:
+        if len(argument_names) == 1:
+            getter = attrgetter(argument_names[0])
+            getter = (lambda checker, _getter=getter: (_getter(checker),))
+        else:
+            getter = attrgetter(*argument_names)
+        compiled.append(
+            (name, check, getter, 'checker_state' in argument_names))
+    return compiled
+
+
 class Checker(object):
     """Load a Python source file, tokenize it, check coding style."""
 
@@ -1528,6 +1547,13 @@ class Checker(object):
         self._physical_checks = options.physical_checks
         self._logical_checks = options.logical_checks
         self._ast_checks = options.ast_checks
+        # Prefer the runners compiled once by the StyleGuide
+        self._physical_runners = getattr(
+            options, 'physical_runners', None) or compile_checks(
+                self._physical_checks)
+        self._logical_runners = getattr(
+            options, 'logical_runners', None) or compile_checks(
+                self._logical_checks)
         self.max_line_length = options.max_line_length
         self.multiline = False  # in a multiline string?
         self.hang_closing = options.hang_closing
@@ -1599,9 +1625,10 @@ class Checker(object):
     def check_physical(self, line):
         """Run all physical checks on a raw input line."""
         self.physical_line = line
-        for name, check, argument_names in self._physical_checks:
-            self.init_checker_state(name, argument_names)
-            result = self.run_check(check, argument_names)
+        for name, check, getter, stateful in self._physical_runners:
+            if stateful:
+                self.checker_state = self._checker_states.setdefault(name, {})
+            result = check(*getter(self))
             if result is not None:
                 (offset, text) = result
                 self.report_error(self.line_number, offset, text, check)
@@ -1656,11 +1683,12 @@ class Checker(object):
             self.blank_before = self.blank_lines
         if self.verbose >= 2:
             print(self.logical_line[:80].rstrip())
-        for name, check, argument_names in self._logical_checks:
+        for name, check, getter, stateful in self._logical_runners:
             if self.verbose >= 4:
                 print('   ' + name)
-            self.init_checker_state(name, argument_names)
-            for offset, text in self.run_check(check, argument_names) or ():
+            if stateful:
+                self.checker_state = self._checker_states.setdefault(name, {})
+            for offset, text in check(*getter(self)) or ():
                 if not isinstance(offset, tuple):
                     for token_offset, pos in mapping:
                         if offset <= token_offset:
@@ -1738,6 +1766,9 @@ class Checker(object):
         self.total_lines = len(self.lines)
         if self._ast_checks:
             self.check_ast()
+        if not (self._physical_runners or self._logical_runners):
+            # Every token based check is disabled, skip tokenization
+            return self.report.get_file_results()
         self.line_number = 0
         self.indent_char = None
         self.indent_level = self.previous_indent_level = 0
@@ -1988,6 +2019,8 @@ class StyleGuide(object):
         options.physical_checks = self.get_checks('physical_line')
         options.logical_checks = self.get_checks('logical_line')
         options.ast_checks = self.get_checks('tree')
+        options.physical_runners = compile_checks(options.physical_checks)
+        options.logical_runners = compile_checks(options.logical_checks)
         self.init_report()
 
     def init_report(self, reporter=None):
@@ -111,6 +111,7 @@ def start_ide(app, filenames, projects_path, extra_plugins, linenos):
     import ninja_ide.gui.tools_dock.console_widget  # noqa
     import ninja_ide.gui.tools_dock.run_widget  # noqa
     import ninja_ide.gui.tools_dock.find_in_files  # noqa
+    import ninja_ide.gui.tools_dock.checkers_performance  # noqa
 
     import ninja_ide.gui.main_panel.main_container  # noqa
     import ninja_ide.gui.central_widget  # noqa
@@ -126,7 +127,7 @@ def start_ide(app, filenames, projects_path, extra_plugins, linenos):
     # Checkers
     from ninja_ide.gui.editor.checkers import errors_checker  # noqa
     from ninja_ide.gui.editor.checkers import pep8_checker  # noqa
-    # from ninja_ide.gui.editor.checkers import not_import_checker  # noqa
+    from ninja_ide.gui.editor.checkers import not_import_checker  # noqa
     # from ninja_ide.gui.editor.checkers import migration_2to3
     # Preferences
     # from ninja_ide.gui.dialogs.preferences import preferences_general  # noqa
@@ -142,6 +143,7 @@ def start_ide(app, filenames, projects_path, extra_plugins, linenos):
     # from ninja_ide.gui.dialogs.preferences import preferences_editor_completion
     # from ninja_ide.gui.dialogs.preferences import preferences_plugins
     # from ninja_ide.gui.dialogs.preferences import preferences_theme
+    from ninja_ide.gui.editor.checkers import project_lint  # noqa
     from ninja_ide.gui.editor.checkers import errors_lists  # noqa
     from ninja_ide.gui.editor.checkers import errors_checker  # noqa
     from ninja_ide.gui.editor.checkers import pep8_checker  # noqa
@@ -15,8 +15,143 @@
 # You should have received a copy of the GNU General Public License
 # along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
 
+import json
+import threading
+import time
+from collections import defaultdict
+from collections import deque
+from functools import wraps
+
+from ninja_ide.core import settings
+from ninja_ide.tools.logger import NinjaLogger
+
+logger = NinjaLogger(__name__)
+
 NOTIFICATIONS_CHECKERS = {}
 
+# CPU time of the calling thread, thread_time is new in Python 3.7 and
+# before it the time of the whole process is the closest
+_cpu_time = getattr(time, "thread_time", time.process_time)
+
+
+class CheckersStats(object):
+    """Timings of the checker runs, filled from the checker threads."""
+
+    # Runs kept for each checker
+    HISTORY = 50
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._runs = defaultdict(lambda: deque(maxlen=self.HISTORY))
+        self._cycles = deque(maxlen=self.HISTORY)
+        # checker name -> smallest source size that exceeded the budget
+        self._disabled_above = {}
+
+    def record(self, name, wall, cpu, wait, size, messages):
+        run = {
+            "time": time.time(),
+            "wall": wall,
+            "cpu": cpu,
+            "wait": wait,
+            "size": size,
+            "messages": messages
+        }
+        with self._lock:
+            self._runs[name].append(run)
+            budget = settings.CHECKERS_TIME_BUDGET / 1000.0
+            if budget and wall > budget and size:
+                limit = self._disabled_above.get(name, size)
+                self._disabled_above[name] = min(limit, size)
+                logger.warning(
+                    "{} took {:.2f}s on {} chars, disabled for sources "
+                    "this big".format(name, wall, size))
+
+    def record_cycle(self, wall, size):
+        """Record the time until all the checkers of a file finished."""
+        with self._lock:
+            self._cycles.append({"time": time.time(), "wall": wall,
+                                 "size": size})
+
+    def is_over_budget(self, name, size):
+        limit = self._disabled_above.get(name)
+        return limit is not None and size >= limit
+
+    def reset_budget(self, name=None):
+        with self._lock:
+            if name is None:
+                self._disabled_above.clear()
+            else:
+                self._disabled_above.pop(name, None)
+
+    def summary(self):
+        """Return a list of dicts with the aggregated data per checker."""
+        summary = []
+        with self._lock:
+            for name, runs in sorted(self._runs.items()):
+                count = len(runs)
+                last = runs[-1]
+                summary.append({
+                    "name": name,
+                    "runs": count,
+                    "wall_avg": sum(r["wall"] for r in runs) / count,
+                    "wall_max": max(r["wall"] for r in runs),
+                    "cpu_avg": sum(r["cpu"] for r in runs) / count,
+                    "wait_avg": sum(r["wait"] for r in runs) / count,
+                    "last_size": last["size"],
+                    "last_messages": last["messages"],
+                    "disabled_above": self._disabled_above.get(name)
+                })
+        return summary
+
+    def to_json(self):
+        with self._lock:
+            data = {
+                "budget": settings.CHECKERS_TIME_BUDGET,
+                "runs": {name: list(runs)
+                         for name, runs in self._runs.items()},
+                "cycles": list(self._cycles)
+            }
+        data["checkers"] = self.summary()
+        return json.dumps(data, indent=2)
+
+    def export(self, path):
+        with open(path, "w") as fp:
+            fp.write(self.to_json())
+
+
+CHECKERS_STATS = CheckersStats()
+
+
+def _instrument(checker):
+    """Wrap the run method of a checker class to record its timings.
+
+    NEditable sets queued_at and source_size before asking a checker to
+    run, the time until run starts is the time waiting in the queue."""
+    if getattr(checker, "_instrumented_run", None) is checker.run:
+        return
+    run = checker.run
+
+    @wraps(run)
+    def timed_run(self):
+        started = time.perf_counter()
+        cpu_started = _cpu_time()
+        queued_at = getattr(self, "queued_at", None) or started
+        self.queued_at = None
+        try:
+            run(self)
+        finally:
+            checks = getattr(self, "checks", {})
+            CHECKERS_STATS.record(
+                type(self).__name__,
+                time.perf_counter() - started,
+                _cpu_time() - cpu_started,
+                started - queued_at,
+                getattr(self, "source_size", 0),
+                sum(len(messages) for messages in checks.values()))
+
+    checker.run = timed_run
+    checker._instrumented_run = timed_run
+
 
 def register_checker(lang='python', checker=None, color=None, priority=1):
     """Register a Checker (Like PEP8, Lint, etc) for some language.
@@ -25,6 +160,7 @@ def register_checker(lang='python', checker=None, color=None, priority=1):
     @color: the color that this checker will use.
     @priority: the priority of this checker (1=LOW, >1 = HIGH...)"""
     global NOTIFICATIONS_CHECKERS
+    _instrument(checker)
     checkers = NOTIFICATIONS_CHECKERS.get(lang, [])
     checkers.append((checker, color, priority))
     NOTIFICATIONS_CHECKERS[lang] = checkers
@@ -15,17 +15,26 @@
 # You should have received a copy of the GNU General Public License
 # along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
 
+import bisect
+import os
+import re
+
 from PyQt5.QtWidgets import (
+    QComboBox,
     QDialog,
     QWidget,
+    QLabel,
+    QLineEdit,
+    QTreeWidget,
+    QTreeWidgetItem,
+    QSplitter,
     QVBoxLayout,
     QHBoxLayout
 )
-from PyQt5.QtGui import QIcon
 from PyQt5.QtCore import (
     pyqtSignal,
     QModelIndex,
-    QAbstractItemModel,
+    QAbstractListModel,
     Qt
 )
 from PyQt5.QtQuickWidgets import QQuickWidget
@@ -49,28 +58,30 @@ class ErrorsWidget(QDialog):
         box.setSpacing(0)
         hbox = QHBoxLayout()
         hbox.setContentsMargins(0, 0, 0, 0)
+        splitter = QSplitter(Qt.Vertical)
         self._list = ErrorsList()
-        hbox.addWidget(self._list)
+        splitter.addWidget(self._list)
+        self._project_problems = ProjectProblems()
+        splitter.addWidget(self._project_problems)
+        hbox.addWidget(splitter)
         box.addLayout(hbox)
 
         IDE.register_service("tab_errors", self)
         ExplorerContainer.register_tab(translations.TR_TAB_ERRORS, self)
+        connections = (
+            {
+                "target": "project_linter",
+                "signal_name": "problemsUpdated",
+                "slot": self._project_problems.refresh
+            },
+        )
+        IDE.register_signals("tab_errors", connections)
 
     def refresh_pep8_list(self, errors):
-        model = []
-        for lineno, error in errors.items():
-            for content in error:
-                pos, message, line_content = content
-                model.append([message, line_content, lineno, pos[0]])
-        self._list.update_pep8_model(model)
+        self._list.update_pep8_model(errors)
 
     def refresh_error_list(self, errors):
-        model = []
-        for lineno, error in errors.items():
-            for content in error:
-                pos, message, line_content = content
-                model.append([message, line_content, lineno, pos[0]])
-        self._list.update_error_model(model)
+        self._list.update_error_model(errors)
 
     def reject(self):
         if self.parent() is None:
@@ -86,10 +97,18 @@ class ErrorsList(QWidget):
     def __init__(self, parent=None):
         super(ErrorsList, self).__init__()
         self._main_container = IDE.get_service("main_container")
+        self._model = ErrorsListModel(self)
+        self._sort_combo = QComboBox()
+        self._sort_combo.addItem(
+            translations.TR_SORT_BY_LINE, ErrorsListModel.SORT_BY_LINE)
+        self._sort_combo.addItem(
+            translations.TR_SORT_BY_SEVERITY, ErrorsListModel.SORT_BY_SEVERITY)
         # Create the QML user interface.
         self.view = QQuickWidget()
         self.view.rootContext().setContextProperty(
             "theme", resources.QML_COLORS)
+        self.view.rootContext().setContextProperty(
+            "errorsModel", self._model)
         # Colors from theme
         warn_bug_colors = {}
         warn_bug_colors["warning"] = resources.COLOR_SCHEME.get("editor.pep8")
@@ -101,59 +120,243 @@ class ErrorsList(QWidget):
         vbox = QVBoxLayout(self)
         vbox.setContentsMargins(0, 0, 0, 0)
         vbox.setSpacing(0)
+        vbox.addWidget(self._sort_combo)
         vbox.addWidget(self.view)
 
         self._root.open.connect(self._open)
+        self._sort_combo.currentIndexChanged[int].connect(
+            self._on_sort_changed)
 
     def _open(self, row):
         self._main_container.editor_go_to_line(row)
 
-    def update_pep8_model(self, model):
-        self._root.set_pep8_model(model)
+    def _on_sort_changed(self, index):
+        self._model.set_sort_mode(self._sort_combo.itemData(index))
+
+    def update_pep8_model(self, checks):
+        self._model.update_entries(False, checks)
+
+    def update_error_model(self, checks):
+        self._model.update_entries(True, checks)
+
+
+class ErrorsListModel(QAbstractListModel):
+    """Errors and style warnings of the current editor.
+
+    Entries are kept sorted, so a checker update only inserts and removes
+    the rows that changed and the view keeps its position. Rows are exposed
+    to the view in FETCH_STEP pages through canFetchMore/fetchMore."""
 
-    def update_error_model(self, model):
-        self._root.set_error_model(model)
+    NameRole = Qt.UserRole + 1
+    CodeLineRole = Qt.UserRole + 2
+    RowRole = Qt.UserRole + 3
+    ColumnRole = Qt.UserRole + 4
+    BugRole = Qt.UserRole + 5
 
+    SORT_BY_LINE = 0
+    SORT_BY_SEVERITY = 1
 
-class ModelWarningsErrors(QAbstractItemModel):
+    FETCH_STEP = 200
 
-    def __init__(self, data):
-        QAbstractItemModel.__init__(self)
-        self.__data = data
+    # Beyond this fraction of changed rows a reset is cheaper than a diff
+    RESET_RATIO = 0.5
 
-    def rowCount(self, parent):
-        return len(self.__data) + 1
+    CODE_RE = re.compile(r'^\[\w+\]: ([A-Z]\d+) ')
+
+    def __init__(self, parent=None):
+        super(ErrorsListModel, self).__init__(parent)
+        self.__entries = []
+        self.__keys = []
+        self.__by_kind = {True: set(), False: set()}
+        self.__item_count = 0
+        self.__sort_mode = self.SORT_BY_LINE
+
+    def roleNames(self):
+        return {
+            self.NameRole: b"name",
+            self.CodeLineRole: b"codeLine",
+            self.RowRole: b"row",
+            self.ColumnRole: b"column",
+            self.BugRole: b"bug"
+        }
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self.__item_count
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return self.__item_count < len(self.__entries)
+
+    def fetchMore(self, parent=QModelIndex()):
+        remainder = len(self.__entries) - self.__item_count
+        items_to_fetch = min(self.FETCH_STEP, remainder)
+        if items_to_fetch <= 0:
+            return
+        self.beginInsertRows(
+            QModelIndex(), self.__item_count,
+            self.__item_count + items_to_fetch - 1)
+        self.__item_count += items_to_fetch
+        self.endInsertRows()
 
-    def columnCount(self, parent):
-        return 1
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= self.__item_count:
+            return None
+        bug, lineno, column, code, message, line_content = \
+            self.__entries[index.row()]
+        if role == self.NameRole or role == Qt.DisplayRole:
+            return message
+        elif role == self.CodeLineRole:
+            return line_content
+        elif role == self.RowRole:
+            return lineno
+        elif role == self.ColumnRole:
+            return column
+        elif role == self.BugRole:
+            return bug
+        return None
 
-    def index(self, row, column, parent):
-        return self.createIndex(row, column, parent)
+    def _sort_key(self, entry):
+        bug, lineno, column, code, message, line_content = entry
+        severity = 0 if bug else 1
+        if self.__sort_mode == self.SORT_BY_SEVERITY:
+            return severity, code, lineno, column, message, line_content
+        return lineno, severity, column, code, message, line_content
 
-    def parent(self, child):
-        return QModelIndex()
+    def set_sort_mode(self, mode):
+        if mode == self.__sort_mode:
+            return
+        self.layoutAboutToBeChanged.emit()
+        self.__sort_mode = mode
+        self.__entries.sort(key=self._sort_key)
+        self.__keys = [self._sort_key(entry) for entry in self.__entries]
+        self.layoutChanged.emit()
 
-    def data(self, index, role):
-        if not index.isValid():
+    def update_entries(self, bug, checks):
+        """Replace the entries of one kind (errors or style warnings)
+        with those in checks: {lineno: [(range, message, content)]}"""
+        new = set()
+        for lineno, messages in checks.items():
+            for pos, message, line_content in messages:
+                match = self.CODE_RE.match(message)
+                code = match.group(1) if match else ''
+                new.add((bug, lineno, pos[0], code, message, line_content))
+        old = self.__by_kind[bug]
+        removed = old - new
+        added = new - old
+        self.__by_kind[bug] = new
+        if not removed and not added:
             return
-        if not index.parent().isValid() and index.row() == 0:
-            if role == Qt.DisplayRole:
-                if self.rowCount(index) > 1:
-                    return '<Select Symbol>'
-                return '<No Symbols>'
+        changed = len(removed) + len(added)
+        if changed > len(self.__entries) * self.RESET_RATIO:
+            self._reset()
+        else:
+            self._remove_entries(removed)
+            self._insert_entries(added)
+
+    def _reset(self):
+        self.beginResetModel()
+        self.__entries = list(self.__by_kind[True]) + \
+            list(self.__by_kind[False])
+        self.__entries.sort(key=self._sort_key)
+        self.__keys = [self._sort_key(entry) for entry in self.__entries]
+        self.__item_count = min(self.FETCH_STEP, len(self.__entries))
+        self.endResetModel()
+
+    def _remove_entries(self, entries):
+        rows = sorted((bisect.bisect_left(self.__keys, self._sort_key(e))
+                       for e in entries), reverse=True)
+        # Remove contiguous runs of rows at once, from the bottom
+        i = 0
+        while i < len(rows):
+            last = first = rows[i]
+            i += 1
+            while i < len(rows) and rows[i] == first - 1:
+                first = rows[i]
+                i += 1
+            visible_last = min(last, self.__item_count - 1)
+            if first <= visible_last:
+                self.beginRemoveRows(QModelIndex(), first, visible_last)
+            del self.__entries[first:last + 1]
+            del self.__keys[first:last + 1]
+            if first <= visible_last:
+                self.__item_count -= visible_last - first + 1
+                self.endRemoveRows()
+
+    def _insert_entries(self, entries):
+        for entry in sorted(entries, key=self._sort_key):
+            key = self._sort_key(entry)
+            row = bisect.bisect_left(self.__keys, key)
+            visible = row <= self.__item_count and (
+                row < self.__item_count or not self.canFetchMore())
+            if visible:
+                self.beginInsertRows(QModelIndex(), row, row)
+            self.__entries.insert(row, entry)
+            self.__keys.insert(row, key)
+            if visible:
+                self.__item_count += 1
+                self.endInsertRows()
+
+    def __len__(self):
+        return len(self.__entries)
+
+
+class ProjectProblems(QWidget):
+    """Totals and problems found by the project linter."""
+
+    # Only this many problems are loaded in the tree, the totals are exact
+    MAX_ITEMS = 1000
+
+    def __init__(self, parent=None):
+        super(ProjectProblems, self).__init__(parent)
+        self._project_path = None
+        vbox = QVBoxLayout(self)
+        vbox.setContentsMargins(0, 0, 0, 0)
+        self._totals = QLabel(translations.TR_PROJECT_PROBLEMS)
+        vbox.addWidget(self._totals)
+        self._filter = QLineEdit()
+        self._filter.setPlaceholderText(translations.TR_FILTER_PROBLEMS)
+        vbox.addWidget(self._filter)
+        self._tree = QTreeWidget()
+        self._tree.setRootIsDecorated(False)
+        self._tree.setUniformRowHeights(True)
+        self._tree.setHeaderHidden(True)
+        self._tree.setColumnCount(3)
+        vbox.addWidget(self._tree)
+
+        self._filter.textChanged.connect(lambda: self.refresh())
+        self._tree.itemActivated.connect(self._open)
+
+    def refresh(self, project_path=None):
+        if project_path is not None:
+            self._project_path = project_path
+        project_linter = IDE.get_service("project_linter")
+        if project_linter is None or self._project_path is None:
             return
+        filter_text = self._filter.text().strip()
+        errors, style, files = project_linter.totals(
+            self._project_path, filter_text)
+        self._totals.setText(translations.TR_PROJECT_PROBLEMS_TOTALS.format(
+            errors, style, files))
+        self._tree.setUpdatesEnabled(False)
+        self._tree.clear()
+        items = []
+        problems = project_linter.problems(
+            self._project_path, filter_text, self.MAX_ITEMS)
+        for path, lineno, col, kind, code, message in problems:
+            location = "{}:{}".format(
+                os.path.relpath(path, self._project_path), lineno + 1)
+            item = QTreeWidgetItem([code, message, location])
+            item.setData(0, Qt.UserRole, (path, lineno))
+            items.append(item)
+        self._tree.addTopLevelItems(items)
+        self._tree.setUpdatesEnabled(True)
 
-        # return self.__data[index.row() - 1]
-
-        if role == Qt.DisplayRole:
-            return self.__data[index.row() - 1][1][0]
-        elif role == Qt.DecorationRole:
-            _type = self.__data[index.row() - 1][1][1]
-            if _type == 'f':
-                icon = QIcon(":img/function")
-            elif _type == 'c':
-                icon = QIcon(":img/class")
-            return icon
+    def _open(self, item, column):
+        path, lineno = item.data(0, Qt.UserRole)
+        main_container = IDE.get_service("main_container")
+        if main_container is not None:
+            main_container.open_file(path, lineno)
 
 
 if settings.SHOW_ERRORS_LIST:
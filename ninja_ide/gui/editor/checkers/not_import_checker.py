@@ -15,6 +15,7 @@
 # You should have received a copy of the GNU General Public License
 # along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
 
+import os
 from collections import defaultdict
 
 from PyQt5.QtCore import (
@@ -27,17 +28,16 @@ from ninja_ide import resources
 from ninja_ide import translations
 from ninja_ide.core import settings
 from ninja_ide.core.file_handling import file_manager
-# from ninja_ide.gui.ide import IDE
-from ninja_ide.dependencies import notimportchecker as nic
+from ninja_ide.gui.ide import IDE
 from ninja_ide.gui.editor.checkers import (
     register_checker,
     remove_checker,
 )
 from ninja_ide.gui.editor import helpers
-# from ninja_ide.tools import ui_tools
-# from ninja_ide.gui.editor.checkers import errors_lists  # lint:ok
+from ninja_ide.tools import module_index
+from ninja_ide.tools.logger import NinjaLogger
 
-# TODO: limit results for performance
+logger = NinjaLogger(__name__)
 
 
 class NotImporterChecker(QThread):
@@ -48,6 +48,7 @@ class NotImporterChecker(QThread):
         self._editor = editor
         self._path = ''
         self._encoding = ''
+        self._extra_paths = []
         self.checks = defaultdict(list)
 
         self.checker_icon = None
@@ -70,6 +71,13 @@ class NotImporterChecker(QThread):
         if not self.isRunning():
             self._path = self._editor.file_path
             self._encoding = self._editor.encoding
+            # The folder of the file and its project are importable too
+            self._extra_paths = [os.path.dirname(self._path)]
+            ninjaide = IDE.get_service('ide')
+            if ninjaide is not None:
+                project = ninjaide.get_project_for_file(self._path)
+                if project is not None:
+                    self._extra_paths.append(project.path)
             QTimer.singleShot(10, self.start)
 
     def reset(self):
@@ -78,29 +86,24 @@ class NotImporterChecker(QThread):
     def run(self):
         exts = settings.SYNTAX.get('python')['extension']
         file_ext = file_manager.get_file_extension(self._path)
-        not_imports = dict()
         if file_ext in exts:
             self.reset()
-            # source = self._editor.text
-            path = self._editor.file_path
-            checker = nic.Checker(path)
-            not_imports = checker.get_not_imports_on_file(
-                checker.get_imports())
-            if not_imports is None:
+            try:
+                imports = module_index.find_imports(self._editor.text)
+                index = module_index.get_index(settings.PYTHON_EXEC)
+                for lineno, module, level in imports:
+                    if index.resolve(module, self._extra_paths,
+                                     level, self._path):
+                        continue
+                    message = "[NOTIMP]: No module named '{}'".format(
+                        '.' * level + module)
+                    range_ = helpers.get_range(self._editor, lineno - 1)
+                    self.checks[lineno - 1].append((range_, message, ""))
+            except SyntaxError:
+                # Reported by the errors checker
                 pass
-            else:
-                for key, values in not_imports.items():
-                    if isinstance(values['mod_name'], dict):
-                        for v in values['mod_name']:
-                            message = '[NOTIMP] {}: Dont exist'.format(
-                                v)
-                    else:
-                        message = '[NOTIMP] {}: Dont exist'.format(
-                                values['mod_name'])
-                    range_ = helpers.get_range(
-                        self._editor, values['lineno'] - 1)
-                    self.checks[values['lineno'] - 1].append(
-                        (range_, message, ""))
+            except Exception as reason:
+                logger.warning("Checker not finished: {}".format(reason))
         self.checkerCompleted.emit()
 
     def message(self, index):
@@ -26,10 +26,10 @@ from ninja_ide import translations
 from ninja_ide.core import settings
 from ninja_ide.core.file_handling import file_manager
 from ninja_ide.gui.ide import IDE
-from ninja_ide.dependencies import pycodestyle
 from ninja_ide.gui.editor.checkers import register_checker
 from ninja_ide.gui.editor.checkers import remove_checker
 from ninja_ide.gui.editor import helpers
+from ninja_ide.tools import lint
 from ninja_ide.tools.logger import NinjaLogger
 
 logger = NinjaLogger(__name__)
@@ -74,20 +74,14 @@ class Pep8Checker(QThread):
                 self.reset()
                 source = self._editor.text
                 path = self._editor.file_path
-                pep8_style = pycodestyle.StyleGuide(
-                    parse_argv=False,
-                    config_file='',
-                    checker_class=CustomChecker
-                )
-                temp_data = pep8_style.input_file(
-                    path,
-                    lines=source.splitlines(True)
-                )
+                temp_data = lint.check_style(
+                    source.splitlines(True), path,
+                    max_line_length=settings.MARGIN_LINE)
 
                 source_lines = source.split('\n')
                 # for lineno, offset, code, text, doc in temp_data:
                 for lineno, col, code, text in temp_data:
-                    message = '[PEP8]: %s' % text
+                    message = '[PEP8]: %s %s' % (code, text)
                     range_ = helpers.get_range(self._editor, lineno - 1, col)
                     self.checks[lineno - 1].append(
                         (range_, message, source_lines[lineno - 1].strip()))
@@ -106,22 +100,6 @@ class Pep8Checker(QThread):
             error_list.refresh_pep8_list(self.checks)
 
 
-class CustomReport(pycodestyle.StandardReport):
-
-    def get_file_results(self):
-        data = []
-        for line_number, offset, code, text, doc in self._deferred_print:
-            col = offset + 1
-            data.append((line_number, col, code, text))
-        return data
-
-
-class CustomChecker(pycodestyle.Checker):
-
-    def __init__(self, *args, **kw):
-        super().__init__(*args, report=CustomReport(kw.pop("options")), **kw)
-
-
 def remove_pep8_checker():
     checker = (Pep8Checker,
                resources.COLOR_SCHEME.get("editor.pep8"), 2)
@@ -0,0 +1,306 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from PyQt5.QtCore import QObject
+from PyQt5.QtCore import QThread
+from PyQt5.QtCore import QTimer
+from PyQt5.QtCore import pyqtSignal
+
+from ninja_ide import resources
+from ninja_ide import translations
+from ninja_ide.core import settings
+from ninja_ide.core.file_handling import file_manager
+from ninja_ide.core.file_handling import project_watcher
+from ninja_ide.gui.ide import IDE
+from ninja_ide.tools import lint
+from ninja_ide.tools.logger import NinjaLogger
+
+logger = NinjaLogger(__name__)
+DEBUG = logger.debug
+
+PROBLEMS_DB = os.path.join(resources.NINJA_KNOWLEDGE_PATH, 'problems.db')
+
+# Commit (and report progress) every BATCH_SIZE linted files
+BATCH_SIZE = 50
+# Wait for a burst of changes to settle before re linting
+RELINT_DELAY = 1000
+
+
+def _connect():
+    connection = sqlite3.connect(PROBLEMS_DB)
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS files("
+        "path TEXT PRIMARY KEY, project TEXT, mtime REAL)")
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS problems("
+        "path TEXT, lineno INTEGER, col INTEGER, kind TEXT, "
+        "code TEXT, message TEXT)")
+    connection.execute(
+        "CREATE INDEX IF NOT EXISTS problems_path ON problems(path)")
+    connection.execute(
+        "CREATE INDEX IF NOT EXISTS problems_code ON problems(code)")
+    connection.execute(
+        "CREATE INDEX IF NOT EXISTS files_project ON files(project)")
+    connection.commit()
+    return connection
+
+
+def _is_python_file(path):
+    exts = settings.SYNTAX.get('python')['extension']
+    return file_manager.get_file_extension(path) in exts
+
+
+class LintProjectThread(QThread):
+    """Lint a set of files in a process pool and store the results.
+
+    Files whose mtime did not change since the last sweep are skipped,
+    and stored files that are not part of the project anymore are
+    forgotten (only on full sweeps)."""
+
+    progress = pyqtSignal(int, int)
+
+    def __init__(self, project_path, paths, full_sweep=True):
+        super(LintProjectThread, self).__init__()
+        self._project_path = project_path
+        self._paths = paths
+        self._full_sweep = full_sweep
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        connection = _connect()
+        try:
+            self._sweep(connection)
+        except Exception as reason:
+            logger.warning("Lint sweep not finished: {}".format(reason))
+        finally:
+            connection.close()
+
+    def _sweep(self, connection):
+        known = dict(connection.execute(
+            "SELECT path, mtime FROM files WHERE project = ?",
+            (self._project_path,)))
+        paths = set(self._paths)
+        if self._full_sweep:
+            gone = [(path,) for path in known if path not in paths]
+            self._forget(connection, gone)
+        pending = []
+        for path in paths:
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError:
+                self._forget(connection, [(path,)])
+                continue
+            if known.get(path) != mtime:
+                pending.append(path)
+        connection.commit()
+        total = len(pending)
+        self.progress.emit(0, total)
+        if not pending:
+            return
+        done = 0
+        pool = ProcessPoolExecutor()
+        try:
+            lint_file = partial(
+                lint.lint_file, max_line_length=settings.MARGIN_LINE)
+            results = pool.map(lint_file, pending, chunksize=8)
+            for path, mtime, problems in results:
+                if self._cancelled:
+                    break
+                self._store(connection, path, mtime, problems)
+                done += 1
+                if done % BATCH_SIZE == 0:
+                    connection.commit()
+                    self.progress.emit(done, total)
+        finally:
+            # Do not block a cancelled sweep on the remaining chunks
+            pool.shutdown(wait=not self._cancelled)
+        connection.commit()
+        self.progress.emit(done, total)
+
+    def _forget(self, connection, paths):
+        connection.executemany("DELETE FROM problems WHERE path = ?", paths)
+        connection.executemany("DELETE FROM files WHERE path = ?", paths)
+
+    def _store(self, connection, path, mtime, problems):
+        connection.execute("DELETE FROM problems WHERE path = ?", (path,))
+        if mtime is None:
+            connection.execute("DELETE FROM files WHERE path = ?", (path,))
+            return
+        connection.execute(
+            "INSERT OR REPLACE INTO files(path, project, mtime) "
+            "VALUES (?, ?, ?)", (path, self._project_path, mtime))
+        connection.executemany(
+            "INSERT INTO problems(path, lineno, col, kind, code, message) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [(path,) + problem for problem in problems])
+
+
+class ProjectLinter(QObject):
+    """Keep a persistent index of the problems found in the projects."""
+
+    # project_path
+    problemsUpdated = pyqtSignal('QString')
+
+    def __init__(self):
+        super(ProjectLinter, self).__init__()
+        self._threads = {}
+        self._dirty = {}
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(RELINT_DELAY)
+        self._timer.timeout.connect(self._lint_dirty)
+        self._connection = None
+        IDE.register_service("project_linter", self)
+        connections = (
+            {
+                "target": "filesystem",
+                "signal_name": "projectFileChanged",
+                "slot": self._on_project_file_changed
+            },
+            {
+                "target": "filesystem",
+                "signal_name": "projectClosed",
+                "slot": self._on_project_closed
+            },
+        )
+        IDE.register_signals("project_linter", connections)
+
+    @property
+    def connection(self):
+        if self._connection is None:
+            self._connection = _connect()
+        return self._connection
+
+    def lint_project(self, project_path):
+        """Lint every python file of the project in background."""
+        ninjaide = IDE.get_service("ide")
+        watcher = ninjaide.filesystem.get_project_watcher(project_path)
+        if watcher is None:
+            return
+        if not watcher.is_ready():
+            # Lint it once the files of the project are known
+            watcher.ready.connect(lambda: self.lint_project(project_path))
+            return
+        paths = [path for path in watcher.files() if _is_python_file(path)]
+        self._start(project_path, paths, full_sweep=True)
+
+    def _start(self, project_path, paths, full_sweep):
+        thread = self._threads.get(project_path)
+        if thread is not None and thread.isRunning():
+            if not full_sweep:
+                # Try again when the running sweep is done
+                self._dirty.setdefault(project_path, set()).update(paths)
+                return
+            thread.cancel()
+            thread.wait()
+        thread = LintProjectThread(project_path, paths, full_sweep)
+        thread.progress[int, int].connect(
+            lambda done, total: self._on_progress(project_path, done, total))
+        thread.finished.connect(
+            lambda: self._on_sweep_finished(project_path))
+        self._threads[project_path] = thread
+        thread.start()
+
+    def _on_progress(self, project_path, done, total):
+        if total:
+            ninjaide = IDE.get_service("ide")
+            ninjaide.show_message(
+                translations.TR_LINTING_PROJECT.format(done, total), 2000)
+        if done:
+            self.problemsUpdated.emit(project_path)
+
+    def _on_sweep_finished(self, project_path):
+        self.problemsUpdated.emit(project_path)
+        if self._dirty.get(project_path):
+            self._timer.start()
+
+    def _on_project_file_changed(self, event, path):
+        if not _is_python_file(path):
+            return
+        ninjaide = IDE.get_service("ide")
+        for project_path in ninjaide.filesystem.get_projects():
+            if file_manager.belongs_to_folder(project_path, path):
+                break
+        else:
+            return
+        if event == project_watcher.DELETED:
+            self.connection.execute(
+                "DELETE FROM problems WHERE path = ?", (path,))
+            self.connection.execute(
+                "DELETE FROM files WHERE path = ?", (path,))
+            self.connection.commit()
+            self.problemsUpdated.emit(project_path)
+        elif self.is_indexed(project_path):
+            self._dirty.setdefault(project_path, set()).add(path)
+            self._timer.start()
+
+    def _lint_dirty(self):
+        dirty, self._dirty = self._dirty, {}
+        for project_path, paths in dirty.items():
+            self._start(project_path, list(paths), full_sweep=False)
+
+    def _on_project_closed(self, project_path):
+        self._dirty.pop(project_path, None)
+        thread = self._threads.pop(project_path, None)
+        if thread is not None and thread.isRunning():
+            thread.cancel()
+            thread.wait()
+
+    def is_indexed(self, project_path):
+        """Return True if the project was swept at least once."""
+        cursor = self.connection.execute(
+            "SELECT 1 FROM files WHERE project = ? LIMIT 1", (project_path,))
+        return cursor.fetchone() is not None
+
+    def _where(self, project_path, filter_text):
+        clause = ("WHERE problems.path IN "
+                  "(SELECT path FROM files WHERE project = ?)")
+        args = [project_path]
+        if filter_text:
+            clause += " AND (problems.code LIKE ? OR problems.path LIKE ?)"
+            pattern = "%{}%".format(filter_text)
+            args.extend((pattern, pattern))
+        return clause, args
+
+    def totals(self, project_path, filter_text=''):
+        """Return (errors, style warnings, files with problems)."""
+        clause, args = self._where(project_path, filter_text)
+        query = ("SELECT SUM(kind = ?), SUM(kind = ?), "
+                 "COUNT(DISTINCT path) FROM problems ")
+        errors, style, files = self.connection.execute(
+            query + clause, [lint.KIND_ERROR, lint.KIND_STYLE] + args
+        ).fetchone()
+        return errors or 0, style or 0, files or 0
+
+    def problems(self, project_path, filter_text='', limit=1000):
+        """Return up to limit (path, lineno, col, kind, code, message)."""
+        clause, args = self._where(project_path, filter_text)
+        query = ("SELECT path, lineno, col, kind, code, message "
+                 "FROM problems " + clause +
+                 " ORDER BY path, lineno LIMIT ?")
+        return self.connection.execute(query, args + [limit]).fetchall()
+
+
+ProjectLinter()
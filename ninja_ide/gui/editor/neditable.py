@@ -15,9 +15,11 @@
 # You should have received a copy of the GNU General Public License
 # along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
 import collections
+import time
 
 from PyQt5.QtCore import QObject
 from PyQt5.QtCore import pyqtSignal
+from PyQt5.QtGui import QTextCursor
 
 from ninja_ide.core.file_handling import file_manager
 from ninja_ide.gui.editor import checkers
@@ -57,6 +59,8 @@ class NEditable(QObject):
         # Checkers:
         self.registered_checkers = []
         self._checkers_executed = 0
+        self._checkers_started_at = None
+        self._checkers_source_size = 0
 
         # Connect signals
         if self._nfile:
@@ -206,6 +210,19 @@ class NEditable(QObject):
             self.__editor.document().setModified(False)
             self.fileSaved.emit(self)
 
+    def replace_content(self, content):
+        """Replace the text of the editor in one undoable edit, the file
+        is not saved."""
+        cursor = self.__editor.textCursor()
+        position = cursor.position()
+        cursor.beginEditBlock()
+        cursor.select(QTextCursor.Document)
+        cursor.insertText(content)
+        cursor.endEditBlock()
+        cursor.setPosition(
+            min(position, self.__editor.document().characterCount() - 1))
+        self.__editor.setTextCursor(cursor)
+
     def include_checkers(self, lang='python'):
         """Initialize the Checkers, should be refreshed on checkers change."""
         self.registered_checkers = sorted(checkers.get_checkers_for(lang),
@@ -218,8 +235,21 @@ class NEditable(QObject):
             check.finished.connect(self.show_checkers_notifications)
 
     def run_checkers(self, content, path=None, encoding=None):
+        size = len(content)
+        self._checkers_started_at = time.perf_counter()
+        self._checkers_source_size = size
         for items in self.registered_checkers:
             checker = items[0]
+            if checkers.CHECKERS_STATS.is_over_budget(
+                    type(checker).__name__, size):
+                # Too slow for a source this big, drop its old results
+                reset = getattr(checker, 'reset', None)
+                if isinstance(reset, collections.Callable):
+                    reset()
+                self.show_checkers_notifications()
+                continue
+            checker.queued_at = time.perf_counter()
+            checker.source_size = size
             checker.run_checks()
 
     def show_checkers_notifications(self):
@@ -227,6 +257,10 @@ class NEditable(QObject):
         self._checkers_executed += 1
         if self._checkers_executed == len(self.registered_checkers):
             self._checkers_executed = 0
+            if self._checkers_started_at is not None:
+                checkers.CHECKERS_STATS.record_cycle(
+                    time.perf_counter() - self._checkers_started_at,
+                    self._checkers_source_size)
             self.checkersUpdated.emit(self)
 
     def update_checkers_display(self):
@@ -64,4 +64,12 @@ PROJECTS_TREE_ACTIONS = (
         },
         "connect": "open_project_properties"
     },
+    {
+        "action": {
+            "text": translations.TR_LINT_PROJECT,
+            "section": (translations.TR_MENU_PROJECT, None),
+            "weight": 300
+        },
+        "connect": "lint_project"
+    },
 )
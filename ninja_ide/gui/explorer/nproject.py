@@ -50,6 +50,8 @@ class NProject(QObject):
         self.program_params = project.get('programParams', '')
         self.venv = project.get('venv', '')
         self.related_projects = project.get('relatedProjects', [])
+        # .gitignore like patterns of files not to index
+        self.excluded_patterns = project.get('excluded-patterns', [])
         self.added_to_console = False
         # FIXME: This is handle in tree_projects_widget._change_current_project
         # Review to maybe improve.
@@ -89,6 +91,7 @@ class NProject(QObject):
         project['venv'] = self.venv
         project['programParams'] = self.program_params
         project['relatedProjects'] = self.related_projects
+        project['excluded-patterns'] = self.excluded_patterns
         if file_manager.file_exists(self.path, self._name + '.nja'):
             file_manager.delete_file(self.path, self._name + '.nja')
         json_manager.create_ninja_project(self.path, self._name, project)
@@ -326,6 +326,13 @@ class ProjectTreeColumn(QDialog):
             if path and main_container:
                 main_container.save_project(path)
 
+    def lint_project(self):
+        """Look for errors and style problems in the whole project."""
+        if self.current_project is not None:
+            project_linter = IDE.get_service('project_linter')
+            if project_linter is not None:
+                project_linter.lint_project(self.current_project.path)
+
     def create_new_project(self):
         wizard = new_project_manager.NewProjectManager(self)
         wizard.show()
@@ -415,6 +422,7 @@ class ProjectTreeColumn(QDialog):
         action_create_init = menu.addAction(translations.TR_CREATE_INIT)
         menu.addSeparator()
         action_run_project = menu.addAction(translations.TR_RUN_PROJECT)
+        action_lint_project = menu.addAction(translations.TR_LINT_PROJECT)
         action_properties = menu.addAction(translations.TR_PROJECT_PROPERTIES)
         action_show_file_size = menu.addAction(translations.TR_SHOW_FILESIZE)
         menu.addSeparator()
@@ -428,6 +436,7 @@ class ProjectTreeColumn(QDialog):
         action_create_init.triggered.connect(self.current_tree._create_init)
         action_run_project.triggered.connect(
             self.current_tree._execute_project)
+        action_lint_project.triggered.connect(self.lint_project)
         action_properties.triggered.connect(
             self.current_tree.open_project_properties)
         action_close.triggered.connect(self.current_tree._close_project)
@@ -37,6 +37,7 @@ from ninja_ide import translations
 # from ninja_ide.core import plugin_manager
 # from ninja_ide.core.file_handling import file_manager
 from ninja_ide.core.file_handling import nfilesystem
+from ninja_ide.core.file_handling import filesystem_notifications
 # from ninja_ide.core import plugin_services
 from ninja_ide.core import settings
 from ninja_ide.core import nsettings
@@ -854,6 +855,7 @@ class IDE(QMainWindow):
         #     self._save_unsaved_files(_unsaved_files)
         self.save_settings()
         self.goingDown.emit()
+        filesystem_notifications.NinjaFileSystemWatcher.shutdown_notification()
         # close python documentation server (if running)
         # main_container.close_python_doc()
         # Shutdown PluginManager
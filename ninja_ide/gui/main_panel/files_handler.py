@@ -31,7 +31,6 @@ from PyQt5.QtQuickWidgets import QQuickWidget
 from ninja_ide import resources
 from ninja_ide.gui.ide import IDE
 from ninja_ide.tools import ui_tools
-from ninja_ide.tools.locator import locator
 from ninja_ide.tools.logger import NinjaLogger
 logger = NinjaLogger(__name__)
 
@@ -98,8 +97,10 @@ class FilesHandler(QWidget):
         pattern = re.compile(search, re.IGNORECASE)
 
         model = []
-        for project_path in locator.files_paths:
-            files_in_project = locator.files_paths[project_path]
+        filesystem = IDE.get_service("ide").filesystem
+        for project_path, nproject in filesystem.get_projects().items():
+            files_in_project = filesystem.get_project_files(
+                project_path, nproject.extensions)
             base_project = os.path.basename(project_path)
             for file_path in files_in_project:
                 file_path = os.path.join(
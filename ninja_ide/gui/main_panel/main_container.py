@@ -109,7 +109,12 @@ class _MainContainer(QWidget):
             {
                 "target": "filesystem",
                 "signal_name": "projectClosed",
-                "slot": self._explore_code
+                "slot": self._forget_project_code
+            },
+            {
+                "target": "filesystem",
+                "signal_name": "projectFileChanged",
+                "slot": self._explore_changed_file_code
             }
         )
 
@@ -237,6 +242,16 @@ class _MainContainer(QWidget):
 
         self._code_locator.explore_file_code(path)
 
+    def _explore_changed_file_code(self, event, path):
+        """Update locator metadata for a file changed in a project"""
+
+        self._code_locator.explore_changed_file(event, path)
+
+    def _forget_project_code(self, project_path):
+        """Remove the locator metadata of a closed project"""
+
+        self._code_locator.forget_project(project_path)
+
     def current_editor_changed(self, filename):
         """Notify the new filename of the current editor"""
 
@@ -8,71 +8,32 @@ Rectangle {
 
     signal open(int row)
 
-    property var pep8Model: []
-    property var errorModel: []
+    // Only one item is expanded at a time
+    property int expandedIndex: -1
 
     function open_item() {
-        var item;
-        item = listFiles.model.get(listFiles.currentIndex);
-        root.open(item.row);
+        root.open(listFiles.currentItem.lineRow);
     }
 
-    function set_pep8_model(model) {
-        listFiles.currentIndex = 0;
-        pep8Model = model;
-        refresh_model();
-    }
-
-    function set_error_model(model) {
-        listFiles.currentIndex = 0;
-        errorModel = model;
-        refresh_model();
-    }
-
-    function refresh_model() {
-        clear_model();
-        for(var i = 0; i < pep8Model.length; i++) {
-            listFiles.model.append(
-                {"name": pep8Model[i][0],
-                "codeLine": pep8Model[i][1],
-                "row": pep8Model[i][2],
-                "column": pep8Model[i][3],
-                "bug": false,
-                "expanded": false});
-        }
-
-        for(i = 0; i < errorModel.length; i++) {
-            listFiles.model.append(
-                {"name": errorModel[i][0],
-                "codeLine": errorModel[i][1],
-                "row": errorModel[i][2],
-                "column": errorModel[i][3],
-                "bug": true,
-                "expanded": false});
-        }
-    }
-
-    function clear_model() {
-        listFiles.model.clear();
+    function expand_item(index) {
+        expandedIndex = -1;
+        listFiles.currentIndex = index;
+        expandedIndex = index;
     }
 
     function next_item() {
-        for (var i = 0; i < listFiles.model.count; i++) {
-            if (listFiles.currentIndex == (listFiles.count - 1)) {
-                listFiles.currentIndex = 0;
-            } else {
-                listFiles.incrementCurrentIndex();
-            }
+        if (listFiles.currentIndex == (listFiles.count - 1)) {
+            listFiles.currentIndex = 0;
+        } else {
+            listFiles.incrementCurrentIndex();
         }
     }
 
     function previous_item() {
-        for (var i = 0; i < listFiles.model.count; i++) {
-            if (listFiles.currentIndex == 0) {
-                listFiles.currentIndex = (listFiles.count - 1);
-            } else {
-                listFiles.decrementCurrentIndex();
-            }
+        if (listFiles.currentIndex == 0) {
+            listFiles.currentIndex = (listFiles.count - 1);
+        } else {
+            listFiles.decrementCurrentIndex();
         }
     }
 
@@ -84,6 +45,8 @@ Rectangle {
             width: parent.width
             height: expanded ? 100 : 55;
             property bool current: ListView.isCurrentItem
+            property bool expanded: index == root.expandedIndex
+            property int lineRow: row
             color: item.current ? theme.FilesHandlerCurrentItem : theme.FilesHandlerListView
 
             Behavior on height {
@@ -102,9 +65,7 @@ Rectangle {
                 anchors.fill: parent
 
                 onClicked: {
-                    listFiles.model.get(listFiles.currentIndex).expanded = false;
-                    listFiles.currentIndex = index;
-                    listFiles.model.get(listFiles.currentIndex).expanded = true;
+                    root.expand_item(index);
                 }
             }
 
@@ -115,14 +76,10 @@ Rectangle {
                 root.previous_item();
             }
             Keys.onEnterPressed: {
-                listFiles.model.get(listFiles.currentIndex).expanded = false;
-                listFiles.currentIndex = index;
-                listFiles.model.get(listFiles.currentIndex).expanded = true;
+                root.expand_item(index);
             }
             Keys.onReturnPressed: {
-                listFiles.model.get(listFiles.currentIndex).expanded = false;
-                listFiles.currentIndex = index;
-                listFiles.model.get(listFiles.currentIndex).expanded = true;
+                root.expand_item(index);
             }
 
             Image {
@@ -197,7 +154,7 @@ Rectangle {
         }
 
         spacing: 2
-        model: ListModel {}
+        model: errorsModel
         delegate: tabDelegate
         highlightMoveDuration: 200
 
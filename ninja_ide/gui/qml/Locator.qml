@@ -10,7 +10,7 @@ Rectangle {
     property string filterComposite: ""
 
     signal textChanged(string text)
-    signal open(string path, int lineno)
+    signal open(int index)
     signal fetchMore
 
     function activateInput() {
@@ -21,13 +21,9 @@ Rectangle {
         root.filterComposite = filter;
     }
 
-    function loadItem(type, name, lineno, path, dpath, color) {
-        itemsModel.append({"type": type, "name": name, "lineno": lineno,
-                           "path": path, "displayPath": dpath, "colorType": color});
-    }
-
-    function clear() {
-        itemsModel.clear();
+    function resetCurrent() {
+        listResults.currentIndex = listResults.count > 0 ? 0 : -1;
+        listResults.positionViewAtBeginning();
     }
 
     function cleanText() {
@@ -38,36 +34,16 @@ Rectangle {
         input.text = text;
     }
 
-    function currentItem() {
-        if (listResults.currentIndex > -1) {
-            var item = itemsModel.get(listResults.currentIndex);
-            return [item.type, item.name, item.path, item.lineno];
-        }
+    function currentIndex() {
+        return listResults.currentIndex;
     }
 
     function openCurrent() {
         if (listResults.currentIndex > -1) {
-            var item = itemsModel.get(listResults.currentIndex);
-            root.open(item.path, item.lineno);
+            root.open(listResults.currentIndex);
         }
     }
 
-    ListModel {
-        id: itemsModel
-        ListElement {
-            type: ""
-            name: ""
-            lineno: 0
-            path: ""
-            displayPath: ""
-            colorType: ""
-        }
-    }
-
-    Component.onCompleted: {
-        itemsModel.clear();
-    }
-
     Column {
         id: filtersCol
         anchors {
@@ -300,7 +276,7 @@ Rectangle {
             anchors.fill: parent
             clip: true
             spacing: 2
-            model: itemsModel
+            model: locatorModel
             //ScrollBar.vertical: ScrollBar {}
             delegate: Rectangle {
                 id: listItem
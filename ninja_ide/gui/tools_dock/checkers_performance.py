@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+import os
+
+from PyQt5.QtWidgets import (
+    QWidget,
+    QVBoxLayout,
+    QHBoxLayout,
+    QPushButton,
+    QTreeWidget,
+    QTreeWidgetItem,
+    QFileDialog
+)
+from PyQt5.QtCore import QTimer
+
+from ninja_ide import translations
+from ninja_ide.gui.editor import checkers
+from ninja_ide.gui.tools_dock.tools_dock import _ToolsDock
+from ninja_ide.tools.logger import NinjaLogger
+
+logger = NinjaLogger(__name__)
+
+# Refresh the table while it is visible (milliseconds)
+REFRESH_INTERVAL = 1000
+
+
+def _ms(seconds):
+    return "{:.1f}".format(seconds * 1000)
+
+
+class CheckersPerformanceWidget(QWidget):
+    """Timings of the editor checkers"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        _ToolsDock.register_widget(
+            translations.TR_CHECKERS_PERFORMANCE, self)
+
+    def install_widget(self):
+        container = QVBoxLayout(self)
+        container.setContentsMargins(3, 0, 3, 0)
+        self._tree = QTreeWidget()
+        self._tree.setRootIsDecorated(False)
+        self._tree.setHeaderLabels([
+            translations.TR_CHECKER,
+            translations.TR_CHECKER_RUNS,
+            translations.TR_CHECKER_WALL_AVG,
+            translations.TR_CHECKER_WALL_MAX,
+            translations.TR_CHECKER_CPU_AVG,
+            translations.TR_CHECKER_WAIT_AVG,
+            translations.TR_CHECKER_LAST_SIZE,
+            translations.TR_CHECKER_LAST_MESSAGES,
+            translations.TR_CHECKER_STATUS
+        ])
+        container.addWidget(self._tree)
+        buttons = QHBoxLayout()
+        buttons.addStretch(1)
+        btn_reset = QPushButton(translations.TR_CHECKERS_RESET_BUDGET)
+        btn_export = QPushButton(translations.TR_EXPORT_JSON)
+        buttons.addWidget(btn_reset)
+        buttons.addWidget(btn_export)
+        container.addLayout(buttons)
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(REFRESH_INTERVAL)
+        self._timer.timeout.connect(self.refresh)
+        btn_reset.clicked.connect(self._reset_budget)
+        btn_export.clicked.connect(self._export)
+
+    def refresh(self):
+        self._tree.clear()
+        items = []
+        for stats in checkers.CHECKERS_STATS.summary():
+            status = translations.TR_CHECKER_ENABLED
+            if stats["disabled_above"] is not None:
+                status = translations.TR_CHECKER_DISABLED_ABOVE.format(
+                    stats["disabled_above"])
+            items.append(QTreeWidgetItem([
+                stats["name"],
+                str(stats["runs"]),
+                _ms(stats["wall_avg"]),
+                _ms(stats["wall_max"]),
+                _ms(stats["cpu_avg"]),
+                _ms(stats["wait_avg"]),
+                str(stats["last_size"]),
+                str(stats["last_messages"]),
+                status
+            ]))
+        self._tree.addTopLevelItems(items)
+
+    def _reset_budget(self):
+        checkers.CHECKERS_STATS.reset_budget()
+        self.refresh()
+
+    def _export(self):
+        path = QFileDialog.getSaveFileName(
+            self, translations.TR_EXPORT_JSON,
+            os.path.expanduser("~"), "JSON (*.json)")[0]
+        if not path:
+            return
+        try:
+            checkers.CHECKERS_STATS.export(path)
+        except OSError as reason:
+            logger.warning("Could not export checkers timings: {}".format(
+                reason))
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self._timer.start()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self._timer.stop()
+
+
+CheckersPerformanceWidget()
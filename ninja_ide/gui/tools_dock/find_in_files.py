@@ -18,8 +18,15 @@
 import queue
 import re
 import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import as_completed
+from concurrent.futures.process import BrokenProcessPool
+from fnmatch import fnmatch
 
 from PyQt5.QtWidgets import (
+    QApplication,
     QWidget,
     QVBoxLayout,
     QHBoxLayout,
@@ -34,53 +41,237 @@ from PyQt5.QtWidgets import (
     QTreeView,
     QFrame,
     QStyle,
-    QItemDelegate
+    QItemDelegate,
+    QMessageBox
 )
 from PyQt5.QtCore import (
     QObject,
     QDir,
     QAbstractItemModel,
-    QFile,
-    QTextStream,
     pyqtSignal,
     pyqtSlot,
-    QRegExp,
     Qt,
     QRect,
     QThread,
     QModelIndex
 )
 from PyQt5.QtGui import QPalette, QColor
+from ninja_ide import resources
 from ninja_ide.gui.ide import IDE
+from ninja_ide.tools import grep_engine
+from ninja_ide.tools import replace_engine
+from ninja_ide.tools import trigram_index
+from ninja_ide.tools.locator import locator_db
+from ninja_ide.tools.logger import NinjaLogger
 from ninja_ide.tools import ui_tools
 from ninja_ide.core import settings
 from ninja_ide import translations
 from ninja_ide.gui.tools_dock.tools_dock import _ToolsDock
 
 
+logger = NinjaLogger('ninja_ide.gui.tools_dock.find_in_files')
+
+# Send the results to the view every RESULTS_BATCH_SIZE files with matches
+# or RESULTS_BATCH_DELAY seconds
+RESULTS_BATCH_SIZE = 50
+RESULTS_BATCH_DELAY = 0.1
+
+# Fewer files than this are indexed in the thread, without a process
+# pool (the files saved, changed outside...)
+INDEX_POOL_MIN_FILES = 64
+
+# Original contents of the files changed by the last replace
+REPLACE_JOURNAL = os.path.join(
+    resources.NINJA_KNOWLEDGE_PATH, 'replace_journal')
+
+
 class FindInFilesWorker(QObject):
 
-    finished = pyqtSignal()
-    resultAvailable = pyqtSignal('PyQt_PyObject')
+    # search id, matches over the limit, paths of the files with matches
+    finished = pyqtSignal(int, int, 'PyQt_PyObject')
+    # search id, [(path, [(lineno, line)])]
+    resultsAvailable = pyqtSignal(int, 'PyQt_PyObject')
+    # files changed, matches replaced, paths that could not be written
+    replaceFinished = pyqtSignal(int, int, 'PyQt_PyObject')
+    # paths restored, paths changed since the replace
+    undoFinished = pyqtSignal('PyQt_PyObject', 'PyQt_PyObject')
 
-    def find_in_files(self, dir_name, filters, regexp, recursive):
-        """Trigger the find in files thread and return the lines found"""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._cancel = False
+        # Id of the last search requested, the older ones queued are
+        # skipped
+        self._latest_search_id = 0
+        # Kept between searches, so the worker processes remember the
+        # encodings of the files
+        self._pool = None
+
+    def cancel(self, search_id=None):
+        """Stop the running search, and with search_id the queued ones
+        older than it. It can be called from any thread"""
+        if search_id is not None:
+            self._latest_search_id = search_id
+        self._cancel = True
+
+    def shutdown(self):
+        """Stop the worker processes, once the thread is finished"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+
+    @pyqtSlot(int, 'PyQt_PyObject', 'PyQt_PyObject', 'PyQt_PyObject', bool,
+              'PyQt_PyObject', int, 'PyQt_PyObject', 'PyQt_PyObject')
+    def find_in_files(self, search_id, dir_name, filters, pattern,
+                      recursive, paths=None, max_matches=0, index=None,
+                      buffers=None):
+        """Search pattern (a SearchPattern of grep_engine) in the files
+        of dir_name matching filters and emit the lines found
+
+        paths are the files of the project index, when given the folder
+        is not walked again. Beyond max_matches (if not 0) the matches
+        are only counted. index is the path of the trigram index of the
+        project, used to skip the files that can not match. buffers is
+        {path: text} of the files open in editors, searched first and
+        instead of their content on disk."""
 
         self._cancel = False
+        # After resetting _cancel, a search requested meanwhile cancels
+        # this one too
+        if search_id < self._latest_search_id:
+            return
+        self.search_id = search_id
+        self.max_matches = max_matches
         self.recursive = recursive
-        self.search_pattern = regexp
+        self.search_pattern = pattern
         self.filters = filters
-        self.queue = queue.Queue()
-        self.queue.put(dir_name)
         self.root_dir = dir_name
-        # Start!
-        self.start_worker()
+        self.max_size = settings.FIND_IN_FILES_MAX_FILE_SIZE * 1024
+        if paths is None:
+            paths = self._walk(dir_name)
+        else:
+            paths = [path for path in paths
+                     if any(fnmatch(os.path.basename(path), filter_)
+                            for filter_ in filters)]
+        buffers = buffers or {}
+        paths = [path for path in paths if path not in buffers]
+        if index is not None and os.path.exists(index):
+            paths = self._narrow(index, paths)
+        self.search_paths(paths, buffers)
+
+    def _narrow(self, index_path, paths):
+        try:
+            index = trigram_index.TrigramIndex(index_path)
+            try:
+                return index.candidates(self.search_pattern.literals, paths)
+            finally:
+                index.close()
+        except Exception as reason:
+            logger.error('find_in_files, trigram index error: %r' % reason)
+            return paths
+
+    def search_paths(self, paths, buffers=None):
+        """Spread paths across a process pool and emit the results in
+        batches as the chunks are done, the results of buffers ({path:
+        text}) are emitted first"""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor()
+        futures = [
+            self._pool.submit(grep_engine.grep_files, chunk,
+                              self.search_pattern, self.max_size)
+            for chunk in grep_engine.chunks(paths)]
+        self._batch = []
+        self._last_emit = time.monotonic()
+        self._matches = 0
+        self._matched_paths = []
+        omitted = 0
+        # Searched here while the processes read the files
+        for file_path, text in (buffers or {}).items():
+            if self._cancel:
+                break
+            omitted += self._add_result(
+                file_path, grep_engine.grep_text(text, self.search_pattern))
+        self._emit_batch()
+        try:
+            for future in as_completed(futures):
+                if self._cancel:
+                    break
+                for file_path, lines in future.result():
+                    omitted += self._add_result(file_path, lines)
+                if (len(self._batch) >= RESULTS_BATCH_SIZE or
+                        time.monotonic() - self._last_emit >=
+                        RESULTS_BATCH_DELAY):
+                    self._emit_batch()
+        except BrokenProcessPool as reason:
+            # A worker process died, start new ones for the next search
+            logger.error('find_in_files, error: %r' % reason)
+            self._pool = None
+        finally:
+            for future in futures:
+                future.cancel()
+
+        if not self._cancel:
+            self._emit_batch()
+            self.finished.emit(self.search_id, omitted, self._matched_paths)
+
+    def _add_result(self, file_path, lines):
+        """Queue the lines of a file, return the number of them over
+        the limit of matches"""
+        if not lines:
+            return 0
+        self._matched_paths.append(file_path)
+        omitted = 0
+        if self.max_matches:
+            room = max(self.max_matches - self._matches, 0)
+            omitted = max(len(lines) - room, 0)
+            lines = lines[:room]
+        if lines:
+            self._matches += len(lines)
+            self._batch.append((file_path, lines))
+        return omitted
+
+    def _emit_batch(self):
+        if self._batch:
+            self.resultsAvailable.emit(self.search_id, self._batch)
+            self._batch = []
+        self._last_emit = time.monotonic()
+
+    @pyqtSlot('PyQt_PyObject', 'PyQt_PyObject', 'PyQt_PyObject',
+              'PyQt_PyObject')
+    def replace_in_files(self, paths, pattern, replacement, journal_path):
+        """Replace the matches of pattern in paths, the original contents
+        are recorded in the journal of journal_path, which forgets the
+        previous replace"""
+
+        journal = replace_engine.ReplaceJournal(journal_path)
+        journal.clear()
+        files = matches = 0
+        failed = []
+        for path in paths:
+            try:
+                count = replace_engine.replace_file(
+                    path, pattern, replacement, journal)
+            except (OSError, UnicodeError):
+                failed.append(path)
+                continue
+            if count:
+                files += 1
+                matches += count
+        self.replaceFinished.emit(files, matches, failed)
+
+    @pyqtSlot('PyQt_PyObject')
+    def undo_replace(self, journal_path):
+        journal = replace_engine.ReplaceJournal(journal_path)
+        restored, skipped = journal.undo()
+        self.undoFinished.emit(restored, skipped)
 
-    def start_worker(self):
+    def _walk(self, dir_name):
         file_filter = QDir.Files | QDir.NoDotAndDotDot | QDir.Readable
         dir_filter = QDir.Dirs | QDir.NoDotAndDotDot | QDir.Readable
-        while not self._cancel and not self.queue.empty():
-            current_dir = QDir(self.queue.get())
+        folders = queue.Queue()
+        folders.put(dir_name)
+        paths = []
+        while not self._cancel and not folders.empty():
+            current_dir = QDir(folders.get())
             # Skip not readable dirs!
             if not current_dir.isReadable():
                 continue
@@ -88,37 +279,146 @@ class FindInFilesWorker(QObject):
             if self.recursive:
                 current_sub_dirs = current_dir.entryInfoList(dir_filter)
                 for one_dir in current_sub_dirs:
-                    self.queue.put(one_dir.absoluteFilePath())
+                    folders.put(one_dir.absoluteFilePath())
             # All files in sub_dir first apply the filters
             current_files = current_dir.entryInfoList(
                 self.filters, file_filter)
-            # Process all files in current dir
-            for one_file in current_files:
-                self._grep_file(
-                    one_file.absoluteFilePath(), one_file.fileName())
+            paths.extend(
+                one_file.absoluteFilePath() for one_file in current_files)
+        return paths
 
-        self.finished.emit()
 
-    def _grep_file(self, file_path, file_name):
-        """Search for each line inside the file"""
-        file_obj = QFile(file_path)
-        if not file_obj.open(QFile.ReadOnly):
+class TrigramIndexThread(QThread):
+    """Build the trigram indexes of the projects and update them with
+    the changes reported by their watchers"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._cancel = False
+        # Projects to index, and path -> project path of the files
+        # changed, waiting for the thread
+        self._projects = []
+        self._changes = {}
+        self._lock = threading.Lock()
+        self.finished.connect(self._start_pending)
+
+    def index_project(self, project_path):
+        with self._lock:
+            if project_path not in self._projects:
+                self._projects.append(project_path)
+        self._start_pending()
+
+    def file_changed(self, event, path):
+        ninjaide = IDE.get_service("ide")
+        for project_path in ninjaide.filesystem.get_projects():
+            if path.startswith(project_path + os.sep):
+                with self._lock:
+                    self._changes[path] = project_path
+                self._start_pending()
+                return
+
+    def forget_project(self, project_path):
+        """Stop updating the index of a closed project, it is kept on
+        disk for the next time"""
+        with self._lock:
+            if project_path in self._projects:
+                self._projects.remove(project_path)
+            self._changes = {
+                path: project for path, project in self._changes.items()
+                if project != project_path}
+
+    def cancel(self):
+        """Stop indexing and drop the pending work"""
+        with self._lock:
+            self._projects = []
+            self._changes = {}
+        self._cancel = True
+
+    def _start_pending(self):
+        if (self._projects or self._changes) and not self.isRunning():
+            self._cancel = False
+            self.start()
+
+    def run(self):
+        with self._lock:
+            projects, self._projects = self._projects, []
+            changes, self._changes = self._changes, {}
+        try:
+            for project_path in projects:
+                if self._cancel:
+                    break
+                self._index_project(project_path)
+            by_project = {}
+            for path, project_path in changes.items():
+                by_project.setdefault(project_path, []).append(path)
+            for project_path, paths in by_project.items():
+                if self._cancel:
+                    break
+                self._index_files(project_path, paths)
+        except Exception as reason:
+            logger.error('TrigramIndexThread, error: %r' % reason)
+
+    def _index_project(self, project_path):
+        ninjaide = IDE.get_service("ide")
+        watcher = ninjaide.filesystem.get_project_watcher(project_path)
+        # Not walked yet, it is indexed when it is opened
+        if watcher is None or not watcher.is_ready():
+            return
+        files = dict(watcher.entries())
+        index = trigram_index.TrigramIndex(
+            trigram_index.index_path(project_path))
+        try:
+            known = index.files()
+            for path in known:
+                if path not in files:
+                    index.remove(path)
+            pending = [path for path, mtime in files.items()
+                       if known.get(path) != mtime]
+            self._store(index, pending)
+        finally:
+            index.close()
+
+    def _index_files(self, project_path, paths):
+        index = trigram_index.TrigramIndex(
+            trigram_index.index_path(project_path))
+        try:
+            ninjaide = IDE.get_service("ide")
+            indexed = []
+            for path in paths:
+                if (not os.path.isfile(path) or
+                        ninjaide.filesystem.is_ignored(path)):
+                    index.remove(path)
+                else:
+                    indexed.append(path)
+            self._store(index, indexed)
+        finally:
+            index.close()
+
+    def _store(self, index, paths):
+        if not paths:
+            index.commit()
             return
-        stream = QTextStream(file_obj)
-        lines = []
-        append = lines.append
-        line_index = 0
-        line = stream.readLine()
-        while not self._cancel and not stream.atEnd():
-            column = self.search_pattern.indexIn(line)
-            if column != -1:
-                append((line_index, line))
-            # Take the next line
-            line = stream.readLine()
-            line_index += 1
-
-        p = os.path.join(self.root_dir, file_path)
-        self.resultAvailable.emit((p, lines))
+        committer = locator_db.BatchCommitter(index)
+        pool = None
+        if len(paths) >= INDEX_POOL_MIN_FILES:
+            pool = ProcessPoolExecutor()
+            extracted = pool.map(trigram_index.extract, paths, chunksize=16)
+        else:
+            # A few changed files, not worth starting processes for them
+            extracted = map(trigram_index.extract, paths)
+        try:
+            for path, mtime, grams in extracted:
+                if self._cancel:
+                    break
+                if mtime is None:
+                    index.remove(path)
+                else:
+                    index.store(path, mtime, grams)
+                committer.stored()
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=not self._cancel)
+        committer.commit()
 
 
 class SearchResultTreeView(QTreeView):
@@ -136,12 +436,19 @@ class SearchResultTreeView(QTreeView):
     def clear(self):
         self._model.clear()
 
-    def add_result(self, results):
-        self._model.add_result(results)
+    def add_results(self, results):
+        self._model.add_results(results)
 
 
 class FindInFilesWidget(QWidget):
 
+    findRequested = pyqtSignal(int, 'PyQt_PyObject', 'PyQt_PyObject',
+                               'PyQt_PyObject', bool, 'PyQt_PyObject', int,
+                               'PyQt_PyObject', 'PyQt_PyObject')
+    replaceRequested = pyqtSignal('PyQt_PyObject', 'PyQt_PyObject',
+                                  'PyQt_PyObject', 'PyQt_PyObject')
+    undoRequested = pyqtSignal('PyQt_PyObject')
+
     def __init__(self, parent=None):
         super().__init__(parent)
         _ToolsDock.register_widget(translations.TR_FIND_IN_FILES, self)
@@ -152,6 +459,15 @@ class FindInFilesWidget(QWidget):
         self._actions = FindInFilesActions(self)
         container.addWidget(self._actions)
         self.__count = 0
+        self.__search_id = 0
+        # (pattern, replacement) of the search previewing a replace
+        self.__replacement = None
+        self.__matched_paths = []
+        self.__filters = []
+        # (editable, text before, text after) of the last replace
+        self.__editors_journal = []
+        self.__editors_replaced = (0, 0)
+        self.__editors_restored = 0
 
         top_widget = QFrame()
         top_layout = QVBoxLayout(top_widget)
@@ -178,12 +494,38 @@ class FindInFilesWidget(QWidget):
         self._main_container = IDE.get_service("main_container")
         # Search worker
         self._search_worker = FindInFilesWorker()
-        search_thread = QThread()
-        self._search_worker.moveToThread(search_thread)
-        self._search_worker.resultAvailable.connect(self._on_worker_finished)
-        search_thread.finished.connect(search_thread.deleteLater)
+        self._search_thread = QThread(self)
+        self._search_worker.moveToThread(self._search_thread)
+        self._search_worker.resultsAvailable.connect(
+            self._on_results_available)
+        self._search_worker.finished.connect(self._on_search_finished)
+        self._search_worker.replaceFinished.connect(
+            self._on_replace_finished)
+        self._search_worker.undoFinished.connect(self._on_undo_finished)
+        self.findRequested.connect(self._search_worker.find_in_files)
+        self.replaceRequested.connect(self._search_worker.replace_in_files)
+        self.undoRequested.connect(self._search_worker.undo_replace)
+        self._search_thread.finished.connect(self._search_worker.deleteLater)
+        self._search_thread.start()
+        # Trigram indexes
+        self._index_thread = TrigramIndexThread(self)
+        if settings.FIND_IN_FILES_INDEX:
+            filesystem = IDE.get_service("ide").filesystem
+            filesystem.projectOpened.connect(self._index_thread.index_project)
+            filesystem.projectFileChanged.connect(
+                self._index_thread.file_changed)
+            filesystem.projectClosed.connect(
+                self._index_thread.forget_project)
+            for project_path in filesystem.get_projects():
+                self._index_thread.index_project(project_path)
+        QApplication.instance().aboutToQuit.connect(self._stop_worker)
 
         self._actions.searchRequested.connect(self._on_search_requested)
+        self._actions.previewRequested.connect(self._on_preview_requested)
+        self._actions.replaceAllRequested.connect(self._replace_all)
+        self._actions.undoReplaceRequested.connect(self._undo_replace)
+        self._actions.set_undo_enabled(
+            len(replace_engine.ReplaceJournal(REPLACE_JOURNAL)) > 0)
         self._tree_results.activated.connect(self._go_to)
 
     def _clear_results(self):
@@ -199,32 +541,183 @@ class FindInFilesWidget(QWidget):
             # Open the file and jump to line
             self._main_container.open_file(file_name, line=lineno)
 
-    @pyqtSlot('PyQt_PyObject')
-    def _on_worker_finished(self, lines):
-        self.__count += len(lines[-1])
+    @pyqtSlot(int, 'PyQt_PyObject')
+    def _on_results_available(self, search_id, results):
+        if search_id != self.__search_id:
+            # Queued before the search was replaced
+            return
+        self.__count += sum(len(lines) for _, lines in results)
+        self._show_message(translations.TR_MATCHES_FOUND.format(self.__count))
+        if self.__replacement is not None:
+            # Preview the lines as they are after the replace
+            pattern, replacement = self.__replacement
+            results = [
+                (file_path, [
+                    (lineno, replace_engine.preview_line(
+                        line, pattern, replacement))
+                    for lineno, line in lines])
+                for file_path, lines in results]
+        self._tree_results.add_results(results)
+
+    @pyqtSlot(int, int, 'PyQt_PyObject')
+    def _on_search_finished(self, search_id, omitted, matched_paths):
+        if search_id != self.__search_id:
+            return
+        if omitted:
+            self._show_message(
+                translations.TR_MATCHES_FOUND.format(self.__count) + " " +
+                translations.TR_MORE_MATCHES.format(omitted))
+        if self.__replacement is not None:
+            self.__matched_paths = matched_paths
+            self._actions.set_replace_enabled(True)
+
+    def _show_message(self, message):
         self._message_frame.show()
-        self._message_label.setText(
-            translations.TR_MATCHES_FOUND.format(self.__count))
-        self._tree_results.add_result(lines)
+        self._message_label.setText(message)
 
     @pyqtSlot('QString', bool, bool, bool)
     def _on_search_requested(self, to_find, cs, regex, wo):
         self._clear_results()
-        type_ = QRegExp.FixedString
-        if regex:
-            type_ = QRegExp.RegExp
-        if wo:
-            type_ = QRegExp.RegExp
-            to_find = "|".join(["\\b" + word.strip() + "\\b"
-                                for word in to_find.split()])
+        try:
+            pattern = grep_engine.compile_pattern(to_find, cs, regex, wo)
+        except re.error:
+            return
+        self._start_search(pattern)
+
+    @pyqtSlot('QString', 'QString', bool, bool, bool)
+    def _on_preview_requested(self, to_find, to_replace, cs, regex, wo):
+        """Search to_find and show the lines found with the replace"""
+        self._clear_results()
+        try:
+            pattern = grep_engine.compile_pattern(to_find, cs, regex, wo)
+            replacement = replace_engine.compile_replacement(
+                to_replace, pattern, regex)
+        except re.error:
+            return
+        self._start_search(pattern, replacement)
+
+    def _start_search(self, pattern, replacement=None):
+        self.__replacement = None
+        if replacement is not None:
+            self.__replacement = (pattern, replacement)
+        self.__matched_paths = []
+        self._actions.set_replace_enabled(False)
         filters = re.split(",", "*.py")
-        pattern = QRegExp(to_find, cs, type_)
-        self._search_worker.find_in_files(
-            self._actions.current_project_path,
-            filters,
-            pattern,
-            recursive=True
-        )
+        self.__filters = filters
+        project_path = self._actions.current_project_path
+        ninjaide = IDE.get_service("ide")
+        paths = None
+        index = None
+        watcher = ninjaide.filesystem.get_project_watcher(project_path)
+        if watcher is not None and watcher.is_ready():
+            paths = ninjaide.filesystem.get_project_files(project_path)
+            if settings.FIND_IN_FILES_INDEX:
+                index = trigram_index.index_path(project_path)
+        # Snapshot of the editors, with the changes not saved yet
+        buffers = {editable.file_path: editable.editor.text
+                   for editable in self._open_editables(filters)}
+        # The worker thread picks the new search when the current one
+        # stops, skipping the ones queued before it
+        self.__search_id += 1
+        self._search_worker.cancel(self.__search_id)
+        self.findRequested.emit(
+            self.__search_id, project_path, filters, pattern, True, paths,
+            settings.FIND_IN_FILES_MAX_MATCHES, index, buffers)
+
+    def _open_editables(self, filters):
+        """Return the editables of the files open in the scope"""
+        project_path = self._actions.current_project_path
+        if not project_path:
+            return []
+        ninjaide = IDE.get_service("ide")
+        editables = []
+        for nfile in ninjaide.opened_files:
+            editable = ninjaide.get_editable(nfile)
+            path = nfile.file_path
+            if (editable is None or editable.editor is None or
+                    path is None or
+                    not path.startswith(project_path + os.sep)):
+                continue
+            if any(fnmatch(os.path.basename(path), filter_)
+                   for filter_ in filters):
+                editables.append(editable)
+        return editables
+
+    def _replace_all(self):
+        """Apply the replace previewed, the files open are changed in
+        their editors and the others on disk by the worker"""
+        if self.__replacement is None:
+            return
+        answer = QMessageBox.question(
+            self, translations.TR_REPLACE_FILES_CONTENTS,
+            translations.TR_ARE_YOU_SURE_WANT_TO_REPLACE,
+            QMessageBox.Yes | QMessageBox.No)
+        if answer != QMessageBox.Yes:
+            return
+        pattern, replacement = self.__replacement
+        self.__replacement = None
+        self._actions.set_replace_enabled(False)
+        self._actions.set_undo_enabled(False)
+        disk_paths = set(self.__matched_paths)
+        self.__editors_journal = []
+        files = matches = 0
+        for editable in self._open_editables(self.__filters):
+            disk_paths.discard(editable.file_path)
+            text = editable.editor.text
+            data, count = replace_engine.replace_buffer(
+                text.encode('utf-8'), pattern, replacement)
+            if not count:
+                continue
+            editable.replace_content(data.decode('utf-8', 'replace'))
+            self.__editors_journal.append(
+                (editable, text, editable.editor.text))
+            files += 1
+            matches += count
+        self.__editors_replaced = (files, matches)
+        self.replaceRequested.emit(
+            sorted(disk_paths), pattern, replacement, REPLACE_JOURNAL)
+
+    @pyqtSlot(int, int, 'PyQt_PyObject')
+    def _on_replace_finished(self, files, matches, failed):
+        editor_files, editor_matches = self.__editors_replaced
+        message = translations.TR_MATCHES_REPLACED.format(
+            matches + editor_matches, files + editor_files)
+        if failed:
+            message += " " + translations.TR_FILES_NOT_WRITTEN.format(
+                len(failed))
+        self._show_message(message)
+        self._actions.set_undo_enabled(True)
+
+    def _undo_replace(self):
+        """Revert the last replace in the editors and files that were
+        not changed since"""
+        self._actions.set_undo_enabled(False)
+        ninjaide = IDE.get_service("ide")
+        self.__editors_restored = 0
+        for editable, before, after in self.__editors_journal:
+            if (ninjaide.get_editable(editable.nfile) is editable and
+                    editable.editor.text == after):
+                editable.replace_content(before)
+                self.__editors_restored += 1
+        self.__editors_journal = []
+        self.undoRequested.emit(REPLACE_JOURNAL)
+
+    @pyqtSlot('PyQt_PyObject', 'PyQt_PyObject')
+    def _on_undo_finished(self, restored, skipped):
+        message = translations.TR_REPLACE_UNDONE.format(
+            len(restored) + self.__editors_restored)
+        if skipped:
+            message += " " + translations.TR_FILES_NOT_RESTORED.format(
+                len(skipped))
+        self._show_message(message)
+
+    def _stop_worker(self):
+        self._index_thread.cancel()
+        self._index_thread.wait()
+        self._search_worker.cancel()
+        self._search_thread.quit()
+        self._search_thread.wait()
+        self._search_worker.shutdown()
 
     def showEvent(self, event):
         self._actions._line_search.setFocus()
@@ -324,25 +817,28 @@ class SearchResultModel(QAbstractItemModel):
         super().__init__()
         self.root_item = TreeItem(None)
 
-    def add_result(self, result):
-        file_path = result[0]
-        items = result[1]
-        if items:
+    def add_results(self, results):
+        """Append the files of results [(path, [(lineno, line)])], with
+        their lines, in one insertion"""
+        parent_items = []
+        for file_path, items in results:
             parent = ResultItem()
             parent.file_path = file_path
             parent_item = TreeItem(parent, self.root_item)
-            self.beginInsertRows(QModelIndex(), 0, 0)
-            self.root_item.append_child(parent_item)
-            self.endInsertRows()
             for item in items:
                 io = ResultItem()
                 io.parent = parent
                 io.lineno = item[0]
                 io.text = item[1]
-                item_tree = TreeItem(io, parent_item)
-                self.beginInsertRows(QModelIndex(), 0, 0)
-                parent_item.append_child(item_tree)
-                self.endInsertRows()
+                parent_item.append_child(TreeItem(io, parent_item))
+            parent_items.append(parent_item)
+        if not parent_items:
+            return
+        first = self.root_item.child_count()
+        self.beginInsertRows(
+            QModelIndex(), first, first + len(parent_items) - 1)
+        self.root_item.child_items.extend(parent_items)
+        self.endInsertRows()
 
     def parent(self, index=QModelIndex()):
         if not index.isValid():
@@ -401,6 +897,9 @@ class SearchResultModel(QAbstractItemModel):
 class FindInFilesActions(QWidget):
 
     searchRequested = pyqtSignal('QString', bool, bool, bool)
+    previewRequested = pyqtSignal('QString', 'QString', bool, bool, bool)
+    replaceAllRequested = pyqtSignal()
+    undoReplaceRequested = pyqtSignal()
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -421,7 +920,20 @@ class FindInFilesActions(QWidget):
         self._line_search = QLineEdit()
         self._line_search.setPlaceholderText(translations.TR_SEARCH_FOR)
         main_layout.addWidget(self._line_search)
-        # TODO: replace
+        self._line_replace = QLineEdit()
+        self._line_replace.setPlaceholderText(
+            translations.TR_REPLACE_RESULTS_WITH)
+        main_layout.addWidget(self._line_replace)
+        replace_layout = QHBoxLayout()
+        self._btn_preview = QPushButton(translations.TR_PREVIEW)
+        replace_layout.addWidget(self._btn_preview)
+        self._btn_replace = QPushButton(translations.TR_REPLACE_ALL)
+        self._btn_replace.setEnabled(False)
+        replace_layout.addWidget(self._btn_replace)
+        self._btn_undo = QPushButton(translations.TR_UNDO_REPLACE)
+        self._btn_undo.setEnabled(False)
+        replace_layout.addWidget(self._btn_undo)
+        main_layout.addLayout(replace_layout)
         self._check_cs = QCheckBox(translations.TR_SEARCH_CASE_SENSITIVE)
         self._check_cs.setChecked(True)
         widgets_layout.addWidget(self._check_cs, 2, 0)
@@ -436,6 +948,10 @@ class FindInFilesActions(QWidget):
 
         # Connections
         self._line_search.returnPressed.connect(self.search_requested)
+        self._line_replace.returnPressed.connect(self.preview_requested)
+        self._btn_preview.clicked.connect(self.preview_requested)
+        self._btn_replace.clicked.connect(self.replaceAllRequested.emit)
+        self._btn_undo.clicked.connect(self.undoReplaceRequested.emit)
 
     def _update_combo_projects(self):
         projects = self.ninjaide.get_projects()
@@ -457,5 +973,21 @@ class FindInFilesActions(QWidget):
         wo = self._check_wo.isChecked()
         self.searchRequested.emit(has_search, cs, regex, wo)
 
+    def preview_requested(self):
+        text = self._line_search.text()
+        if not text.strip():
+            return
+        cs = self._check_cs.isChecked()
+        regex = self._check_re.isChecked()
+        wo = self._check_wo.isChecked()
+        self.previewRequested.emit(
+            text, self._line_replace.text(), cs, regex, wo)
+
+    def set_replace_enabled(self, enabled):
+        self._btn_replace.setEnabled(enabled)
+
+    def set_undo_enabled(self, enabled):
+        self._btn_undo.setEnabled(enabled)
+
 
 FindInFilesWidget()
@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Search a pattern in files, for find in files.
+
+Files are memory mapped and the compiled bytes pattern runs over the
+whole buffer, the lines are only located around the matches. Plain text
+searches use find instead of the regular expression, and files that do
+not contain the text every match requires (or, ignoring case, its
+rarest byte) are rejected before running it. Non ASCII searches that
+ignore case, match whole words or are regular expressions run on the
+text decoded from UTF-8 instead, bytes patterns only know ASCII letters
+and words. Files are classified
+first: binary files and files over the size limit are skipped, and the
+ones with another encoding (from their BOM or PEP 263 coding line) are
+searched transcoded to UTF-8. grep_files runs in worker processes, so
+this module does not use Qt."""
+
+import codecs
+import mmap
+import os
+import re
+try:
+    from re import _parser as sre_parse
+except ImportError:
+    import sre_parse
+
+# Files searched by each task of the process pool
+CHUNK_SIZE = 64
+
+# Files with a NUL byte in their first SNIFF_SIZE bytes are binary
+SNIFF_SIZE = 8192
+# Files whose encoding is remembered, by path and mtime
+ENCODING_CACHE_SIZE = 20000
+
+# Checked in order, the UTF-32 LE BOM starts with the UTF-16 LE one
+_BOMS = (
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+_CODING_LINE = re.compile(br'^[ \t\f]*#.*?coding[:=][ \t]*([-\w.]+)')
+# Encodings searched without transcoding
+_UTF8 = ('utf-8', 'ascii')
+
+# path -> (mtime, encoding)
+_encodings = {}
+
+# Bytes of source code from the most to the least frequent, the ones
+# missing are rarer than all of them
+_FREQUENT_BYTES = (
+    b' etanoisrlcdpu_mfh.g()\'y,b=:"w[]vkx0-1\n#\t2>j<zq+*/34&59678%{}!')
+_RARENESS = {byte: rank for rank, byte in enumerate(_FREQUENT_BYTES)}
+
+
+def _literal_runs(items, runs):
+    """Append to runs the sequences of literal bytes of parsed regular
+    expression items, runs[-1] is the current one."""
+    for op, value in items:
+        if op == sre_parse.LITERAL:
+            runs[-1].append(value)
+        elif op == sre_parse.SUBPATTERN and not any(value[1:3]):
+            # A plain group, its content is part of the sequence
+            _literal_runs(value[-1], runs)
+        else:
+            runs.append([])
+
+
+def _rarest_byte(literal):
+    return max(literal, key=lambda byte: _RARENESS.get(byte, 256))
+
+
+class SearchPattern(object):
+    """A compiled search: the regular expression plus the shortcuts
+    that avoid running it."""
+
+    def __init__(self, regex):
+        self.regex = regex
+        # Searched with find instead of the regular expression
+        self.literal = None
+        # Bytes present in any buffer that has a match
+        self.required = ()
+        # Bytes every match contains, in any case when ignoring it
+        self.literals = []
+        # Matched on the text decoded from UTF-8 instead of the bytes
+        self.decoded = isinstance(regex.pattern, str)
+        if self.decoded:
+            # The case of the bytes does not tell the one of the text
+            return
+        parsed = sre_parse.parse(regex.pattern, regex.flags)
+        # Inline flags, as (?i), are part of the compiled ones
+        ignore_case = regex.flags & re.IGNORECASE
+        runs = [[]]
+        _literal_runs(parsed, runs)
+        self.literals = [bytes(run) for run in runs if run]
+        longest = bytes(max(runs, key=len))
+        if not longest:
+            return
+        if ignore_case:
+            rare = bytes([_rarest_byte(longest.lower())])
+            # The case of ASCII letters is all that bytes patterns fold
+            self.required = tuple({rare.lower(), rare.upper()})
+        else:
+            self.required = (longest,)
+            if len(runs) == 1 and len(longest) == len(parsed):
+                # Nothing but literal bytes
+                self.literal = longest
+
+    def may_match(self, buffer):
+        """Return False if buffer can not contain a match."""
+        if not self.required:
+            return True
+        return any(buffer.find(required) != -1
+                   for required in self.required)
+
+    def find(self, buffer, position):
+        """Return the start of the next match from position, or -1."""
+        if self.literal is not None:
+            return buffer.find(self.literal, position)
+        match = self.regex.search(buffer, position)
+        return match.start() if match is not None else -1
+
+
+def detect_encoding(head):
+    """Return the encoding of a file starting with head (bytes), or None
+    if it is binary."""
+    for bom, encoding in _BOMS:
+        if head.startswith(bom):
+            return encoding
+    if b'\0' in head:
+        return None
+    for line in head.split(b'\n', 2)[:2]:
+        match = _CODING_LINE.match(line)
+        if match is not None:
+            try:
+                return codecs.lookup(match.group(1).decode('ascii')).name
+            except LookupError:
+                break
+    return 'utf-8'
+
+
+def file_encoding(path, buffer, mtime):
+    """Return the encoding of path, whose content is buffer, or None if
+    it is binary. It is only detected again when mtime changes."""
+    cached = _encodings.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    encoding = detect_encoding(buffer[:SNIFF_SIZE])
+    if len(_encodings) >= ENCODING_CACHE_SIZE:
+        _encodings.clear()
+    _encodings[path] = (mtime, encoding)
+    return encoding
+
+
+def to_utf8(data, encoding):
+    """Return data (bytes in encoding) in UTF-8, raise UnicodeError if
+    it can not be decoded."""
+    if encoding in _UTF8:
+        return data
+    return data.decode(encoding).encode('utf-8')
+
+
+def compile_pattern(text, case_sensitive=True, regex=False,
+                    whole_words=False):
+    """Return the SearchPattern for a search of find in files."""
+    if whole_words:
+        words = text.split()
+        if not regex:
+            words = [re.escape(word) for word in words]
+        text = '|'.join(r'\b' + word + r'\b' for word in words)
+    elif not regex:
+        text = re.escape(text)
+    flags = re.MULTILINE
+    if not case_sensitive:
+        flags |= re.IGNORECASE
+    if ((regex or whole_words or not case_sensitive) and
+            any(ord(char) > 127 for char in text)):
+        # Bytes patterns only fold the case of ASCII letters, and their
+        # \b and \w only know ASCII words
+        return SearchPattern(re.compile(text, flags))
+    return SearchPattern(re.compile(text.encode('utf-8'), flags))
+
+
+def grep_buffer(buffer, pattern):
+    """Return [(lineno, line)] of the lines of buffer matching pattern,
+    lineno is 0 based."""
+    newline, carriage_return = b'\n', b'\r'
+    if pattern.decoded:
+        if not isinstance(buffer, str):
+            buffer = bytes(buffer).decode('utf-8', 'replace')
+        newline, carriage_return = '\n', '\r'
+    lines = []
+    lineno = 0
+    counted = 0
+    position = 0
+    length = len(buffer)
+    find = pattern.find
+    while position <= length:
+        start = find(buffer, position)
+        if start == -1:
+            break
+        line_start = buffer.rfind(newline, 0, start) + 1
+        line_end = buffer.find(newline, start)
+        if line_end == -1:
+            line_end = length
+        # Only count the newlines between two matching lines
+        lineno += buffer[counted:line_start].count(newline)
+        counted = line_start
+        line = buffer[line_start:line_end].rstrip(carriage_return)
+        if not pattern.decoded:
+            line = line.decode('utf-8', 'replace')
+        lines.append((lineno, line))
+        # One result per line
+        position = line_end + 1
+    return lines
+
+
+def grep_text(text, pattern):
+    """Return [(lineno, line)] of the lines of text (str) matching
+    pattern."""
+    if pattern.decoded:
+        return grep_buffer(text, pattern)
+    buffer = text.encode('utf-8', 'surrogatepass')
+    if not pattern.may_match(buffer):
+        return []
+    return grep_buffer(buffer, pattern)
+
+
+def grep_file(path, pattern, max_size=0):
+    """Return (path, [(lineno, line)]) of the lines of path matching
+    pattern. Unreadable and binary files, and files bigger than max_size
+    (if not 0), have no lines."""
+    try:
+        with open(path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            if not stat.st_size or (max_size and stat.st_size > max_size):
+                # Empty files can not be mapped
+                return path, []
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                encoding = file_encoding(path, buffer, stat.st_mtime)
+                if encoding is None:
+                    return path, []
+                data = buffer
+                if encoding not in _UTF8:
+                    data = to_utf8(buffer[:], encoding)
+                if not pattern.may_match(data):
+                    return path, []
+                return path, grep_buffer(data, pattern)
+            finally:
+                buffer.close()
+    except (OSError, ValueError):
+        # ValueError includes the UnicodeErrors of a wrong encoding
+        return path, []
+
+
+def grep_files(paths, pattern, max_size=0):
+    """Return [(path, [(lineno, line)])] for each of paths."""
+    return [grep_file(path, pattern, max_size) for path in paths]
+
+
+def chunks(paths, size=CHUNK_SIZE):
+    paths = list(paths)
+    for start in range(0, len(paths), size):
+        yield paths[start:start + size]
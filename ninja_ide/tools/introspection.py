@@ -16,8 +16,11 @@
 # along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
 import _ast
 import ast
+import os
 
+from ninja_ide import resources
 from ninja_ide.intellisensei.analyzer import model
+from ninja_ide.tools import symbols_cache
 
 from ninja_ide.tools.logger import NinjaLogger
 
@@ -35,6 +38,14 @@ _map_type = {
     _ast.Call: 'function()',
 }
 
+# Bump when the output of obtain_symbols changes, the cached symbols are
+# discarded
+SYMBOLS_VERSION = 1
+
+_symbols_cache = symbols_cache.SymbolsCache(
+    os.path.join(resources.NINJA_KNOWLEDGE_PATH, 'symbols.db'),
+    SYMBOLS_VERSION)
+
 
 def _parse_assign(symbol):
     assigns = {}
@@ -165,8 +176,17 @@ def _parse_function(symbol, with_docstrings):
 
 def obtain_symbols(source, with_docstrings=False, filename='',
                    simple=False, only_simple=False):
-    """Parse a module source code to obtain: Classes, Functions and Assigns."""
+    """Parse a module source code to obtain: Classes, Functions and Assigns.
+
+    The results are cached by the content of source."""
+    return _symbols_cache.get(
+        source, (with_docstrings, simple, only_simple),
+        lambda: _obtain_symbols(source, with_docstrings, filename, simple,
+                                only_simple))
+
 
+def _obtain_symbols(source, with_docstrings, filename, simple,
+                    only_simple):
     try:
         module = ast.parse(source)
     except SyntaxError:
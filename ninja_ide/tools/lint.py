@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Lint helpers that do not depend on Qt.
+
+This module is imported by worker processes, keep it free of any
+GUI (and logger) initialization at import time."""
+
+import _ast
+import os
+import threading
+import tokenize
+
+from ninja_ide.dependencies import pycodestyle
+from ninja_ide.dependencies.pyflakes_mod import checker
+
+KIND_ERROR = 'error'
+KIND_STYLE = 'style'
+
+
+class CustomReport(pycodestyle.StandardReport):
+
+    def get_file_results(self):
+        data = []
+        for line_number, offset, code, text, doc in self._deferred_print:
+            col = offset + 1
+            data.append((line_number, col, code, text))
+        return data
+
+
+class CustomChecker(pycodestyle.Checker):
+
+    def __init__(self, *args, **kw):
+        # The options are kept, they carry the runners of the guide
+        kw['report'] = CustomReport(kw['options'])
+        super().__init__(*args, **kw)
+
+
+def check_errors(source, path):
+    """Run pyflakes over source.
+
+    Return a list of (lineno, col, code, message), lineno is 1-based."""
+    try:
+        tree = compile(source, path, "exec", _ast.PyCF_ONLY_AST)
+    except SyntaxError as reason:
+        lineno = reason.lineno or 1
+        return [(lineno, reason.offset or 0, 'SyntaxError', reason.args[0])]
+    lint_checker = checker.Checker(tree, path)
+    problems = []
+    for message in lint_checker.messages:
+        problems.append((message.lineno, message.col,
+                         message.__class__.__name__,
+                         message.message % message.message_args))
+    return problems
+
+
+class StyleGuideFactory(object):
+    """Build preconfigured pycodestyle style guides.
+
+    Building a StyleGuide parses options, discovers and filters the checks
+    and compiles their runners, so the guide for a given set of options is
+    built once and reused until the options change."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._guides = {}
+
+    @staticmethod
+    def _key(options):
+        key = []
+        for name, value in sorted(options.items()):
+            if isinstance(value, list):
+                value = tuple(value)
+            key.append((name, value))
+        return tuple(key)
+
+    def get(self, **options):
+        key = self._key(options)
+        with self._lock:
+            guide = self._guides.get(key)
+            if guide is None:
+                guide = pycodestyle.StyleGuide(
+                    parse_argv=False,
+                    config_file='',
+                    checker_class=CustomChecker,
+                    **options
+                )
+                # Options change rarely, do not keep stale guides around
+                self._guides = {key: guide}
+            return guide
+
+
+style_guides = StyleGuideFactory()
+
+
+def check_style(lines, path, **options):
+    """Run pycodestyle over lines.
+
+    Return a list of (lineno, col, code, message), lineno is 1-based."""
+    style = style_guides.get(**options)
+    return style.input_file(path, lines=lines)
+
+
+def lint_file(path, **style_options):
+    """Lint a file from disk with pyflakes and pycodestyle.
+
+    Return (path, mtime, problems) where each problem is
+    (lineno, col, kind, code, message) and lineno is 0-based like in the
+    editor checkers. Unreadable files return (path, None, [])."""
+    try:
+        mtime = os.path.getmtime(path)
+        with tokenize.open(path) as handler:
+            source = handler.read()
+    except (OSError, SyntaxError, UnicodeDecodeError):
+        return path, None, []
+    problems = []
+    # A failing checker must not abort the whole sweep
+    try:
+        errors = check_errors(source, path)
+    except Exception:
+        errors = []
+    for lineno, col, code, message in errors:
+        problems.append((lineno - 1, col, KIND_ERROR, code, message))
+    try:
+        style = check_style(source.splitlines(True), path, **style_options)
+    except Exception:
+        style = []
+    for lineno, col, code, message in style:
+        problems.append((lineno - 1, col, KIND_STYLE, code, message))
+    return path, mtime, problems
@@ -0,0 +1,356 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Ranked fuzzy matching of symbol names.
+
+A query matches a name when its characters appear in order in the name
+(case insensitive). Matches on word boundaries (camelCase humps, after
+underscores or dots) and runs of consecutive characters rank higher.
+
+The names are sorted by length when the matcher is built, and the
+postings of their first one and two characters, of their characters (as
+bitsets) and of their bigrams are computed then: the candidates of a
+query are found without scanning all the names, and only the shortest
+MAX_SCORED are scored. Names can be added and removed without building
+the matcher again."""
+
+import heapq
+import operator
+import re
+from array import array
+from collections import defaultdict
+from functools import reduce
+from itertools import compress
+from itertools import islice
+from itertools import repeat
+from itertools import tee
+
+SCORE_MATCH = 10
+BONUS_FIRST_CHAR = 25
+BONUS_BOUNDARY = 20
+BONUS_CONSECUTIVE = 20
+BONUS_EXACT = 50
+PENALTY_GAP = 2
+
+# Names scored for a query at most: the ones starting with the query,
+# then the ones containing it and then the other hits, the shortest
+# first in each group
+MAX_SCORED = 500
+
+_SEPARATORS = frozenset('_.-/ :')
+
+
+def _boundaries(name):
+    """Return a bitmask with the positions where a word starts."""
+    mask = 0
+    previous = ''
+    for index, char in enumerate(name):
+        if char in _SEPARATORS:
+            previous = char
+            continue
+        if (not previous or previous in _SEPARATORS or
+                (char.isupper() and not previous.isupper()) or
+                (char.isdigit() and not previous.isdigit())):
+            mask |= 1 << index
+        elif (char.isupper() and index + 1 < len(name) and
+                name[index + 1].islower()):
+            # The last capital of an acronym: HTTPServer
+            mask |= 1 << index
+        previous = char
+    return mask
+
+
+def _align_greedy(query, lower):
+    """Return the positions of the shortest match ending at the first
+    possible position."""
+    positions = []
+    position = 0
+    for char in query:
+        position = lower.find(char, position)
+        if position == -1:
+            return None
+        positions.append(position)
+        position += 1
+    position = positions[-1]
+    for index in range(len(query) - 1, -1, -1):
+        position = lower.rfind(query[index], 0, position + 1)
+        positions[index] = position
+        position -= 1
+    return positions
+
+
+def _align_boundaries(query, lower, mask):
+    """Return the positions of a match that prefers word starts."""
+    positions = []
+    position = 0
+    for char in query:
+        first = lower.find(char, position)
+        if first == -1:
+            return None
+        found = first
+        if not positions or first != positions[-1] + 1:
+            candidate = first
+            while candidate != -1 and not mask >> candidate & 1:
+                candidate = lower.find(char, candidate + 1)
+            if candidate != -1:
+                found = candidate
+        positions.append(found)
+        position = found + 1
+    return positions
+
+
+def _score_positions(positions, mask):
+    score = 0
+    previous = -2
+    for position in positions:
+        score += SCORE_MATCH
+        if position == 0:
+            score += BONUS_FIRST_CHAR
+        if mask >> position & 1:
+            score += BONUS_BOUNDARY
+        if position == previous + 1:
+            score += BONUS_CONSECUTIVE
+        elif previous >= 0:
+            score -= PENALTY_GAP * (position - previous - 1)
+        previous = position
+    return score
+
+
+def score(query, lower, mask):
+    """Return the score of lower for query (both lowercase), or None if
+    it does not match."""
+    positions = _align_greedy(query, lower)
+    if positions is None:
+        return None
+    best = _score_positions(positions, mask)
+    positions = _align_boundaries(query, lower, mask)
+    if positions is not None:
+        best = max(best, _score_positions(positions, mask))
+    if query == lower:
+        best += BONUS_EXACT
+    return best
+
+
+def _new_posting():
+    return array('i')
+
+
+_EMPTY = _new_posting()
+
+# A bitset as a string of 0/1 digits and the other way around
+_DIGITS = bytes.maketrans(b'\x00\x01', b'01')
+_FLAGS = bytes.maketrans(b'01', b'\x00\x01')
+
+
+def _bitset(flags):
+    """Return the int with the bit n set if flags[n] is 1."""
+    return int(flags[::-1].translate(_DIGITS) or b'0', 2)
+
+
+def _set_bits(bits):
+    """Iterate over the positions of the bits set, the lowest first."""
+    flags = format(bits, 'b').encode('ascii')[::-1].translate(_FLAGS)
+    # find skips the runs of unset bits without a step per bit
+    find = flags.find
+    position = find(1)
+    while position != -1:
+        yield position
+        position = find(1, position + 1)
+
+
+def _subsequence_pattern(query):
+    return re.compile(''.join(
+        '[^{0}]*{0}'.format(re.escape(char)) for char in query))
+
+
+class FuzzyMatcher(object):
+    """Rank a list of names against queries."""
+
+    def __init__(self, names=()):
+        names = list(names)
+        lengths = list(map(len, names))
+        # The names are kept by position, the shortest first (the ones
+        # added later go at the end), position -> index in names
+        self._indexes = sorted(range(len(names)), key=lengths.__getitem__)
+        self._positions = [0] * len(names)
+        for position, index in enumerate(self._indexes):
+            self._positions[index] = position
+        self._names = [names[index] for index in self._indexes]
+        self._lowers = [name.lower() for name in self._names]
+        # Word starts of each name, computed the first time it is scored
+        self._masks = [None] * len(self._names)
+        # Positions of the names starting with a character, with two
+        # characters and of the ones containing a bigram
+        self._initials = defaultdict(_new_posting)
+        self._prefixes = defaultdict(_new_posting)
+        self._bigrams = defaultdict(_new_posting)
+        for position, lower in enumerate(self._lowers):
+            self._index(position, lower)
+        # Bitset of the positions of the names containing a character,
+        # the candidates of a query are the AND of its characters
+        self._bits = {}
+        for char in set(''.join(self._lowers)):
+            self._bits[char] = _bitset(bytes(map(
+                operator.contains, self._lowers, repeat(char))))
+        # The last query and all its hits, when there were less than
+        # MAX_SCORED, a query that extends it looks only at them
+        self._last_query = None
+        self._last_hits = None
+        # Positions of the names removed, they are never reused
+        self._removed = set()
+
+    def __len__(self):
+        return len(self._names) - len(self._removed)
+
+    @property
+    def removed(self):
+        """Number of names removed since the matcher was built."""
+        return len(self._removed)
+
+    def _index(self, position, lower):
+        if not lower:
+            return
+        self._initials[lower[0]].append(position)
+        self._prefixes[lower[:2]].append(position)
+        for bigram in set(map(operator.add, lower, lower[1:])):
+            self._bigrams[bigram].append(position)
+
+    def add(self, names):
+        """Append names, they get the indexes that follow the last one."""
+        first = len(self._names)
+        # The bits of the new names, shifted by first
+        added = defaultdict(int)
+        for name in names:
+            position = len(self._names)
+            lower = name.lower()
+            self._positions.append(position)
+            self._indexes.append(len(self._positions) - 1)
+            self._names.append(name)
+            self._lowers.append(lower)
+            self._masks.append(None)
+            self._index(position, lower)
+            for char in set(lower):
+                added[char] |= 1 << (position - first)
+        for char, bits in added.items():
+            self._bits[char] = self._bits.get(char, 0) | bits << first
+        if self._last_query is not None:
+            # Keep narrowing from the last query, with the new hits
+            match = _subsequence_pattern(self._last_query).match
+            self._last_hits.extend(
+                position for position in range(first, len(self._names))
+                if match(self._lowers[position]))
+
+    def remove(self, indexes):
+        """Remove the names at indexes, the indexes of the others do not
+        change."""
+        for index in indexes:
+            position = self._positions[index]
+            # An empty name matches no query
+            self._names[position] = ''
+            self._lowers[position] = ''
+            self._removed.add(position)
+
+    def _hits(self, query):
+        """Return the positions of the shortest MAX_SCORED names that
+        match query."""
+        lowers = self._lowers
+        last = self._last_query
+        if last is not None and query.startswith(last):
+            hits = self._last_hits
+            match = _subsequence_pattern(query).match
+            hits = list(compress(hits, map(
+                match, map(lowers.__getitem__, hits))))
+        else:
+            hits = _set_bits(reduce(
+                operator.and_,
+                (self._bits.get(char, 0) for char in set(query))))
+            if len(query) > 1:
+                # Only the candidates needed are checked
+                match = _subsequence_pattern(query).match
+                hits, checked = tee(hits)
+                hits = compress(hits, map(match, map(
+                    lowers.__getitem__, checked)))
+            hits = list(islice(hits, MAX_SCORED))
+        if len(hits) < MAX_SCORED:
+            self._last_query = query
+            self._last_hits = hits
+        else:
+            self._last_query = None
+            self._last_hits = None
+        return hits
+
+    def _candidates(self, query):
+        """Return the positions of up to MAX_SCORED names to score."""
+        lowers = self._lowers
+        if len(query) == 1:
+            groups = [self._initials.get(query, _EMPTY)]
+        else:
+            prefixed = self._prefixes.get(query[:2], _EMPTY)
+            contained = min(
+                (self._bigrams.get(bigram, _EMPTY)
+                 for bigram in map(operator.add, query, query[1:])),
+                key=len)
+            if len(query) > 2:
+                prefixed = compress(prefixed, map(
+                    str.startswith, map(lowers.__getitem__, prefixed),
+                    repeat(query)))
+                contained = compress(contained, map(
+                    operator.contains, map(lowers.__getitem__, contained),
+                    repeat(query)))
+            groups = [prefixed, contained]
+        groups.append(self._hits(query))
+        candidates = []
+        seen = set()
+        for group in groups:
+            for position in group:
+                if position not in seen:
+                    seen.add(position)
+                    candidates.append(position)
+                    if len(candidates) == MAX_SCORED:
+                        return candidates
+        return candidates
+
+    def _mask(self, position):
+        mask = self._masks[position]
+        if mask is None:
+            mask = _boundaries(self._names[position])
+            self._masks[position] = mask
+        return mask
+
+    def match(self, query, limit=100):
+        """Return the indexes of the best limit names for query, the
+        best first."""
+        query = query.lower()
+        if not query:
+            indexes = (index for index, position in enumerate(self._positions)
+                       if position not in self._removed)
+            return list(islice(indexes, limit))
+        lowers = self._lowers
+        names = self._names
+        ranked = {}
+        for position in self._candidates(query):
+            lower = lowers[position]
+            value = score(query, lower, self._mask(position))
+            if value is None:
+                # Removed
+                continue
+            # Ties go to the shortest name, then in alphabetical order
+            ranked[position] = (value, -len(lower))
+        best = heapq.nlargest(limit, ranked, key=ranked.__getitem__)
+        best.sort(key=lambda position: (
+            -ranked[position][0], -ranked[position][1], names[position]))
+        return [self._indexes[position] for position in best]
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Extract the symbols of the files of the projects.
+
+index_file runs in the worker processes of the locator, so this module
+does not use Qt and only returns plain tuples."""
+
+import os
+
+from ninja_ide.extensions import handlers
+from ninja_ide.tools import grep_engine
+
+# Kinds of the locator filters (see locator.FILTERS)
+KIND_FILE = '@'
+KIND_NON_PYTHON = '!'
+KIND_CLASS = '<'
+KIND_FUNCTION = '>'
+KIND_ATTRIBUTE = '-'
+
+
+def _parse_symbols(symbols, results, parent=None):
+    if 'classes' in symbols:
+        _parse_classes(symbols['classes'], results, parent)
+    if 'attributes' in symbols:
+        for attr, lineno in symbols['attributes'].items():
+            results.append((KIND_ATTRIBUTE, attr, lineno - 1, parent))
+    if 'functions' in symbols:
+        _parse_functions(symbols['functions'], results, parent)
+
+
+def _parse_classes(classes, results, parent):
+    for name, clazz in classes.items():
+        results.append((KIND_CLASS, name, clazz['lineno'] - 1, parent))
+        _parse_symbols(clazz['members'], results, len(results) - 1)
+
+
+def _parse_functions(functions, results, parent):
+    for name, function in functions.items():
+        results.append((KIND_FUNCTION, name, function['lineno'] - 1, parent))
+        _parse_symbols(function['functions'], results, len(results) - 1)
+
+
+def parse_symbols(symbols):
+    """Return [(kind, name, line, parent)] from the output of
+    obtain_symbols, parent is the index in the list of the class or
+    function that contains the symbol (None at module level)."""
+    results = []
+    _parse_symbols(symbols, results)
+    return results
+
+
+def index_file(path, language, is_python):
+    """Return (path, mtime, file kind, [(kind, name, line, parent)]).
+
+    mtime is None when the file can not be read."""
+    kind = KIND_FILE if is_python else KIND_NON_PYTHON
+    try:
+        mtime = os.stat(path).st_mtime
+        symbols_handler = handlers.get_symbols_handler(language)
+        if symbols_handler is None and language == 'python':
+            # Processes that do not inherit the handlers of the IDE
+            handlers.init_basic_handlers()
+            symbols_handler = handlers.get_symbols_handler(language)
+        if symbols_handler is None:
+            return path, mtime, kind, []
+        # The encoding of the BOM or coding line, as find in files
+        with open(path, 'rb') as f:
+            encoding = grep_engine.detect_encoding(
+                f.read(grep_engine.SNIFF_SIZE))
+        if encoding is None:
+            # Binary
+            return path, mtime, kind, []
+        with open(path, encoding=encoding) as f:
+            content = f.read()
+        symbols = symbols_handler.obtain_symbols(content, filename=path)
+        return path, mtime, kind, parse_symbols(symbols)
+    except Exception:
+        # Unreadable or not parseable, index the file name at least
+        try:
+            return path, os.stat(path).st_mtime, kind, []
+        except OSError:
+            return path, None, kind, []
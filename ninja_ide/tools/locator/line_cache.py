@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Read single lines of files without scanning them every time.
+
+The offsets where each line starts are computed once per file version
+(path, mtime and size) and kept in a LRU cache, a line is then one seek
+and one read."""
+
+import os
+from array import array
+from functools import lru_cache
+
+# Number of files whose line offsets are kept
+CACHE_SIZE = 128
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _line_offsets(path, mtime, size):
+    offsets = array('q', [0])
+    with open(path, 'rb') as f:
+        for line in f:
+            offsets.append(offsets[-1] + len(line))
+    return offsets
+
+
+def read_line(path, lineno):
+    """Return the line number lineno (0 based) of path, without the end
+    of line, or None if the file or the line do not exist."""
+    try:
+        stat = os.stat(path)
+        offsets = _line_offsets(path, stat.st_mtime, stat.st_size)
+        if not 0 <= lineno < len(offsets) - 1:
+            return None
+        with open(path, 'rb') as f:
+            f.seek(offsets[lineno])
+            data = f.read(offsets[lineno + 1] - offsets[lineno])
+    except OSError:
+        return None
+    return data.decode('utf-8', 'replace').rstrip('\r\n')
+
+
+def clear():
+    _line_offsets.cache_clear()
@@ -19,36 +19,36 @@ from __future__ import unicode_literals
 from __future__ import print_function
 
 import os
-import sqlite3
-import pickle
-try:
-    import Queue
-except:
-    import queue as Queue  # lint:ok
+import threading
+from concurrent.futures import ProcessPoolExecutor
 
 from PyQt5.QtWidgets import QMessageBox
 from PyQt5.QtCore import (
     QObject,
     QThread,
-    QDir,
-    QFile,
-    QTextStream
+    pyqtSignal
 )
 
-from ninja_ide import resources
 from ninja_ide import translations
-from ninja_ide.extensions import handlers
 from ninja_ide.gui.ide import IDE
 from ninja_ide.core.file_handling import file_manager
+from ninja_ide.core.file_handling import project_watcher
 from ninja_ide.core import settings
+from ninja_ide.tools.locator import fuzzy_matcher
+from ninja_ide.tools.locator import indexer
+from ninja_ide.tools.locator import line_cache
+from ninja_ide.tools.locator import locator_db
 
 from ninja_ide.tools.logger import NinjaLogger
 
 
 logger = NinjaLogger('ninja_ide.tools.locator')
 
-mapping_symbols = {}
-files_paths = {}
+# Number of ranked results of a fuzzy search
+MATCH_LIMIT = 300
+# Build a matcher again when more than this fraction of its names were
+# removed by the files indexed again
+MATCHER_MAX_REMOVED = 0.25
 
 
 # @ FILES
@@ -70,25 +70,6 @@ FILTERS = {
     'lines': ':'}
 
 
-db_path = os.path.join(resources.NINJA_KNOWLEDGE_PATH, 'locator.db')
-
-
-def _initialize_db():
-    locator_db = sqlite3.connect(db_path)
-    cur = locator_db.cursor()
-    cur.execute("create table if not exists "
-                "locator(path text PRIMARY KEY, stat integer, data blob)")
-    locator_db.commit()
-    locator_db.close()
-
-
-# Initialize Database and open connection
-_initialize_db()
-
-
-# TODO: Clean non existent paths from the DB
-
-
 class GoToDefinition(QObject):
     """This class is used Go To Definition feature."""
 
@@ -157,20 +138,118 @@ class ResultItem(object):
         return self.name[index]
 
 
+class SymbolsQuery(object):
+    """Lazy sequence of the ResultItems matching a locator search.
+
+    Only the slices that are requested are read from the locator
+    knowledge, the list is never built as a whole."""
+
+    def __init__(self, connection, text='', kinds=(), path=None):
+        self._connection = connection
+        self._text = text
+        self._kinds = kinds
+        self._path = path
+
+    def _fetch(self, limit=-1, offset=0):
+        rows = locator_db.search(self._connection, self._text, self._kinds,
+                                 self._path, limit, offset)
+        return [ResultItem(symbol_type=kind, name=name, path=path,
+                           lineno=line) for kind, name, path, line in rows]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start = index.start or 0
+            if index.stop is None:
+                return self._fetch(offset=start)
+            return self._fetch(max(index.stop - start, 0), start)
+        items = self._fetch(1, index)
+        if not items:
+            raise IndexError(index)
+        return items[0]
+
+    def __iter__(self):
+        return iter(self._fetch())
+
+    def __bool__(self):
+        return bool(self._fetch(1))
+
+
+class SymbolsMatcher(object):
+    """FuzzyMatcher of the symbols of some kinds, updated in place with
+    the symbols of the files indexed again."""
+
+    def __init__(self, connection, kinds=()):
+        self._kinds = kinds
+        rows = locator_db.symbol_names(connection, kinds)
+        self._matcher = fuzzy_matcher.FuzzyMatcher(
+            [locator_db.comparison_name(name) for _, name in rows])
+        self._ids = [symbol_id for symbol_id, _ in rows]
+        self._indexes = {
+            symbol_id: index for index, symbol_id in enumerate(self._ids)}
+        # The thread updates it while the UI searches
+        self._lock = threading.Lock()
+
+    def match(self, search, limit):
+        """Return the ids of the best limit symbols for search."""
+        with self._lock:
+            return [self._ids[index]
+                    for index in self._matcher.match(search, limit)]
+
+    def update(self, removed, added):
+        """Remove the symbol ids in removed and add the (id, name, kind)
+        symbols in added."""
+        added = [(symbol_id, name) for symbol_id, name, kind in added
+                 if not self._kinds or kind in self._kinds]
+        with self._lock:
+            indexes = [self._indexes.pop(symbol_id) for symbol_id in removed
+                       if symbol_id in self._indexes]
+            self._matcher.remove(indexes)
+            first = len(self._ids)
+            self._matcher.add(
+                [locator_db.comparison_name(name) for _, name in added])
+            for index, (symbol_id, _) in enumerate(added, first):
+                self._ids.append(symbol_id)
+                self._indexes[symbol_id] = index
+
+    def is_fragmented(self):
+        """Return True if too many of its names were removed."""
+        return self._matcher.removed > len(self._ids) * MATCHER_MAX_REMOVED
+
+
 class LocateSymbolsThread(QThread):
 
+    # indexed files, files to index
+    progress = pyqtSignal(int, int)
+
     def __init__(self):
         super(LocateSymbolsThread, self).__init__()
         self.results = []
         self._cancel = False
-        self.locations = []
         self.execute = None
-        self.dirty = False
         self._search = None
         self._isVariable = None
 
-        # Locator Knowledge
+        # Locator Knowledge, one connection for the thread and other
+        # for the queries from the UI
         self._locator_db = None
+        self._connection = None
+        # kinds -> SymbolsMatcher, rebuilt by the thread after indexing
+        # the projects and updated with the files indexed again
+        self._matchers = {}
+        # Kinds searched without a matcher yet, the thread builds them
+        self._wanted_kinds = set()
+        # path -> project_watcher event, waiting to be indexed
+        self._changes = {}
+        # Closed projects whose symbols are waiting to be removed
+        self._forgotten = set()
+        self._changes_lock = threading.Lock()
+        self.finished.connect(self._locate_pending_changes)
+
+    @property
+    def connection(self):
+        if self._connection is None:
+            self._connection = locator_db.connect()
+        return self._connection
 
     def find(self, search, filePath, isVariable):
         self.cancel()
@@ -186,274 +265,301 @@ class LocateSymbolsThread(QThread):
         self.wait()
         self._cancel = False
         if not self.isRunning():
-            global mapping_symbols
-            global files_paths
-            mapping_symbols = {}
-            files_paths = {}
             self.execute = self.locate_code
             self.start()
 
     def find_file_code_location(self, path):
-        self._file_path = path
-        if not self._file_path:
+        if path:
+            self.find_changed_file_location(project_watcher.MODIFIED, path)
+
+    def find_changed_file_location(self, event, path):
+        """Update the symbols of a file that was added, modified or
+        deleted (a rename is a delete and an add)."""
+        with self._changes_lock:
+            self._changes[path] = event
+        self._locate_pending_changes()
+
+    def _locate_pending_changes(self):
+        if self.isRunning():
             return
+        if self._changes or self._forgotten:
+            self.execute = self.locate_changed_files
+        elif self._wanted_kinds:
+            self.execute = self.build_matchers
+        else:
+            return
+        self.start()
+
+    def find_maintenance(self):
+        """Prune and compact the locator knowledge if nothing else is
+        running."""
         if not self.isRunning():
-            self.execute = self.locate_file_code
+            self.execute = self.maintain_knowledge
             self.start()
 
+    def maintain_knowledge(self):
+        ide = IDE.get_service('ide')
+        projects = ide.filesystem.get_projects()
+        removed = locator_db.prune(self._locator_db, projects)
+        if removed:
+            self._rebuild_matchers()
+            logger.debug('Locator knowledge pruned: %d files' % removed)
+        if not self._cancel and locator_db.vacuum(self._locator_db):
+            logger.debug('Locator knowledge vacuumed')
+
+    def forget_project(self, project_path):
+        """Drop the symbols of a closed project, in the thread. A run
+        indexing it stops storing its symbols."""
+        with self._changes_lock:
+            self._forgotten.add(project_path)
+        self._locate_pending_changes()
+
+    def _forget_projects(self):
+        with self._changes_lock:
+            forgotten, self._forgotten = self._forgotten, set()
+        for project_path in forgotten:
+            locator_db.remove_project(self._locator_db, project_path)
+        if forgotten:
+            self._locator_db.commit()
+        return forgotten
+
     def run(self):
         self.results = []
-        self.locations = []
-        self.execute()
+        # An exception escaping run aborts the IDE
+        try:
+            if self._locator_db is None:
+                # Every run is a new thread, but only one at a time uses it
+                self._locator_db = locator_db.connect(
+                    check_same_thread=False)
+            try:
+                self.execute()
+            finally:
+                self._locator_db.commit()
+        except Exception as reason:
+            logger.error('LocateSymbolsThread, error: %r' % reason)
         if self._cancel:
             self.results = []
-            self.locations = []
         self._cancel = False
         self._search = None
         self._isVariable = None
-        if self._locator_db is not None:
-            self._locator_db.commit()
-            self._locator_db.close()
-            self._locator_db = None
-
-    def _save_file_symbols(self, path, stat, data):
-        if self._locator_db is not None:
-            pdata = pickle.dumps(data, pickle.HIGHEST_PROTOCOL)
-            cur = self._locator_db.cursor()
-            cur.execute("INSERT OR REPLACE INTO locator values (?, ?, ?)",
-                        (path, stat, sqlite3.Binary(pdata)))
-            self._locator_db.commit()
 
-    def _get_file_symbols(self, path):
-        if self._locator_db is not None:
-            cur = self._locator_db.cursor()
-            cur.execute("SELECT * FROM locator WHERE path=:path",
-                        {'path': path})
-            return cur.fetchone()
+    def _rebuild_matchers(self, only_fragmented=False):
+        """Build again the matchers used by the searches, in the thread,
+        and swap them in."""
+        with self._changes_lock:
+            wanted, self._wanted_kinds = self._wanted_kinds, set()
+        matchers = {
+            kinds: (SymbolsMatcher(self._locator_db, kinds)
+                    if not only_fragmented or matcher.is_fragmented()
+                    else matcher)
+            for kinds, matcher in list(self._matchers.items())}
+        for kinds in wanted - set(matchers):
+            matchers[kinds] = SymbolsMatcher(self._locator_db, kinds)
+        self._matchers = matchers
+
+    def build_matchers(self):
+        """Build the matchers of the kinds searched for the first time."""
+        self._rebuild_matchers(only_fragmented=True)
+
+    def _update_matchers(self, removed, added):
+        for matcher in list(self._matchers.values()):
+            matcher.update(removed, added)
 
     def locate_code(self):
-        self._locator_db = sqlite3.connect(db_path)
+        self._forget_projects()
         ide = IDE.get_service('ide')
         projects = ide.filesystem.get_projects()
-        if not projects:
+        if projects:
+            pool = ProcessPoolExecutor()
+            try:
+                for nproject in list(projects.values()):
+                    if self._cancel:
+                        break
+                    self.__locate_code_in_project(pool, nproject)
+            finally:
+                # Do not block a cancelled run on the remaining chunks
+                pool.shutdown(wait=not self._cancel)
+        self._rebuild_matchers()
+
+    def __locate_code_in_project(self, pool, nproject):
+        ide = IDE.get_service('ide')
+        watcher = ide.filesystem.get_project_watcher(nproject.path)
+        # Not walked yet, it is located when it is opened
+        if watcher is None or not watcher.is_ready():
             return
-        projects = list(projects.values())
-        for nproject in projects:
-            if self._cancel:
+        files = dict(watcher.entries(nproject.extensions))
+        known = locator_db.project_files(self._locator_db, nproject.path)
+        for path in known:
+            if path not in files:
+                locator_db.remove_file(self._locator_db, path)
+        pending = [path for path, mtime in files.items()
+                   if known.get(path) != mtime]
+        total = len(pending)
+        self.progress.emit(0, total)
+        if not pending:
+            self._locator_db.commit()
+            return
+        done = 0
+        committer = locator_db.BatchCommitter(self._locator_db)
+        jobs = [(path,) + self._file_language(path) for path in pending]
+        results = pool.map(indexer.index_file, *zip(*jobs), chunksize=16)
+        for path, mtime, kind, symbols in results:
+            if self._cancel or nproject.path in self._forgotten:
                 break
-            current_dir = QDir(nproject.path)
-            # Skip not readable dirs!
-            if not current_dir.isReadable():
-                continue
-
-            queue_folders = Queue.Queue()
-            queue_folders.put(current_dir)
-            files_paths[nproject.path] = list()
-            self.__locate_code_in_project(queue_folders, nproject)
-        self.dirty = True
-        self.get_locations()
-
-    def __locate_code_in_project(self, queue_folders, nproject):
-        file_filter = QDir.Files | QDir.NoDotAndDotDot | QDir.Readable
-        dir_filter = QDir.Dirs | QDir.NoDotAndDotDot | QDir.Readable
-        while not self._cancel and not queue_folders.empty():
-            current_dir = QDir(queue_folders.get())
-            # Skip not readable dirs!
-            if not current_dir.isReadable():
-                continue
-
-            # Collect all sub dirs!
-            current_sub_dirs = current_dir.entryInfoList(dir_filter)
-            for one_dir in current_sub_dirs:
-                queue_folders.put(one_dir.absoluteFilePath())
-
-            # all files in sub_dir first apply the filters
-            current_files = current_dir.entryInfoList(
-                ['*{0}'.format(x) for x in nproject.extensions], file_filter)
-            # process all files in current dir!
-            global files_paths
-            for one_file in current_files:
-                try:
-                    self._grep_file_symbols(one_file.absoluteFilePath(),
-                                            one_file.fileName())
-                    files_paths[nproject.path].append(
-                        one_file.absoluteFilePath())
-                except Exception as reason:
-                    logger.error(
-                        '__locate_code_in_project, error: %r' % reason)
-                    logger.error(
-                        '__locate_code_in_project fail for file: %r' %
-                        one_file.absoluteFilePath())
-
-    def locate_file_code(self):
-        self._locator_db = sqlite3.connect(db_path)
-        file_name = file_manager.get_basename(self._file_path)
-        try:
-            self._grep_file_symbols(self._file_path, file_name)
-            self.dirty = True
-        except Exception as reason:
-            logger.error('locate_file_code, error: %r' % reason)
+            if mtime is None:
+                locator_db.remove_file(self._locator_db, path)
+            else:
+                locator_db.store_file(self._locator_db, path, nproject.path,
+                                      mtime, kind, symbols)
+            done += 1
+            if committer.stored():
+                self.progress.emit(done, total)
+        committer.commit()
+        self.progress.emit(done, total)
+
+    def _file_language(self, path):
+        """Return (language, is python) of path."""
+        file_ext = file_manager.get_file_extension(path)
+        exts = settings.SYNTAX.get('python')['extension']
+        return settings.LANGUAGE_MAP.get(file_ext), file_ext in exts
+
+    def locate_changed_files(self):
+        forgotten = self._forget_projects()
+        with self._changes_lock:
+            changes, self._changes = self._changes, {}
+        pending = list(changes.items())
+        committer = locator_db.BatchCommitter(self._locator_db)
+        # Only the symbols of the changed files are updated in the
+        # matchers
+        removed = []
+        added = []
+        while pending and not self._cancel:
+            path, event = pending.pop()
+            try:
+                before = locator_db.file_symbols(self._locator_db, path)
+                self._locate_changed_file(event, path)
+                after = locator_db.file_symbols(self._locator_db, path)
+                if after != before:
+                    removed.extend(row[0] for row in before)
+                    added.extend(after)
+            except Exception as reason:
+                logger.error('locate_changed_files, error: %r' % reason)
+            committer.stored()
+        # The searches read the symbols with another connection
+        committer.commit()
+        if forgotten:
+            self._rebuild_matchers()
+        else:
+            self._update_matchers(removed, added)
+            self._rebuild_matchers(only_fragmented=True)
+        if pending:
+            # Cancelled, keep the rest for the next run
+            with self._changes_lock:
+                for path, event in pending:
+                    self._changes.setdefault(path, event)
+
+    def _locate_changed_file(self, event, path):
+        nproject = self._project_of(path)
+        project_path = nproject.path if nproject is not None else None
+        if event == project_watcher.DELETED or not os.path.isfile(path):
+            locator_db.remove_file(self._locator_db, path)
+            return
+        if nproject is not None:
+            ide = IDE.get_service('ide')
+            if (not path.endswith(tuple(nproject.extensions)) or
+                    ide.filesystem.is_ignored(path)):
+                return
+        self._grep_file_symbols(self._locator_db, path, project_path)
+
+    def _project_of(self, path):
+        ide = IDE.get_service('ide')
+        for nproject in ide.filesystem.get_projects().values():
+            if file_manager.belongs_to_folder(nproject.path, path):
+                return nproject
+        return None
 
     def go_to_definition(self):
-        self.dirty = True
         self.results = []
-        locations = self.get_locations()
         if self._isVariable:
-            preResults = [
-                [file_manager.get_basename(x.path), x.path, x.lineno, '']
-                for x in locations
-                if (x.type == FILTERS['attribs']) and (x.name == self._search)]
+            kinds = (FILTERS['attribs'],)
         else:
-            preResults = [
-                [file_manager.get_basename(x.path), x.path, x.lineno, '']
-                for x in locations
-                if ((x.type == FILTERS['functions']) or
-                    (x.type == FILTERS['classes'])) and
-                   (x.name.startswith(self._search))]
-        for data in preResults:
-            file_object = QFile(data[1])
-            if not file_object.open(QFile.ReadOnly):
-                return
-
-            stream = QTextStream(file_object)
-            line_index = 0
-            line = stream.readLine()
-            while not self._cancel and not stream.atEnd():
-                if line_index == data[2]:
-                    data[3] = line
-                    self.results.append(data)
-                    break
-                # take the next line!
-                line = stream.readLine()
-                line_index += 1
-
-    def get_locations(self):
-        if self.dirty:
-            self.convert_map_to_array()
-            self.dirty = False
-        return self.locations
+            kinds = (FILTERS['functions'], FILTERS['classes'])
+        rows = locator_db.definitions(self._locator_db, self._search, kinds)
+        for _, _, path, lineno in sorted(rows):
+            if self._cancel:
+                break
+            line = line_cache.read_line(path, lineno)
+            if line is not None:
+                self.results.append(
+                    [file_manager.get_basename(path), path, lineno, line])
+
+    def get_locations(self, search='', kinds=(), path=None):
+        """Return the symbols containing search as a lazy sequence."""
+        return SymbolsQuery(self.connection, search, kinds, path)
+
+    def get_matches(self, search, kinds=()):
+        """Return the best ResultItems for a fuzzy search."""
+        search = search.strip()
+        if not search:
+            return self.get_locations(kinds=kinds)
+        kinds = tuple(kinds)
+        matcher = self._matchers.get(kinds)
+        if matcher is None:
+            # Building it takes seconds with a large knowledge, the
+            # thread does it and meanwhile the names containing search
+            # are good enough
+            with self._changes_lock:
+                self._wanted_kinds.add(kinds)
+            self._locate_pending_changes()
+            return self.get_locations(search, kinds)
+        best = matcher.match(search, MATCH_LIMIT)
+        rows = locator_db.symbols_by_id(self.connection, best)
+        return [ResultItem(symbol_type=kind, name=name, path=path,
+                           lineno=line) for kind, name, path, line in rows]
 
     def get_this_file_symbols(self, path):
-        global mapping_symbols
-        symbols = mapping_symbols.get(path, ())
+        symbols = []
         try:
-            if not symbols:
-                file_name = file_manager.get_basename(path)
-                self._grep_file_symbols(path, file_name)
-                symbols = mapping_symbols.get(path, ())
-            symbols = sorted(symbols[1:], key=lambda item: item.name)
+            self._index_if_unknown(path)
+            symbols = [item for item in self.get_locations(path=path)
+                       if item.lineno != -1]
         except Exception as reason:
             logger.error('get_this_file_symbols, error: %r' % reason)
         return symbols
 
-    def convert_map_to_array(self):
-        global mapping_symbols
-        self.locations = [x for location in mapping_symbols
-                          for x in mapping_symbols[location]]
-        self.locations = sorted(self.locations, key=lambda item: item.name)
-
-    def _grep_file_symbols(self, file_path, file_name):
-        # type - file_name - file_path
-        global mapping_symbols
-        exts = settings.SYNTAX.get('python')['extension']
-        file_ext = file_manager.get_file_extension(file_path)
-        if file_ext not in exts:
-            mapping_symbols[file_path] = [
-                ResultItem(symbol_type=FILTERS['non-python'], name=file_name,
-                           path=file_path, lineno=-1)]
-        else:
-            mapping_symbols[file_path] = [
-                ResultItem(symbol_type=FILTERS['files'], name=file_name,
-                           path=file_path, lineno=-1)]
-        data = self._get_file_symbols(file_path)
-        # FIXME: stat not int
-        mtime = int(os.stat(file_path).st_mtime)
-        if data is not None and (mtime == int(data[1])):
-            try:
-                results = pickle.loads(data[2])
-                mapping_symbols[file_path] += results
-                return
-            except:
-                print("ResultItem couldn't be loaded, let's analyze it again'")
-        # obtain a symbols handler for this file extension
-        lang = settings.LANGUAGE_MAP.get(file_ext)
-        symbols_handler = handlers.get_symbols_handler(lang)
-        if symbols_handler is None:
+    def _index_if_unknown(self, path):
+        if locator_db.file_mtime(self.connection, path) is None:
+            nproject = self._project_of(path)
+            self._grep_file_symbols(
+                self.connection, path,
+                nproject.path if nproject is not None else None)
+            self.connection.commit()
+
+    def _grep_file_symbols(self, connection, file_path, project_path):
+        mtime = os.stat(file_path).st_mtime
+        if locator_db.file_mtime(connection, file_path) == mtime:
             return
+        _, mtime, kind, symbols = indexer.index_file(
+            file_path, *self._file_language(file_path))
+        if mtime is not None:
+            locator_db.store_file(
+                connection, file_path, project_path, mtime, kind, symbols)
+
+    def get_symbols_for_class(self, file_path, clazzName, search='',
+                              kinds=()):
+        """Return the ResultItems of the members of the class clazzName
+        of file_path matching search and kinds."""
         results = []
-        with open(file_path) as f:
-            content = f.read()
-            symbols = symbols_handler.obtain_symbols(
-                content,
-                filename=file_path)
-            self.__parse_symbols(symbols, results, file_path)
-
-        if results:
-            self._save_file_symbols(file_path, mtime, results)
-            mapping_symbols[file_path] += results
-
-    def __parse_symbols(self, symbols, results, file_path):
-        if "classes" in symbols:
-            self.__parse_class(symbols, results, file_path)
-        if 'attributes' in symbols:
-            self.__parse_attributes(symbols, results, file_path)
-        if 'functions' in symbols:
-            self.__parse_functions(symbols, results, file_path)
-
-    def __parse_class(self, symbols, results, file_path):
-        clazzes = symbols['classes']
-        for claz in clazzes:
-            line_number = clazzes[claz]['lineno'] - 1
-            members = clazzes[claz]['members']
-            results.append(ResultItem(symbol_type=FILTERS['classes'],
-                           name=claz, path=file_path,
-                           lineno=line_number))
-            if 'attributes' in members:
-                for attr in members['attributes']:
-                    line_number = members['attributes'][attr] - 1
-                    results.append(ResultItem(symbol_type=FILTERS['attribs'],
-                                   name=attr, path=file_path,
-                                   lineno=line_number))
-            if 'functions' in members:
-                for func in members['functions']:
-                    line_number = members['functions'][func]['lineno'] - 1
-                    results.append(ResultItem(
-                        symbol_type=FILTERS['functions'], name=func,
-                        path=file_path, lineno=line_number))
-                    self.__parse_symbols(
-                        members['functions'][func]['functions'],
-                        results, file_path)
-            if 'classes' in members:
-                self.__parse_class(members, results, file_path)
-
-    def __parse_attributes(self, symbols, results, file_path):
-        attributes = symbols['attributes']
-        for attr in attributes:
-            line_number = attributes[attr] - 1
-            results.append(ResultItem(symbol_type=FILTERS['attribs'],
-                           name=attr, path=file_path,
-                           lineno=line_number))
-
-    def __parse_functions(self, symbols, results, file_path):
-        functions = symbols['functions']
-        for func in functions:
-            line_number = functions[func]['lineno'] - 1
-            results.append(ResultItem(
-                symbol_type=FILTERS['functions'], name=func,
-                path=file_path, lineno=line_number))
-            self.__parse_symbols(functions[func]['functions'],
-                                 results, file_path)
-
-    def get_symbols_for_class(self, file_path, clazzName):
-        results = []
-        with open(file_path) as f:
-            content = f.read()
-            ext = file_manager.get_file_extension(file_path)
-            # obtain a symbols handler for this file extension
-            symbols_handler = handlers.get_symbols_handler(ext)
-            symbols = symbols_handler.obtain_symbols(content,
-                                                     filename=file_path)
-            self.__parse_symbols(symbols, results, file_path)
+        try:
+            self._index_if_unknown(file_path)
+            rows = locator_db.members(
+                self.connection, file_path, clazzName, FILTERS['classes'],
+                search, kinds)
+            results = [ResultItem(symbol_type=kind, name=name, path=path,
+                                  lineno=line)
+                       for kind, name, path, line in rows]
+        except Exception as reason:
+            logger.error('get_symbols_for_class, error: %r' % reason)
         return results
 
     def cancel(self):
@@ -0,0 +1,344 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Storage of the locator knowledge.
+
+Every indexed file has a row in the files table and every symbol (the
+file itself included) a row in the symbols table, so the locator can
+search the index with queries instead of loading it in memory. The
+members of a class or function point to it with parent_id."""
+
+import os
+import sqlite3
+import time
+
+from ninja_ide import resources
+
+DB_PATH = os.path.join(resources.NINJA_KNOWLEDGE_PATH, 'locator.db')
+
+# Bump when the schema changes, the old tables are dropped
+SCHEMA_VERSION = 2
+
+# Substring search through the trigram index needs 3 characters
+FTS_MIN_LENGTH = 3
+
+# Commit the indexed files every BATCH_FILES files or BATCH_DELAY seconds
+BATCH_FILES = 200
+BATCH_DELAY = 2
+# VACUUM when more than this fraction of the pages are free
+VACUUM_FREE_RATIO = 0.25
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS files("
+    "id INTEGER PRIMARY KEY, path TEXT UNIQUE, project TEXT, mtime REAL)",
+    "CREATE TABLE IF NOT EXISTS symbols("
+    "id INTEGER PRIMARY KEY, file_id INTEGER, name TEXT, lname TEXT, "
+    "kind TEXT, line INTEGER, parent_id INTEGER)",
+    "CREATE INDEX IF NOT EXISTS symbols_lname ON symbols(lname)",
+    "CREATE INDEX IF NOT EXISTS symbols_name ON symbols(name)",
+    "CREATE INDEX IF NOT EXISTS symbols_file ON symbols(file_id)",
+    "CREATE INDEX IF NOT EXISTS symbols_parent ON symbols(parent_id)",
+    "CREATE INDEX IF NOT EXISTS files_project ON files(project)",
+)
+
+_FTS_SCHEMA = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS symbols_fts USING fts5("
+    "lname, content='symbols', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS symbols_ai AFTER INSERT ON symbols BEGIN "
+    "INSERT INTO symbols_fts(rowid, lname) VALUES (new.id, new.lname); END",
+    "CREATE TRIGGER IF NOT EXISTS symbols_ad AFTER DELETE ON symbols BEGIN "
+    "INSERT INTO symbols_fts(symbols_fts, rowid, lname) "
+    "VALUES ('delete', old.id, old.lname); END",
+)
+
+_OLD_TABLES = ('locator', 'symbols_fts', 'symbols', 'files')
+
+
+def comparison_name(name):
+    """Return the part of a symbol name used to search it."""
+    index = name.find('(')
+    if index != -1:
+        return name[:index]
+    return name
+
+
+def _create_schema(connection):
+    version = connection.execute("PRAGMA user_version").fetchone()[0]
+    if version != SCHEMA_VERSION:
+        for table in _OLD_TABLES:
+            connection.execute("DROP TABLE IF EXISTS {}".format(table))
+    for statement in _SCHEMA:
+        connection.execute(statement)
+    try:
+        for statement in _FTS_SCHEMA:
+            connection.execute(statement)
+    except sqlite3.OperationalError:
+        # Built without FTS5 or too old for the trigram tokenizer,
+        # searches fall back to LIKE
+        pass
+    connection.execute("PRAGMA user_version = {}".format(SCHEMA_VERSION))
+    connection.commit()
+
+
+def connect(path=DB_PATH, check_same_thread=True):
+    connection = sqlite3.connect(
+        path, timeout=10, check_same_thread=check_same_thread)
+    # Readers do not block the indexer (and the other way around), and
+    # commits do not wait for the disk
+    connection.execute("PRAGMA journal_mode = WAL")
+    connection.execute("PRAGMA synchronous = NORMAL")
+    _create_schema(connection)
+    return connection
+
+
+class BatchCommitter(object):
+    """Commit every max_files stored files or max_delay seconds."""
+
+    def __init__(self, connection, max_files=BATCH_FILES,
+                 max_delay=BATCH_DELAY):
+        self._connection = connection
+        self._max_files = max_files
+        self._max_delay = max_delay
+        self._pending = 0
+        self._last_commit = time.monotonic()
+
+    def stored(self):
+        """Count a stored file, return True if it was committed."""
+        self._pending += 1
+        if (self._pending >= self._max_files or
+                time.monotonic() - self._last_commit >= self._max_delay):
+            self.commit()
+            return True
+        return False
+
+    def commit(self):
+        self._connection.commit()
+        self._pending = 0
+        self._last_commit = time.monotonic()
+
+
+def has_fts(connection):
+    cursor = connection.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'symbols_fts'")
+    return cursor.fetchone() is not None
+
+
+def file_mtime(connection, path):
+    """Return the mtime of path when it was indexed, or None."""
+    row = connection.execute(
+        "SELECT mtime FROM files WHERE path = ?", (path,)).fetchone()
+    return row[0] if row is not None else None
+
+
+def remove_file(connection, path):
+    row = connection.execute(
+        "SELECT id FROM files WHERE path = ?", (path,)).fetchone()
+    if row is None:
+        return
+    connection.execute("DELETE FROM symbols WHERE file_id = ?", row)
+    connection.execute("DELETE FROM files WHERE id = ?", row)
+
+
+def store_file(connection, path, project, mtime, kind, symbols):
+    """Replace the symbols of path.
+
+    kind is the locator filter of the file itself and symbols a list of
+    (kind, name, line, parent), parent being the index in symbols of the
+    symbol that contains it or None."""
+    remove_file(connection, path)
+    cursor = connection.execute(
+        "INSERT INTO files(path, project, mtime) VALUES (?, ?, ?)",
+        (path, project, mtime))
+    file_id = cursor.lastrowid
+    # The ids are given here so the members can point to their parent,
+    # this connection holds the write lock since the insert above
+    file_symbol_id = connection.execute(
+        "SELECT COALESCE(MAX(id), 0) + 1 FROM symbols").fetchone()[0]
+    first_id = file_symbol_id + 1
+    rows = [(file_symbol_id, file_id, os.path.basename(path), kind, -1,
+             None)]
+    for index, (symbol_kind, name, line, parent) in enumerate(symbols):
+        if parent is not None:
+            parent += first_id
+        rows.append(
+            (first_id + index, file_id, name, symbol_kind, line, parent))
+    connection.executemany(
+        "INSERT INTO symbols(id, file_id, name, lname, kind, line, "
+        "parent_id) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [(symbol_id, file_id, name, comparison_name(name).lower(),
+          symbol_kind, line, parent)
+         for symbol_id, file_id, name, symbol_kind, line, parent in rows])
+
+
+def _fts_phrase(text):
+    return '"{}"'.format(text.replace('"', '""'))
+
+
+def _like_pattern(text):
+    escaped = text.replace('\\', '\\\\').replace('%', '\\%')
+    return '%{}%'.format(escaped.replace('_', '\\_'))
+
+
+def search(connection, text='', kinds=(), path=None, limit=-1, offset=0):
+    """Return [(kind, name, path, line)] sorted by name.
+
+    text is searched (case insensitive) anywhere in the symbol names,
+    kinds restricts the locator filters and path the file."""
+    clauses = []
+    args = []
+    text = text.lower()
+    if text:
+        if len(text) >= FTS_MIN_LENGTH and has_fts(connection):
+            clauses.append(
+                "symbols.id IN (SELECT rowid FROM symbols_fts "
+                "WHERE symbols_fts MATCH ?)")
+            args.append(_fts_phrase(text))
+        else:
+            clauses.append("symbols.lname LIKE ? ESCAPE '\\'")
+            args.append(_like_pattern(text))
+    if kinds:
+        clauses.append("symbols.kind IN ({})".format(
+            ', '.join('?' * len(kinds))))
+        args.extend(kinds)
+    if path is not None:
+        clauses.append("files.path = ?")
+        args.append(path)
+    query = ("SELECT symbols.kind, symbols.name, files.path, symbols.line "
+             "FROM symbols JOIN files ON files.id = symbols.file_id")
+    if clauses:
+        query += " WHERE " + " AND ".join(clauses)
+    query += " ORDER BY symbols.name LIMIT ? OFFSET ?"
+    return connection.execute(query, args + [limit, offset]).fetchall()
+
+
+def definitions(connection, name, kinds=()):
+    """Return [(kind, name, path, line)] of the symbols called name.
+
+    Functions and classes are stored with their signature, they are
+    looked up by their comparison_name. It is a lookup on the lname
+    index, it does not depend on the number of symbols."""
+    name = comparison_name(name)
+    query = ("SELECT symbols.kind, symbols.name, files.path, symbols.line "
+             "FROM symbols JOIN files ON files.id = symbols.file_id "
+             "WHERE symbols.lname = ?")
+    args = [name.lower()]
+    if kinds:
+        query += " AND symbols.kind IN ({})".format(
+            ', '.join('?' * len(kinds)))
+        args.extend(kinds)
+    # lname ignores case, the names must be the same
+    return [row for row in connection.execute(query, args)
+            if comparison_name(row[1]) == name]
+
+
+def members(connection, path, parent_name, parent_kind, text='',
+            kinds=()):
+    """Return [(kind, name, path, line)] of the symbols declared
+    directly inside the parent_name symbol of path, sorted by line.
+
+    text and kinds filter them as in search."""
+    query = ("SELECT member.kind, member.name, files.path, member.line "
+             "FROM files JOIN symbols AS parent ON parent.file_id = files.id "
+             "JOIN symbols AS member ON member.parent_id = parent.id "
+             "WHERE files.path = ? AND parent.name = ? AND parent.kind = ?")
+    args = [path, parent_name, parent_kind]
+    if text:
+        query += " AND member.lname LIKE ? ESCAPE '\\'"
+        args.append(_like_pattern(text.lower()))
+    if kinds:
+        query += " AND member.kind IN ({})".format(
+            ', '.join('?' * len(kinds)))
+        args.extend(kinds)
+    query += " ORDER BY member.line"
+    return connection.execute(query, args).fetchall()
+
+
+def symbol_names(connection, kinds=()):
+    """Return [(id, name)] of all the symbols (of kinds)."""
+    query = "SELECT id, name FROM symbols"
+    args = []
+    if kinds:
+        query += " WHERE kind IN ({})".format(', '.join('?' * len(kinds)))
+        args.extend(kinds)
+    return connection.execute(query, args).fetchall()
+
+
+def file_symbols(connection, path):
+    """Return [(id, name, kind)] of the symbols of path."""
+    return connection.execute(
+        "SELECT symbols.id, symbols.name, symbols.kind FROM symbols "
+        "JOIN files ON files.id = symbols.file_id WHERE files.path = ? "
+        "ORDER BY symbols.id", (path,)).fetchall()
+
+
+def symbols_by_id(connection, ids):
+    """Return [(kind, name, path, line)] of the symbols in ids order."""
+    rows = {}
+    ids = list(ids)
+    # Keep below the limit of variables of old SQLite versions
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        query = ("SELECT symbols.id, symbols.kind, symbols.name, files.path, "
+                 "symbols.line FROM symbols "
+                 "JOIN files ON files.id = symbols.file_id "
+                 "WHERE symbols.id IN ({})".format(
+                     ', '.join('?' * len(chunk))))
+        for row in connection.execute(query, chunk):
+            rows[row[0]] = row[1:]
+    return [rows[symbol_id] for symbol_id in ids if symbol_id in rows]
+
+
+def project_files(connection, project):
+    """Return {path: mtime} of the indexed files of project."""
+    return dict(connection.execute(
+        "SELECT path, mtime FROM files WHERE project = ?", (project,)))
+
+
+def remove_project(connection, project):
+    connection.execute(
+        "DELETE FROM symbols WHERE file_id IN "
+        "(SELECT id FROM files WHERE project = ?)", (project,))
+    connection.execute("DELETE FROM files WHERE project = ?", (project,))
+
+
+def prune(connection, projects):
+    """Remove the files that do not exist anymore or whose project is
+    not in projects. Return the number of files removed."""
+    projects = set(projects)
+    gone = [(path,) for path, project in connection.execute(
+        "SELECT path, project FROM files")
+        if (project is not None and project not in projects) or
+        not os.path.exists(path)]
+    connection.executemany(
+        "DELETE FROM symbols WHERE file_id IN "
+        "(SELECT id FROM files WHERE path = ?)", gone)
+    connection.executemany("DELETE FROM files WHERE path = ?", gone)
+    connection.commit()
+    return len(gone)
+
+
+def vacuum(connection, force=False):
+    """Give the free pages back to the filesystem if there are many.
+
+    Return True if the database was vacuumed."""
+    free = connection.execute("PRAGMA freelist_count").fetchone()[0]
+    total = connection.execute("PRAGMA page_count").fetchone()[0]
+    if not force and (not total or free / total < VACUUM_FREE_RATIO):
+        return False
+    connection.commit()
+    connection.execute("VACUUM")
+    return True
@@ -23,10 +23,14 @@ from PyQt5.QtWidgets import QShortcut
 
 from PyQt5.QtGui import QKeySequence
 from PyQt5.QtCore import Qt
+from PyQt5.QtCore import QTimer
+from PyQt5.QtCore import QAbstractListModel
+from PyQt5.QtCore import QModelIndex
 from PyQt5.QtQuickWidgets import QQuickWidget
 
 # from ninja_ide.utils import
 from ninja_ide import resources
+from ninja_ide import translations
 from ninja_ide.core import settings
 from ninja_ide.core.file_handling import file_manager
 from ninja_ide.tools import ui_tools
@@ -38,6 +42,21 @@ from ninja_ide.tools.logger import NinjaLogger
 logger = NinjaLogger(__name__)
 DEBUG = logger.debug
 
+# Time between the prunes of the locator knowledge (milliseconds)
+MAINTENANCE_INTERVAL = 10 * 60 * 1000
+
+COLORS = {
+    "@": "#5dade2",
+    "<": "#4becc9",
+    ">": "#ff555a",
+    "-": "#66ff99",
+    ".": "#a591c6",
+    "/": "#f9d170",
+    ":": "#18ffd6",
+    "!": "#ff884d"}
+
+REPLACE_SYMBOL_TYPE = {"<": "&lt;", ">": "&gt;"}
+
 
 class LocatorWidget(QDialog):
     """LocatorWidget class with the Logic for the QML UI"""
@@ -51,8 +70,10 @@ class LocatorWidget(QDialog):
         self.setStyleSheet("background:transparent;")
         self.setFixedHeight(400)
         self.setFixedWidth(500)
+        self._model = LocatorResultsModel(self)
         view = QQuickWidget()
         view.rootContext().setContextProperty("theme", resources.QML_COLORS)
+        view.rootContext().setContextProperty("locatorModel", self._model)
         view.setResizeMode(QQuickWidget.SizeRootObjectToView)
         view.setSource(ui_tools.get_qml_resource("Locator.qml"))
         self._root = view.rootObject()
@@ -63,6 +84,13 @@ class LocatorWidget(QDialog):
 
         self.locate_symbols = locator.LocateSymbolsThread()
         self.locate_symbols.finished.connect(self._cleanup)
+        self.locate_symbols.progress.connect(self._on_index_progress)
+        # Prune the locator knowledge from time to time
+        self._maintenance_timer = QTimer(self)
+        self._maintenance_timer.setInterval(MAINTENANCE_INTERVAL)
+        self._maintenance_timer.timeout.connect(
+            self.locate_symbols.find_maintenance)
+        self._maintenance_timer.start()
         # FIXME: invalid signal
         # self.locate_symbols.terminated.connect(self._cleanup)
         # Hide locator with Escape key
@@ -71,16 +99,7 @@ class LocatorWidget(QDialog):
 
         # Locator things
         self.filterPrefix = re.compile(r'(@|<|>|-|!|\.|/|:)')
-        self.page_items_step = 10
-        self._colors = {
-            "@": "#5dade2",
-            "<": "#4becc9",
-            ">": "#ff555a",
-            "-": "#66ff99",
-            ".": "#a591c6",
-            "/": "#f9d170",
-            ":": "#18ffd6",
-            "!": "#ff884d"}
+        self._colors = COLORS
         self._filters_list = [
             ("@", "Filename"),
             ("<", "Class"),
@@ -91,7 +110,7 @@ class LocatorWidget(QDialog):
             (":", "Line"),
             ("!", "NoPython")
         ]
-        self._replace_symbol_type = {"<": "&lt;", ">": "&gt;"}
+        self._replace_symbol_type = REPLACE_SYMBOL_TYPE
         self.reset_values()
 
         self._filter_actions = {
@@ -100,7 +119,7 @@ class LocatorWidget(QDialog):
             ':': self._filter_lines
         }
         self._root.textChanged['QString'].connect(self.set_prefix)
-        self._root.open['QString', int].connect(self._open_item)
+        self._root.open[int].connect(self._open_item)
         self._root.fetchMore.connect(self._fetch_more)
 
     def reset_values(self):
@@ -109,7 +128,6 @@ class LocatorWidget(QDialog):
         self.__pre_filters = []
         self.__pre_results = []
         self.tempLocations = []
-        self.items_in_page = 0
         self._line_jump = -1
 
     def showEvent(self, event):
@@ -121,12 +139,24 @@ class LocatorWidget(QDialog):
     def _cleanup(self):
         self.locate_symbols.wait()
 
+    def _on_index_progress(self, done, total):
+        if total:
+            ninjaide = IDE.get_service('ide')
+            ninjaide.show_message(
+                translations.TR_INDEXING_PROJECT.format(done, total), 2000)
+
     def explore_code(self):
         self.locate_symbols.find_code_location()
 
     def explore_file_code(self, path):
         self.locate_symbols.find_file_code_location(path)
 
+    def explore_changed_file(self, event, path):
+        self.locate_symbols.find_changed_file_location(event, path)
+
+    def forget_project(self, project_path):
+        self.locate_symbols.forget_project(project_path)
+
     def set_prefix(self, prefix):
         """Set the prefix for the completer."""
         self.__prefix = prefix.lower()
@@ -137,9 +167,8 @@ class LocatorWidget(QDialog):
         self._root.setText(text)
 
     def _refresh_filter(self):
-        items = self.filter()
-        self._root.clear()
-        self._load_items(items)
+        self._model.set_locations(self.filter())
+        self._root.resetCurrent()
         filter_composite = ""
         for symbol, text in self._filters_list:
             typeIcon = self._replace_symbol_type.get(symbol, symbol)
@@ -153,33 +182,16 @@ class LocatorWidget(QDialog):
                 filter_composite += composite
         self._root.setFilterComposite(filter_composite)
 
-    def _load_items(self, items):
-        for item in items:
-            typeIcon = self._replace_symbol_type.get(item.type, item.type)
-            if settings.IS_WINDOWS:
-                display_path = item.path
-            else:
-                display_path = utils.path_with_tilde_homepath(item.path)
-            self._root.loadItem(typeIcon, item.name, item.lineno,
-                                item.path, display_path, self._colors[item.type])
-
     def _fetch_more(self):
-        locations = self._create_list_items(self.tempLocations)
-        self._load_items(locations)
-
-    def _create_list_items(self, locations):
-        """Create a list of items (using pages for results to speed up)."""
-        # The list is regenerated when the locate metadata is updated
-        # for example: open project, etc.
-        # Create the list items
-        begin = self.items_in_page
-        self.items_in_page += self.page_items_step
-        locations_view = [x for x in locations[begin:self.items_in_page]]
-        return locations_view
+        if self._model.canFetchMore():
+            self._model.fetchMore()
+
+    def _current_item(self):
+        """Return the ResultItem selected in the list, or None."""
+        return self._model.item(int(self._root.currentIndex()))
 
     def filter(self):
         self._line_jump = -1
-        self.items_in_page = 0
 
         filterOptions = self.filterPrefix.split(self.__prefix.lstrip())
         if not filterOptions[0]:
@@ -188,14 +200,13 @@ class LocatorWidget(QDialog):
         if len(filterOptions) == 0:
             self.tempLocations = self.locate_symbols.get_locations()
         elif len(filterOptions) == 1:
-            self.tempLocations = [
-                x for x in self.locate_symbols.get_locations()
-                if x.comparison.lower().find(filterOptions[0].lower()) > -1]
+            self.tempLocations = self.locate_symbols.get_matches(
+                filterOptions[0])
         else:
             index = 0
             if not self.tempLocations and (self.__pre_filters == filterOptions):
                 self.tempLocations = self.__pre_results
-                return self._create_list_items(self.tempLocations)
+                return self.tempLocations
             while index < len(filterOptions):
                 filter_action = self._filter_actions.get(
                     filterOptions[index], self._filter_generic)
@@ -205,32 +216,26 @@ class LocatorWidget(QDialog):
             if self.tempLocations:
                 self.__pre_filters = filterOptions
                 self.__pre_results = self.tempLocations
-        return self._create_list_items(self.tempLocations)
+        return self.tempLocations
 
     def _filter_generic(self, filterOptions, index):
         at_start = (index == 0)
         if at_start:
-            self.tempLocations = [
-                x for x in self.locate_symbols.get_locations()
-                if x.type == filterOptions[0] and
-                x.comparison.lower().find(filterOptions[1].lower()) > -1]
+            self.tempLocations = self.locate_symbols.get_matches(
+                filterOptions[1], (filterOptions[0],))
         else:
-            currentItem = self._root.currentItem()
+            currentItem = self._current_item()
             if currentItem is not None:
-                currentItem = currentItem.toVariant()
-                if (filterOptions[index - 2] == locator.FILTERS['classes'] and
-                        currentItem):
-                    symbols = self.locate_symbols.get_symbols_for_class(
-                        currentItem[2], currentItem[1])
-                    self.tempLocations = symbols
-                elif currentItem:
-                    global mapping_symbols
-                    self.tempLocations = locator.mapping_symbols.get(
-                        currentItem[2], [])
-                self.tempLocations = [x for x in self.tempLocations
-                                      if x.type == filterOptions[index] and
-                                      x.comparison.lower().find(
-                                        filterOptions[index + 1].lower()) > -1]
+                if filterOptions[index - 2] == locator.FILTERS['classes']:
+                    self.tempLocations = (
+                        self.locate_symbols.get_symbols_for_class(
+                            currentItem.path, currentItem.name,
+                            filterOptions[index + 1],
+                            (filterOptions[index],)))
+                else:
+                    self.tempLocations = self.locate_symbols.get_locations(
+                        filterOptions[index + 1], (filterOptions[index],),
+                        currentItem.path)
         return index + 2
 
     def _filter_this_file(self, filterOptions, index):
@@ -297,29 +302,25 @@ class LocatorWidget(QDialog):
                 else:
                     filterOptions.insert(0, locator.FILTERS['non-python'])
                 filterOptions.insert(1, editorWidget.file_path)
-            self.tempLocations = [
-                x for x in self.locate_symbols.get_locations()
-                if x.type == filterOptions[0] and
-                x.path == filterOptions[1]]
+            self.tempLocations = self.locate_symbols.get_locations(
+                kinds=(filterOptions[0],), path=filterOptions[1])
         else:
-            currentItem = self._root.currentItem()
+            currentItem = self._current_item()
             if currentItem is not None:
-                currentItem = currentItem.toVariant()
-                self.tempLocations = [
-                    x for x in self.locate_symbols.get_locations()
-                    if x.type == currentItem[0] and
-                    x.path == currentItem[2]]
+                self.tempLocations = self.locate_symbols.get_locations(
+                    kinds=(currentItem.type,), path=currentItem.path)
         if filterOptions[index + 1].isdigit():
             self._line_jump = int(filterOptions[index + 1]) - 1
         return index + 2
 
-    def _open_item(self, path, lineno):
-        """Open the item received."""
+    def _open_item(self, row):
+        """Open the item of the row received."""
+        item = self._model.item(row)
         main_container = IDE.get_service('main_container')
-        if not main_container:
+        if not main_container or item is None:
             return
-        jump = lineno if self._line_jump == -1 else self._line_jump
-        main_container.open_file(path, jump)
+        jump = item.lineno if self._line_jump == -1 else self._line_jump
+        main_container.open_file(item.path, jump)
         self.hide()
 
     def hideEvent(self, event):
@@ -327,5 +328,99 @@ class LocatorWidget(QDialog):
         # clean
         self._avoid_refresh = True
         self._root.cleanText()
-        self._root.clear()
+        self._model.clear()
         self.reset_values()
+
+
+class LocatorResultsModel(QAbstractListModel):
+    """Results of the locator for the QML list.
+
+    The locations (a list or a lazy locator.SymbolsQuery) are read in
+    FETCH_STEP pages as the view scrolls, so only the rows that were
+    reached are converted and only the visible ones get a delegate."""
+
+    TypeRole = Qt.UserRole + 1
+    NameRole = Qt.UserRole + 2
+    LinenoRole = Qt.UserRole + 3
+    PathRole = Qt.UserRole + 4
+    DisplayPathRole = Qt.UserRole + 5
+    ColorTypeRole = Qt.UserRole + 6
+
+    FETCH_STEP = 50
+
+    def __init__(self, parent=None):
+        super(LocatorResultsModel, self).__init__(parent)
+        self.__locations = []
+        self.__items = []
+        self.__exhausted = True
+
+    def roleNames(self):
+        return {
+            self.TypeRole: b"type",
+            self.NameRole: b"name",
+            self.LinenoRole: b"lineno",
+            self.PathRole: b"path",
+            self.DisplayPathRole: b"displayPath",
+            self.ColorTypeRole: b"colorType"
+        }
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.__items)
+
+    def item(self, row):
+        if 0 <= row < len(self.__items):
+            return self.__items[row]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        item = self.item(index.row()) if index.isValid() else None
+        if item is None:
+            return None
+        if role == self.NameRole or role == Qt.DisplayRole:
+            return item.name
+        elif role == self.TypeRole:
+            return REPLACE_SYMBOL_TYPE.get(item.type, item.type)
+        elif role == self.LinenoRole:
+            return item.lineno
+        elif role == self.PathRole:
+            return item.path
+        elif role == self.DisplayPathRole:
+            if settings.IS_WINDOWS:
+                return item.path
+            return utils.path_with_tilde_homepath(item.path)
+        elif role == self.ColorTypeRole:
+            return COLORS.get(item.type, "#8f8f8f")
+        return None
+
+    def set_locations(self, locations):
+        """Show locations, replacing the current results."""
+        self.beginResetModel()
+        self.__locations = locations
+        self.__items = []
+        self.__exhausted = False
+        self.endResetModel()
+        self.fetchMore()
+
+    def append_items(self, items):
+        """Add items at the end, for results that arrive in parts."""
+        if not items:
+            return
+        first = len(self.__items)
+        self.beginInsertRows(QModelIndex(), first, first + len(items) - 1)
+        self.__items.extend(items)
+        self.endInsertRows()
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not self.__exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        begin = len(self.__items)
+        page = list(self.__locations[begin:begin + self.FETCH_STEP])
+        if len(page) < self.FETCH_STEP:
+            self.__exhausted = True
+        self.append_items(page)
+
+    def clear(self):
+        self.set_locations([])
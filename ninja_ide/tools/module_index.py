@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Index of the modules importable by an interpreter.
+
+Each sys.path entry is listed once with os.scandir and re-listed only
+when its mtime changes, so resolving an import is a dict lookup instead
+of an import attempt."""
+
+import ast
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import zipfile
+
+_SYS_PATH_SCRIPT = (
+    "import sys\nimport json\n"
+    "print(json.dumps({'path': sys.path, "
+    "'builtins': sys.builtin_module_names}))"
+)
+
+MODULE_SUFFIXES = ('.py', '.pyc', '.pyo', '.pyw', '.so', '.pyd')
+
+# Do not stat the sys.path entries more often than this (seconds)
+REFRESH_INTERVAL = 5
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def _module_name(entry_name, is_dir):
+    """Return the module name provided by a directory entry, or None."""
+    if is_dir:
+        return entry_name if entry_name.isidentifier() else None
+    if entry_name.endswith(MODULE_SUFFIXES):
+        name = entry_name.partition('.')[0]
+        if name.isidentifier():
+            return name
+    return None
+
+
+def _list_folder(folder):
+    """Return {module name: package folder or None} found in folder."""
+    modules = {}
+    try:
+        iterator = os.scandir(folder)
+    except OSError:
+        return modules
+    for entry in iterator:
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            continue
+        name = _module_name(entry.name, is_dir)
+        if name is None:
+            continue
+        if is_dir:
+            modules[name] = entry.path
+        else:
+            modules.setdefault(name, None)
+    return modules
+
+
+def _list_zip(path):
+    modules = {}
+    try:
+        with zipfile.ZipFile(path) as archive:
+            names = archive.namelist()
+    except (OSError, zipfile.BadZipFile):
+        return modules
+    for name in names:
+        top, sep, _ = name.partition('/')
+        module = _module_name(top, bool(sep))
+        if module is not None:
+            # Submodules inside archives are not indexed
+            modules.setdefault(module, None)
+    return modules
+
+
+class ModuleIndex(object):
+    """Modules importable from a list of path entries."""
+
+    def __init__(self, paths, builtins=()):
+        self._paths = [path for path in paths if path]
+        self._builtins = frozenset(builtins)
+        self._lock = threading.Lock()
+        # path entry or package folder -> (mtime, {name: folder or None})
+        self._listings = {}
+        self._top_level = {}
+        self._last_refresh = 0
+
+    @property
+    def paths(self):
+        return list(self._paths)
+
+    def _listing(self, folder):
+        """Return the cached listing of folder, re-listing it if changed."""
+        try:
+            mtime = os.stat(folder).st_mtime
+        except OSError:
+            self._listings.pop(folder, None)
+            return {}
+        cached = self._listings.get(folder)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        if os.path.isdir(folder):
+            modules = _list_folder(folder)
+        elif zipfile.is_zipfile(folder):
+            modules = _list_zip(folder)
+        else:
+            modules = {}
+        self._listings[folder] = (mtime, modules)
+        return modules
+
+    def refresh(self, force=False):
+        """Re-list the path entries that changed since the last refresh."""
+        with self._lock:
+            now = time.time()
+            if not force and now - self._last_refresh < REFRESH_INTERVAL:
+                return
+            self._last_refresh = now
+            top_level = {}
+            # Later entries never shadow earlier ones, but all the
+            # folders of a namespace package are kept
+            for path in self._paths:
+                for name, folder in self._listing(path).items():
+                    top_level.setdefault(name, []).append(folder)
+            self._top_level = top_level
+
+    def _resolve_in(self, folders, parts):
+        for part in parts:
+            found = []
+            for folder in folders:
+                if folder is None:
+                    # Plain modules may fake submodules (like os.path),
+                    # those can not be checked without importing them
+                    return True
+                listing = self._listing(folder)
+                if part in listing:
+                    found.append(listing[part])
+            if not found:
+                return False
+            folders = found
+        return True
+
+    def resolve(self, module, extra_paths=(), level=0, filename=''):
+        """Return True if module can be imported.
+
+        extra_paths are searched before the interpreter paths (the folder
+        of the script and the project), level and filename are used for
+        relative imports."""
+        self.refresh()
+        parts = module.split('.') if module else []
+        with self._lock:
+            if level:
+                folder = os.path.dirname(filename)
+                for _ in range(level - 1):
+                    folder = os.path.dirname(folder)
+                return self._resolve_in([folder], parts)
+            if not parts:
+                return True
+            top = parts[0]
+            if top in self._builtins:
+                return len(parts) == 1
+            folders = []
+            for path in extra_paths:
+                listing = self._listing(path)
+                if top in listing:
+                    folders.append(listing[top])
+            folders.extend(self._top_level.get(top, ()))
+            if not folders:
+                return False
+            return self._resolve_in(folders, parts[1:])
+
+
+class _ImportsVisitor(ast.NodeVisitor):
+
+    GUARDS = ('ImportError', 'ModuleNotFoundError', 'Exception')
+
+    def __init__(self):
+        self.imports = []
+        self._guarded = 0
+
+    def _is_guard(self, handler):
+        if handler.type is None:
+            return True
+        types = handler.type.elts if isinstance(
+            handler.type, ast.Tuple) else [handler.type]
+        return any(getattr(t, 'id', None) in self.GUARDS for t in types)
+
+    def visit_Try(self, node):
+        guarded = any(self._is_guard(handler) for handler in node.handlers)
+        self._guarded += guarded
+        for stmt in node.body:
+            self.visit(stmt)
+        self._guarded -= guarded
+        for child in node.handlers + node.orelse + node.finalbody:
+            self.visit(child)
+
+    def visit_Import(self, node):
+        if not self._guarded:
+            for alias in node.names:
+                self.imports.append((node.lineno, alias.name, 0))
+
+    def visit_ImportFrom(self, node):
+        if not self._guarded:
+            self.imports.append((node.lineno, node.module or '', node.level))
+
+
+def find_imports(source):
+    """Return [(lineno, module, level)] for the imports in source that
+    are not guarded by an ImportError handler."""
+    visitor = _ImportsVisitor()
+    visitor.visit(ast.parse(source))
+    return visitor.imports
+
+
+def _interpreter_paths(interpreter):
+    if not interpreter or interpreter == sys.executable:
+        return sys.path, sys.builtin_module_names
+    try:
+        output = subprocess.check_output(
+            [interpreter, "-c", _SYS_PATH_SCRIPT], stderr=subprocess.DEVNULL)
+        info = json.loads(output.decode())
+    except (OSError, ValueError, subprocess.CalledProcessError):
+        return sys.path, sys.builtin_module_names
+    return info['path'], info['builtins']
+
+
+def get_index(interpreter):
+    """Return the (shared) ModuleIndex of an interpreter executable."""
+    with _indexes_lock:
+        index = _indexes.get(interpreter)
+        if index is None:
+            paths, builtins = _interpreter_paths(interpreter)
+            # The current directory depends on the checked file
+            paths = [path for path in paths if path not in ('', '.')]
+            index = ModuleIndex(paths, builtins)
+            _indexes[interpreter] = index
+    return index
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Replace the matches of a search of grep_engine in files.
+
+Every file is written to a temporary file next to it and renamed over
+the original, so it is never left half written. The original contents
+are kept in a ReplaceJournal before writing, the whole operation can
+then be undone for the files that were not changed again since."""
+
+import codecs
+import hashlib
+import json
+import os
+import shutil
+try:
+    from re import _parser as sre_parse
+except ImportError:
+    import sre_parse
+
+from ninja_ide.core.file_handling.file_manager import write_atomic
+from ninja_ide.tools import grep_engine
+
+MANIFEST = 'manifest.json'
+
+
+def compile_replacement(text, pattern, regex=False):
+    """Return the replacement of text for the matches of pattern (a
+    SearchPattern), group references are only expanded for regular
+    expressions. Raise re.error if they are not valid."""
+    replacement = text
+    if not pattern.decoded:
+        replacement = text.encode('utf-8')
+    if regex:
+        sre_parse.parse_template(replacement, pattern.regex)
+        return replacement
+    return lambda match: replacement
+
+
+def replace_buffer(data, pattern, replacement):
+    """Return (data with the matches of pattern replaced, matches)."""
+    if not pattern.may_match(data):
+        return data, 0
+    if pattern.decoded:
+        # Invalid bytes are written back as they were
+        text, count = pattern.regex.subn(
+            replacement, data.decode('utf-8', 'surrogateescape'))
+        return text.encode('utf-8', 'surrogateescape'), count
+    return pattern.regex.subn(replacement, data)
+
+
+def preview_line(line, pattern, replacement):
+    """Return line as it is after the replacement."""
+    data = replace_buffer(line.encode('utf-8'), pattern, replacement)[0]
+    return data.decode('utf-8', 'replace')
+
+
+def _digest(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+class ReplaceJournal(object):
+    """The original contents of the files changed by one replace.
+
+    They are stored in folder, with a manifest rewritten after every
+    file, so the files written before a crash can be restored too."""
+
+    def __init__(self, folder):
+        self._folder = folder
+        self._entries = self._load()
+
+    def _load(self):
+        try:
+            with open(os.path.join(self._folder, MANIFEST)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return []
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        """Forget the previous operation."""
+        shutil.rmtree(self._folder, ignore_errors=True)
+        self._entries = []
+
+    def record(self, path, original, written):
+        """Keep original, the content of path before writing written
+        on it. Call it before writing the file."""
+        os.makedirs(self._folder, exist_ok=True)
+        backup = str(len(self._entries))
+        write_atomic(os.path.join(self._folder, backup), original)
+        self._entries.append(
+            {'path': path, 'backup': backup, 'written': _digest(written)})
+        write_atomic(os.path.join(self._folder, MANIFEST),
+                     json.dumps(self._entries).encode('utf-8'))
+
+    def undo(self):
+        """Restore the files recorded, return (restored, skipped) paths,
+        a file is skipped if its content is not the one written."""
+        restored = []
+        skipped = []
+        for entry in reversed(self._entries):
+            path = entry['path']
+            try:
+                with open(path, 'rb') as f:
+                    current = f.read()
+                if _digest(current) != entry['written']:
+                    skipped.append(path)
+                    continue
+                with open(os.path.join(self._folder, entry['backup']),
+                          'rb') as f:
+                    write_atomic(path, f.read())
+                restored.append(path)
+            except OSError:
+                skipped.append(path)
+        self.clear()
+        return restored, skipped
+
+
+# The codecs of the BOMs, the utf-16 and utf-32 codecs write the BOM of
+# the native byte order instead of the one the file had
+_BOM_CODECS = (
+    (codecs.BOM_UTF32_LE, 'utf-32-le'),
+    (codecs.BOM_UTF32_BE, 'utf-32-be'),
+    (codecs.BOM_UTF16_LE, 'utf-16-le'),
+    (codecs.BOM_UTF16_BE, 'utf-16-be'),
+)
+
+
+def _encode(text, encoding, original):
+    """Encode text as original (bytes in encoding) was, with the same
+    byte order and BOM."""
+    if encoding in ('utf-16', 'utf-32'):
+        for bom, codec in _BOM_CODECS:
+            if original.startswith(bom):
+                return bom + text.encode(codec)
+    return text.encode(encoding)
+
+
+def replace_file(path, pattern, replacement, journal=None):
+    """Replace the matches of pattern in path, return their number.
+
+    The file keeps its encoding, binary files are not changed. The
+    original content is recorded in journal before writing. Raise
+    UnicodeError if the file is not valid in its encoding."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    encoding = grep_engine.detect_encoding(data[:grep_engine.SNIFF_SIZE])
+    if encoding is None:
+        return 0
+    new_data, count = replace_buffer(
+        grep_engine.to_utf8(data, encoding), pattern, replacement)
+    if count:
+        if encoding != 'utf-8':
+            new_data = _encode(new_data.decode('utf-8'), encoding, data)
+        if journal is not None:
+            journal.record(path, data, new_data)
+        write_atomic(path, new_data)
+    return count
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Cache of the symbols extracted from sources, keyed by their content.
+
+The results are kept marshalled, in a LRU in memory and in a SQLite
+file shared by the IDE and the locator processes, so every caller gets
+its own copy and an unchanged source is parsed only once. The records
+are written by a thread of each process, the callers (the GUI thread
+among them) never wait for the disk."""
+
+import hashlib
+import marshal
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+# Results kept in memory
+MEMORY_SIZE = 256
+# Records kept on disk, the least recently used are removed beyond this
+MAX_RECORDS = 20000
+# Check the number of records every PRUNE_EVERY stores
+PRUNE_EVERY = 500
+
+
+class SymbolsCache(object):
+    """Cache the results of an extractor.
+
+    version tags the output of the extractor, the records of other
+    versions (or other Python versions, the AST can differ) are
+    discarded. path is None to keep the cache in memory only."""
+
+    def __init__(self, path, version):
+        self._path = path
+        self._version = '{}-{}.{}'.format(version, *sys.version_info[:2])
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        # One connection per thread, the locator indexes in its own
+        self._local = threading.local()
+        self._stores = 0
+        # (pid, queue of the writer thread), a forked process starts
+        # its own
+        self._writer = (None, None)
+
+    def _connection(self):
+        if self._path is None:
+            return None
+        pid, connection = getattr(self._local, 'connection', (None, None))
+        if pid != os.getpid():
+            # Not opened yet, or opened before a fork: the connections
+            # can not be shared with the child processes
+            try:
+                connection = sqlite3.connect(self._path, timeout=2)
+                connection.execute("PRAGMA journal_mode = WAL")
+                connection.execute("PRAGMA synchronous = NORMAL")
+                # stored is the time the record was last used
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS records("
+                    "key BLOB PRIMARY KEY, version TEXT, data BLOB, "
+                    "stored REAL)")
+                connection.execute(
+                    "CREATE INDEX IF NOT EXISTS records_stored "
+                    "ON records(stored)")
+                connection.execute(
+                    "DELETE FROM records WHERE version != ?",
+                    (self._version,))
+                connection.commit()
+            except sqlite3.Error:
+                # Not writable or locked for too long, stay in memory
+                connection = False
+            self._local.connection = (os.getpid(), connection)
+        return connection or None
+
+    def _key(self, source, options):
+        if isinstance(source, str):
+            source = source.encode('utf-8', 'surrogatepass')
+        digest = hashlib.sha1(source)
+        digest.update(repr(options).encode('utf-8'))
+        return digest.digest()
+
+    def get(self, source, options, extract):
+        """Return the result of extract() for source, extract is only
+        called if the result for source and options is not cached."""
+        key = self._key(source, options)
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+        if data is None:
+            data = self._load(key)
+            if data is None:
+                result = extract()
+                try:
+                    data = marshal.dumps(result)
+                except ValueError:
+                    # Not marshallable, do not cache it
+                    return result
+                self._write(key, data)
+                self._remember(key, data)
+                return marshal.loads(data)
+            self._remember(key, data)
+        # Used, the record is kept longer on disk
+        self._write(key, None)
+        return marshal.loads(data)
+
+    def _remember(self, key, data):
+        with self._lock:
+            self._memory[key] = data
+            self._memory.move_to_end(key)
+            while len(self._memory) > MEMORY_SIZE:
+                self._memory.popitem(last=False)
+
+    def _load(self, key):
+        connection = self._connection()
+        if connection is None:
+            return None
+        try:
+            row = connection.execute(
+                "SELECT data FROM records WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error:
+            return None
+        return row[0] if row is not None else None
+
+    def _write(self, key, data):
+        """Queue the store of data for key, or with None the update of
+        its last use, for the writer thread."""
+        if self._path is None:
+            return
+        with self._lock:
+            pid, writes = self._writer
+            if pid != os.getpid():
+                writes = queue.Queue()
+                self._writer = (os.getpid(), writes)
+                threading.Thread(
+                    target=self._write_records, args=(writes,),
+                    name='SymbolsCacheWriter', daemon=True).start()
+        writes.put((key, data, time.time()))
+
+    def _write_records(self, writes):
+        while True:
+            records = [writes.get()]
+            # Everything queued meanwhile goes in the same transaction
+            while True:
+                try:
+                    records.append(writes.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._store(records)
+            finally:
+                for _ in records:
+                    writes.task_done()
+
+    def _store(self, records):
+        connection = self._connection()
+        if connection is None:
+            return
+        try:
+            for key, data, used in records:
+                if data is None:
+                    connection.execute(
+                        "UPDATE records SET stored = ? WHERE key = ?",
+                        (used, key))
+                    continue
+                connection.execute(
+                    "INSERT OR REPLACE INTO records(key, version, data, "
+                    "stored) VALUES (?, ?, ?, ?)",
+                    (key, self._version, data, used))
+                self._stores += 1
+                if self._stores % PRUNE_EVERY == 0:
+                    self._prune(connection)
+            connection.commit()
+        except sqlite3.Error:
+            # Another process is writing, the result is cached next time
+            connection.rollback()
+
+    def _prune(self, connection):
+        count = connection.execute(
+            "SELECT COUNT(*) FROM records").fetchone()[0]
+        if count > MAX_RECORDS:
+            connection.execute(
+                "DELETE FROM records WHERE key IN (SELECT key FROM records "
+                "ORDER BY stored LIMIT ?)", (count - MAX_RECORDS,))
+
+    def flush(self):
+        """Block until the queued writes of this process are done."""
+        pid, writes = self._writer
+        if pid == os.getpid():
+            writes.join()
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        self.flush()
+        connection = self._connection()
+        if connection is not None:
+            connection.execute("DELETE FROM records")
+            connection.commit()
@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Index of the trigrams of the files of a project.
+
+Each project has a SQLite file mapping every trigram (3 bytes, lower
+case) to the files that contain it. A search looks up the trigrams of
+the literal text its matches require and only scans the files that have
+all of them, plus the ones the index does not know in their current
+version. The index only narrows the candidates, a file missing from it
+or not updated yet is always scanned. extract runs in worker processes,
+so this module does not use Qt."""
+
+import hashlib
+import os
+import sqlite3
+
+from ninja_ide import resources
+from ninja_ide.tools import grep_engine
+
+INDEX_FOLDER = os.path.join(resources.NINJA_KNOWLEDGE_PATH, 'trigrams')
+
+# Bump when the schema or the extraction change, the old data is dropped
+SCHEMA_VERSION = 2
+
+# Bigger files are not indexed (they are always scanned)
+MAX_FILE_SIZE = 4 * 1024 * 1024
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS files("
+    "id INTEGER PRIMARY KEY, path TEXT UNIQUE, mtime REAL, trigrams BLOB)",
+    "CREATE TABLE IF NOT EXISTS postings("
+    "trigram BLOB, file_id INTEGER, PRIMARY KEY(trigram, file_id)) "
+    "WITHOUT ROWID",
+)
+
+
+def index_path(project_path):
+    """Return the path of the index of project_path."""
+    digest = hashlib.sha1(project_path.encode('utf-8', 'surrogateescape'))
+    return os.path.join(INDEX_FOLDER, digest.hexdigest() + '.db')
+
+
+def trigrams(data):
+    """Return the set of trigrams of data (bytes), ignoring case."""
+    data = data.lower()
+    return {data[index:index + 3] for index in range(len(data) - 2)}
+
+
+def extract(path):
+    """Return (path, mtime, trigrams) of path, trigrams is None if the
+    file is not indexable and mtime None if it can not be read.
+
+    The trigrams are the ones of the content in UTF-8, as searched."""
+    try:
+        mtime = os.stat(path).st_mtime
+        with open(path, 'rb') as f:
+            data = f.read(MAX_FILE_SIZE + 1)
+    except OSError:
+        return path, None, None
+    encoding = grep_engine.detect_encoding(data[:grep_engine.SNIFF_SIZE])
+    if len(data) > MAX_FILE_SIZE or encoding is None:
+        return path, mtime, None
+    try:
+        data = grep_engine.to_utf8(data, encoding)
+    except ValueError:
+        return path, mtime, None
+    return path, mtime, trigrams(data)
+
+
+class TrigramIndex(object):
+    """The trigram index stored at path."""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._connection = sqlite3.connect(
+            path, timeout=10, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute("PRAGMA synchronous = NORMAL")
+        # The postings are inserted all over the table, a bigger cache
+        # makes building the index much faster
+        self._connection.execute("PRAGMA cache_size = -32768")
+        version = self._connection.execute(
+            "PRAGMA user_version").fetchone()[0]
+        if version != SCHEMA_VERSION:
+            for table in ('postings', 'files'):
+                self._connection.execute(
+                    "DROP TABLE IF EXISTS {}".format(table))
+        for statement in _SCHEMA:
+            self._connection.execute(statement)
+        self._connection.execute(
+            "PRAGMA user_version = {}".format(SCHEMA_VERSION))
+        self._connection.commit()
+
+    def files(self):
+        """Return {path: mtime} of the indexed files."""
+        return dict(self._connection.execute(
+            "SELECT path, mtime FROM files"))
+
+    def remove(self, path):
+        row = self._connection.execute(
+            "SELECT id, trigrams FROM files WHERE path = ?",
+            (path,)).fetchone()
+        if row is None:
+            return
+        file_id, grams = row
+        if grams:
+            self._connection.executemany(
+                "DELETE FROM postings WHERE trigram = ? AND file_id = ?",
+                ((grams[index:index + 3], file_id)
+                 for index in range(0, len(grams), 3)))
+        self._connection.execute("DELETE FROM files WHERE id = ?", (file_id,))
+
+    def store(self, path, mtime, grams):
+        """Replace the trigrams of path, grams is None if it is not
+        indexable."""
+        self.remove(path)
+        blob = b''.join(sorted(grams)) if grams is not None else None
+        cursor = self._connection.execute(
+            "INSERT INTO files(path, mtime, trigrams) VALUES (?, ?, ?)",
+            (path, mtime, blob))
+        if grams:
+            file_id = cursor.lastrowid
+            self._connection.executemany(
+                "INSERT INTO postings(trigram, file_id) VALUES (?, ?)",
+                ((gram, file_id) for gram in grams))
+
+    def commit(self):
+        self._connection.commit()
+
+    def close(self):
+        self._connection.close()
+
+    def candidates(self, literals, paths):
+        """Return the paths that may contain all of literals (bytes):
+        the ones indexed with all their trigrams, plus the ones not
+        indexed in their current version."""
+        grams = set()
+        for literal in literals:
+            grams.update(trigrams(literal))
+        paths = list(paths)
+        if not grams:
+            return paths
+        found = None
+        for gram in grams:
+            ids = {row[0] for row in self._connection.execute(
+                "SELECT file_id FROM postings WHERE trigram = ?", (gram,))}
+            found = ids if found is None else found & ids
+            if not found:
+                break
+        indexed = {
+            path: (file_id, mtime, complete)
+            for file_id, path, mtime, complete in self._connection.execute(
+                "SELECT id, path, mtime, trigrams IS NOT NULL FROM files")}
+        result = []
+        for path in paths:
+            entry = indexed.get(path)
+            if entry is None:
+                result.append(path)
+                continue
+            file_id, mtime, complete = entry
+            if file_id in found or not complete:
+                result.append(path)
+                continue
+            try:
+                if os.stat(path).st_mtime != mtime:
+                    # Changed since it was indexed
+                    result.append(path)
+            except OSError:
+                pass
+        return result
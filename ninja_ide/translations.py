@@ -220,6 +220,7 @@ TR_ONLY_CURRENT_EDITORS = tr(
 TR_GO_TO_LINE = tr("NINJA-IDE", ":\t(Go to Line)")
 TR_ONLY_NON_PYTHON = tr("NINJA-IDE", "!\t(Filter only by Non Python Files)")
 TR_NO_RESULTS = tr("NINJA-IDE", "No results were found!")
+TR_INDEXING_PROJECT = tr("NINJA-IDE", "Indexing symbols: {} of {} files")
 TR_DEFINITION_NOT_FOUND = tr("NINJA-IDE", "Definition Not Found")
 TR_DEFINITION_NOT_FOUND_BODY = tr(
     "NINJA-IDE",
@@ -260,6 +261,14 @@ TR_DISPLAY_TEXT_CHANGES = tr("NINJA-IDE", "Mark Text Changes")
 TR_PEP8_DIRTY_TEXT = tr("NINJA-IDE", "PEP8 Violations: ")
 TR_LINT_DIRTY_TEXT = tr("NINJA-IDE", "Lint Errors: ")
 TR_NOT_IMPORT_CHECKER_TEXT = tr("NINJA-IDE", "Imports don't exist: ")
+TR_LINT_PROJECT = tr("NINJA-IDE", "Lint Project")
+TR_LINTING_PROJECT = tr("NINJA-IDE", "Linting project: {} of {} files")
+TR_PROJECT_PROBLEMS = tr("NINJA-IDE", "Project Problems")
+TR_PROJECT_PROBLEMS_TOTALS = tr(
+    "NINJA-IDE", "{} errors, {} style warnings in {} files")
+TR_FILTER_PROBLEMS = tr("NINJA-IDE", "Filter by code or path")
+TR_SORT_BY_LINE = tr("NINJA-IDE", "Sort by Line")
+TR_SORT_BY_SEVERITY = tr("NINJA-IDE", "Sort by Severity and Code")
 
 # Dialogs
 TR_FILE_ALREADY_EXISTS_TITLE = tr("NINJA-IDE", "File Already Exists")
@@ -351,7 +360,7 @@ TR_REPLACE_RESULTS_WITH = tr("NINJA-IDE", "Replace Results With:")
 TR_ARE_YOU_SURE_WANT_TO_REPLACE = tr(
     "NINJA-IDE",
     "Are you sure you want to replace the content in "
-    "this files?\n(The change is not reversible)")
+    "this files?\n(It can be reverted with Undo Replace)")
 TR_REPLACE_FILES_CONTENTS = tr("NINJA-IDE", "Replace File Contents")
 TR_CONSOLE = tr("NINJA-IDE", "Console")
 TR_OUTPUT = tr("NINJA-IDE", "Output")
@@ -914,5 +923,29 @@ TR_REMOVE_ALL_BOOKMARKS_QUESTION = tr(
 
 # Find in files
 TR_MATCHES_FOUND = tr("NINJA-IDE", "{} matches found.")
+TR_MORE_MATCHES = tr("NINJA-IDE", "{} more matches not shown.")
+TR_UNDO_REPLACE = tr("NINJA-IDE", "Undo Replace")
+TR_MATCHES_REPLACED = tr("NINJA-IDE", "{} matches replaced in {} files.")
+TR_FILES_NOT_WRITTEN = tr("NINJA-IDE", "{} files could not be written.")
+TR_REPLACE_UNDONE = tr("NINJA-IDE", "Replace undone in {} files.")
+TR_FILES_NOT_RESTORED = tr(
+    "NINJA-IDE", "{} files changed since the replace were not restored.")
 
 TR_NO_PROJECTS = tr("NINJA-IDE", "No Projects")
+
+# Checkers performance
+TR_CHECKERS_PERFORMANCE = tr("NINJA-IDE", "Checkers Performance")
+TR_CHECKER = tr("NINJA-IDE", "Checker")
+TR_CHECKER_RUNS = tr("NINJA-IDE", "Runs")
+TR_CHECKER_WALL_AVG = tr("NINJA-IDE", "Avg Time (ms)")
+TR_CHECKER_WALL_MAX = tr("NINJA-IDE", "Max Time (ms)")
+TR_CHECKER_CPU_AVG = tr("NINJA-IDE", "Avg CPU (ms)")
+TR_CHECKER_WAIT_AVG = tr("NINJA-IDE", "Avg Queued (ms)")
+TR_CHECKER_LAST_SIZE = tr("NINJA-IDE", "Last Size")
+TR_CHECKER_LAST_MESSAGES = tr("NINJA-IDE", "Last Messages")
+TR_CHECKER_STATUS = tr("NINJA-IDE", "Status")
+TR_CHECKER_ENABLED = tr("NINJA-IDE", "Enabled")
+TR_CHECKER_DISABLED_ABOVE = tr(
+    "NINJA-IDE", "Disabled for sources of {} chars or more")
+TR_CHECKERS_RESET_BUDGET = tr("NINJA-IDE", "Enable All")
+TR_EXPORT_JSON = tr("NINJA-IDE", "Export JSON")
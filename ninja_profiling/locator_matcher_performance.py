@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+
+"""Measure the locator fuzzy matcher while a query is typed.
+
+Usage: locator_matcher_performance.py [number of symbols]
+
+The symbols are random identifiers, in snake_case and CamelCase."""
+
+import random
+import string
+import sys
+import time
+
+sys.path.append("..")
+
+from ninja_ide.tools.locator import fuzzy_matcher  # noqa
+
+
+def symbols(count):
+    random.seed(0)
+    words = [''.join(random.choice(string.ascii_lowercase)
+                     for _ in range(random.randint(3, 8)))
+             for _ in range(3000)]
+    names = []
+    for _ in range(count):
+        parts = random.sample(words, random.randint(1, 3))
+        if random.random() < 0.5:
+            names.append('_'.join(parts))
+        else:
+            names.append(''.join(part.capitalize() for part in parts))
+    return names
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    names = symbols(count)
+    clock_before = time.perf_counter()
+    matcher = fuzzy_matcher.FuzzyMatcher(names)
+    print("{} symbols, matcher built in {:.3f}s".format(
+        count, time.perf_counter() - clock_before))
+    # Build the posting lists of the letters, as a session in use would
+    for char in string.ascii_lowercase:
+        matcher.match(char)
+    query = names[count // 2]
+    for length in range(1, len(query) + 1):
+        clock_before = time.perf_counter()
+        best = matcher.match(query[:length])
+        elapsed = time.perf_counter() - clock_before
+        print("{:<20} {:8.1f}ms  {}".format(
+            query[:length], elapsed * 1000, names[best[0]]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Measure the pycodestyle throughput over a corpus of stdlib files.
+
+Usage: pycodestyle_performance.py [number of files]
+
+Compares building a new StyleGuide for every file (what the PEP8 checker
+used to do) against the preconfigured guide returned by the factory."""
+
+import os
+import sys
+import time
+import warnings
+
+sys.path.append("..")
+
+from ninja_ide.dependencies import pycodestyle  # noqa
+from ninja_ide.tools import lint  # noqa
+
+
+def corpus(limit):
+    stdlib = os.path.dirname(os.__file__)
+    files = []
+    for name in sorted(os.listdir(stdlib)):
+        if name.endswith(".py"):
+            path = os.path.join(stdlib, name)
+            with open(path, encoding="utf-8", errors="replace") as fp:
+                files.append((path, fp.readlines()))
+        if len(files) == limit:
+            break
+    return files
+
+
+def fresh_style_guide(path, lines):
+    style = pycodestyle.StyleGuide(
+        parse_argv=False,
+        config_file='',
+        checker_class=lint.CustomChecker
+    )
+    return style.input_file(path, lines=lines)
+
+
+def factory_style_guide(path, lines):
+    return lint.check_style(lines, path)
+
+
+def measure(name, function, files, repeat=3):
+    total_lines = sum(len(lines) for _, lines in files)
+    best = None
+    for _ in range(repeat):
+        clock_before = time.process_time()
+        for path, lines in files:
+            # Checkers may modify the lines (BOM), give them a copy
+            function(path, list(lines))
+        elapsed = time.process_time() - clock_before
+        best = elapsed if best is None else min(best, elapsed)
+    print("{:<20} {:8.3f}s {:10.0f} lines/s".format(
+        name, best, total_lines / best))
+
+
+def main():
+    limit = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    files = corpus(limit)
+    print("{} files, {} lines".format(
+        len(files), sum(len(lines) for _, lines in files)))
+    warnings.simplefilter("ignore")
+    # Warm up imports and regex caches
+    factory_style_guide(*files[0])
+    measure("StyleGuide per file", fresh_style_guide, files)
+    measure("Factory", factory_style_guide, files)
+
+
+if __name__ == "__main__":
+    main()
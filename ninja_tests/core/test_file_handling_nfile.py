@@ -174,3 +174,45 @@ def test_filepath_changes_even_if_inexistent():
     a_nfile = nfile.NFile()
     a_nfile.move(temp_name)
     assert a_nfile.file_path == temp_name
+
+
+def test_save_keeps_permissions_and_leaves_no_temporary_file():
+    folder = tempfile.mkdtemp()
+    temp_name = os.path.join(folder, "script.py")
+    with open(temp_name, "w") as temp_file:
+        temp_file.write("old")
+    os.chmod(temp_name, 0o750)
+    a_nfile = nfile.NFile(temp_name)
+    a_nfile.save("new")
+    assert os.stat(temp_name).st_mode & 0o777 == 0o750
+    assert os.listdir(folder) == ["script.py"]
+    with open(temp_name) as saved:
+        assert saved.read() == "new"
+
+
+def test_save_encodes_with_the_coding_line():
+    temp_name = tempfile.NamedTemporaryFile().name
+    content = "# -*- coding: latin-1 -*-\nname = 'ñandú'\n"
+    nfile.NFile(temp_name).save(content)
+    with open(temp_name, "rb") as saved:
+        assert saved.read() == content.encode("latin-1")
+
+
+def test_save_blows_when_content_does_not_fit_the_encoding():
+    temp_name = tempfile.NamedTemporaryFile().name
+    a_nfile = nfile.NFile(temp_name)
+    with pytest.raises(NinjaIOException):
+        a_nfile.save("# coding: ascii\nname = 'ñandú'\n")
+    assert not os.path.exists(temp_name)
+
+
+def test_will_save_emits_the_previous_path_first():
+    temp_name = tempfile.NamedTemporaryFile().name
+    temp_name_path = "%s_really_unique" % temp_name
+    a_nfile = nfile.NFile(temp_name)
+    emitted = []
+    a_nfile.willSave.connect(lambda old, new: emitted.append((old, new)))
+    a_nfile.save("content")
+    a_nfile.save("content", path=temp_name_path)
+    assert emitted == [(temp_name, temp_name),
+                       (temp_name, temp_name_path)]
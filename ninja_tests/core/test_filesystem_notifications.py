@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import shutil
+
+import pytest
+
+from ninja_ide.core.file_handling.filesystem_notifications import (
+    base_watcher)
+
+
+def test_single_file_watcher_tick(tmpdir):
+    watched = tmpdir.join("watched.py")
+    watched.write("x = 1\n")
+    events = []
+    watcher = base_watcher.SingleFileWatcher(
+        lambda event, path: events.append(event))
+    watcher.add_watch(str(watched))
+    assert not watcher.tick()
+    # Same size and maybe the same mtime, the new inode tells it
+    replacement = tmpdir.join("replacement.py")
+    replacement.write("x = 2\n")
+    os.replace(str(replacement), str(watched))
+    assert watcher.tick()
+    watched.remove()
+    assert watcher.tick()
+    watched.write("back\n")
+    assert watcher.tick()
+    assert events == [base_watcher.MODIFIED, base_watcher.DELETED,
+                      base_watcher.ADDED]
+
+
+try:
+    from ninja_ide.core.file_handling.filesystem_notifications import linux
+except (ImportError, AttributeError, OSError):
+    # Not Linux, or a libc without inotify
+    linux = None
+
+requires_inotify = pytest.mark.skipif(linux is None,
+                                      reason="inotify is not available")
+
+
+@pytest.fixture
+def watcher(qapp):
+    watcher = linux.NinjaFileSystemWatcher()
+    watcher.events = []
+    watcher.fileChanged.connect(
+        lambda event, path: watcher.events.append((event, path)))
+    yield watcher
+    watcher.shutdown_notification()
+
+
+@requires_inotify
+def test_inotify_save_by_rename(tmpdir, watcher):
+    watched = tmpdir.join("watched.py")
+    watched.write("x = 1\n")
+    watcher.add_file_watch(str(watched))
+    # Only the watched file is reported, not the temporary one
+    temporary = tmpdir.join(".watched.py.tmp")
+    temporary.write("x = 2\n")
+    os.replace(str(temporary), str(watched))
+    tmpdir.join("other.py").write("y = 1\n")
+    watcher._read_events()
+    assert watcher.events == [(base_watcher.ADDED, str(watched))]
+
+
+@requires_inotify
+def test_inotify_delete(tmpdir, watcher):
+    watched = tmpdir.join("watched.py")
+    watched.write("x = 1\n")
+    watcher.add_file_watch(str(watched))
+    watched.remove()
+    watcher._read_events()
+    assert watcher.events == [(base_watcher.DELETED, str(watched))]
+
+
+@requires_inotify
+def test_inotify_folder_removed_falls_back_to_polling(tmpdir, watcher):
+    folder = tmpdir.mkdir("package")
+    watched = folder.join("watched.py")
+    watched.write("x = 1\n")
+    watcher.add_file_watch(str(watched))
+    shutil.rmtree(str(folder))
+    watcher._read_events()
+    # Reported once, and polled until it comes back
+    assert watcher.events == [(base_watcher.DELETED, str(watched))]
+    assert str(folder) not in watcher._folders
+    polling = watcher._single_file_watcher
+    polling.stop_running()
+    polling.wait()
+    folder = tmpdir.mkdir("package")
+    folder.join("watched.py").write("x = 2\n")
+    assert polling.tick()
+    assert watcher.events[1:] == [(base_watcher.ADDED, str(watched))]
+
+
+@requires_inotify
+def test_inotify_folder_moved(tmpdir, watcher):
+    folder = tmpdir.mkdir("package")
+    watched = folder.join("watched.py")
+    watched.write("x = 1\n")
+    watcher.add_file_watch(str(watched))
+    folder.rename(tmpdir.join("renamed"))
+    watcher._read_events()
+    assert watcher.events == [(base_watcher.DELETED, str(watched))]
+    assert str(watched) in watcher._single_file_watcher._watches
+
+
+@requires_inotify
+def test_inotify_watches_are_counted(tmpdir, watcher):
+    watched = tmpdir.join("watched.py")
+    watched.write("x = 1\n")
+    other = tmpdir.join("other.py")
+    other.write("y = 1\n")
+    watcher.add_file_watch(str(watched))
+    watcher.add_file_watch(str(watched))
+    watcher.add_file_watch(str(other))
+    watcher.remove_file_watch(str(watched))
+    watched.write("x = 2\n")
+    watcher._read_events()
+    assert watcher.events == [(base_watcher.MODIFIED, str(watched))]
+    # The folder is watched while one of its files is
+    watcher.remove_file_watch(str(watched))
+    assert str(tmpdir) in watcher._folders
+    watcher.remove_file_watch(str(other))
+    assert str(tmpdir) not in watcher._folders
+    watched.write("x = 3\n")
+    other.write("y = 2\n")
+    watcher._read_events()
+    assert len(watcher.events) == 1
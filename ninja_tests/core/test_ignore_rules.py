@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+from ninja_ide.core.file_handling.ignore_rules import IgnoreRules
+
+
+def test_default_excludes(tmpdir):
+    rules = IgnoreRules(str(tmpdir))
+    assert rules.is_ignored(".git", is_dir=True)
+    assert rules.is_ignored("src/node_modules", is_dir=True)
+    assert rules.is_ignored("ninja.egg-info", is_dir=True)
+    assert rules.is_ignored("src/module.pyc")
+    # Anchored to the root of the project
+    assert rules.is_ignored("build", is_dir=True)
+    assert not rules.is_ignored("src/build", is_dir=True)
+    # Only folders
+    assert not rules.is_ignored("node_modules")
+    assert not rules.is_ignored("src/module.py")
+
+
+def test_gitignore_patterns(tmpdir):
+    tmpdir.join(".gitignore").write(
+        "# comment\n*.log\n!keep.log\ndocs/_build/\n**/generated\n")
+    tmpdir.mkdir("sub").join(".gitignore").write("local.py\n")
+    rules = IgnoreRules(str(tmpdir), ["*.tmp"])
+    rules.load_gitignore(str(tmpdir.join("sub")))
+    assert rules.is_ignored("error.log")
+    assert not rules.is_ignored("keep.log")
+    assert rules.is_ignored("docs/_build", is_dir=True)
+    assert not rules.is_ignored("other/docs/_build", is_dir=True)
+    assert rules.is_ignored("a/b/generated", is_dir=True)
+    assert rules.is_ignored("notes.tmp")
+    assert rules.is_ignored("sub/local.py")
+    assert rules.is_ignored("sub/deeper/local.py")
+    assert not rules.is_ignored("local.py")
+
+
+def test_virtualenv_is_ignored(tmpdir):
+    tmpdir.mkdir("env").join("pyvenv.cfg").write("")
+    tmpdir.mkdir("src")
+    rules = IgnoreRules(str(tmpdir))
+    assert rules.is_ignored(str(tmpdir.join("env")), is_dir=True)
+    assert not rules.is_ignored(str(tmpdir.join("src")), is_dir=True)
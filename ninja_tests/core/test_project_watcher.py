@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+import os
+
+from ninja_ide.core.file_handling import project_watcher
+from ninja_ide.core.file_handling.project_watcher import ProjectWatcher
+
+
+def test_walk_and_rescan(qtbot, tmpdir):
+    tmpdir.join("a.py").write("a = 1\n")
+    tmpdir.join("pkg", "b.py").write("b = 1\n", ensure=True)
+    tmpdir.join("build", "c.py").write("c = 1\n", ensure=True)
+    tmpdir.join(".gitignore").write("build/\n")
+    watcher = ProjectWatcher(str(tmpdir))
+    assert not watcher.is_ready()
+    with qtbot.waitSignal(watcher.ready):
+        pass
+    expected = {str(tmpdir.join("a.py")), str(tmpdir.join("pkg", "b.py")),
+                str(tmpdir.join(".gitignore"))}
+    assert set(watcher.files()) == expected
+    # Rewritten in place, no folder changes
+    b = str(tmpdir.join("pkg", "b.py"))
+    with open(b, "r+") as source:
+        source.write("b = 2\n")
+    mtime = os.stat(b).st_mtime + 10
+    os.utime(b, (mtime, mtime))
+    with qtbot.waitSignal(watcher.fileChanged) as blocker:
+        watcher.rescan()
+    assert blocker.args == [project_watcher.MODIFIED, b]
+    assert dict(watcher.entries())[b] == mtime
+    watcher.stop()
+
+
+def test_new_folder_is_walked(qtbot, tmpdir):
+    watcher = ProjectWatcher(str(tmpdir))
+    with qtbot.waitSignal(watcher.ready):
+        pass
+    new = tmpdir.join("new", "d.py")
+    with qtbot.waitSignal(watcher.fileChanged, timeout=5000) as blocker:
+        new.write("d = 1\n", ensure=True)
+    assert blocker.args == [project_watcher.ADDED, str(new)]
+    assert list(watcher.files()) == [str(new)]
+    watcher.stop()
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+from ninja_ide.core.file_handling import swap_journal
+
+
+def test_replay_utf16_positions():
+    # The emoji counts 2 positions, like in QTextDocument
+    text = "a\U0001F600b\nc"
+    records = [(3, 1, "XY"), (0, 0, "#"), (7, 1, "end")]
+    assert swap_journal.replay(text, records) == "#a\U0001F600XY\nend"
+
+
+def test_snapshot_and_journal(tmpdir):
+    path = str(tmpdir.join("swap"))
+    assert swap_journal.read(path) is None
+    swap_journal.write_snapshot(path, "hello\nworld", 1)
+    swap_journal.append(path, swap_journal.encode_record(5, 0, ","))
+    # Removing past the end, as in the edits of the last paragraph
+    swap_journal.append(path, swap_journal.encode_record(7, 20, "ninja"))
+    assert swap_journal.read(path) == "hello,\nninja"
+    # A record cut by a crash is dropped
+    swap_journal.append(path, swap_journal.encode_record(0, 0, "lost")[:-1])
+    assert swap_journal.read(path) == "hello,\nninja"
+    # A journal of an older snapshot is ignored
+    swap_journal.write_snapshot(path, "new", 2)
+    with open(swap_journal.journal_path(path), "wb") as journal:
+        journal.write(swap_journal.HEADER + b"1\n" +
+                      swap_journal.encode_record(0, 3, "old"))
+    assert swap_journal.read(path) == "new"
+    swap_journal.remove(path)
+    assert tmpdir.listdir() == []
+
+
+def test_read_plain_swap_file(tmpdir):
+    swap = tmpdir.join("swap")
+    swap.write_binary("año\n".encode("utf-8"))
+    assert swap_journal.read(str(swap)) == "año\n"
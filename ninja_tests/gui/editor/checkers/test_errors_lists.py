@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+
+from PyQt5.QtTest import QAbstractItemModelTester
+
+from ninja_ide.gui.editor.checkers.errors_lists import ErrorsListModel
+
+
+def style_checks(linenos):
+    return {lineno: [((0, 1), "[Style]: E501 line {}".format(lineno),
+                      "x = {}".format(lineno))]
+            for lineno in linenos}
+
+
+def error_checks(linenos):
+    return {lineno: [((4, 5), "[Error]: F401 line {}".format(lineno),
+                      "import os")]
+            for lineno in linenos}
+
+
+def lines(model):
+    return [model.data(model.index(row), ErrorsListModel.RowRole)
+            for row in range(model.rowCount())]
+
+
+def record_changes(model):
+    model.changes = []
+    model.rowsInserted.connect(
+        lambda parent, first, last: model.changes.append(
+            ("inserted", first, last)))
+    model.rowsRemoved.connect(
+        lambda parent, first, last: model.changes.append(
+            ("removed", first, last)))
+    model.modelReset.connect(lambda: model.changes.append(("reset",)))
+
+
+@pytest.fixture
+def model(qapp):
+    model = ErrorsListModel()
+    record_changes(model)
+    # Checks the consistency of the model after every change
+    model.tester = QAbstractItemModelTester(
+        model, QAbstractItemModelTester.FailureReportingMode.Fatal)
+    return model
+
+
+def test_update_inserts_and_removes_the_rows_changed(model):
+    model.update_entries(False, style_checks(range(0, 20, 2)))
+    assert model.changes == [("reset",)]
+    assert lines(model) == list(range(0, 20, 2))
+    model.changes.clear()
+    model.update_entries(True, error_checks([5, 11]))
+    assert model.changes == [("inserted", 3, 3), ("inserted", 7, 7)]
+    assert lines(model) == [0, 2, 4, 5, 6, 8, 10, 11, 12, 14, 16, 18]
+    # The error goes before the style warning of the same line
+    model.update_entries(True, error_checks([5, 11, 12]))
+    index = model.index(8)
+    assert model.data(index, ErrorsListModel.RowRole) == 12
+    assert model.data(index, ErrorsListModel.BugRole)
+    assert model.data(index) == "[Error]: F401 line 12"
+    assert model.data(index, ErrorsListModel.CodeLineRole) == "import os"
+    assert model.data(index, ErrorsListModel.ColumnRole) == 4
+    model.changes.clear()
+    model.update_entries(False, style_checks(range(0, 14, 2)))
+    assert model.changes == [("removed", 10, 12)]
+    model.changes.clear()
+    model.update_entries(True, error_checks([11, 12]))
+    assert model.changes == [("removed", 3, 3)]
+    assert lines(model) == [0, 2, 4, 6, 8, 10, 11, 12, 12]
+
+
+def test_big_changes_reset_the_model(model):
+    model.update_entries(False, style_checks(range(10)))
+    model.changes.clear()
+    # More than RESET_RATIO of the rows change
+    model.update_entries(False, style_checks(range(4, 16)))
+    assert model.changes == [("reset",)]
+    assert lines(model) == list(range(4, 16))
+
+
+def test_rows_are_fetched_in_pages(qapp):
+    # Without the tester, which fetches all the rows
+    model = ErrorsListModel()
+    record_changes(model)
+    model.FETCH_STEP = 5
+    model.update_entries(False, style_checks(range(0, 24, 2)))
+    assert model.rowCount() == 5
+    assert len(model) == 12
+    assert model.canFetchMore()
+    model.changes.clear()
+    # Not fetched yet, the view is not told
+    model.update_entries(True, error_checks([21]))
+    model.update_entries(True, error_checks([]))
+    assert model.changes == []
+    model.update_entries(True, error_checks([1]))
+    assert model.changes == [("inserted", 1, 1)]
+    model.changes.clear()
+    model.fetchMore()
+    model.fetchMore()
+    assert model.changes == [("inserted", 6, 10), ("inserted", 11, 12)]
+    assert not model.canFetchMore()
+    assert lines(model) == [0, 1] + list(range(2, 24, 2))
+
+
+def test_sort_by_severity(model):
+    model.update_entries(False, style_checks([1, 3, 5, 7]))
+    model.update_entries(True, error_checks([6]))
+    model.set_sort_mode(ErrorsListModel.SORT_BY_SEVERITY)
+    assert lines(model) == [6, 1, 3, 5, 7]
+    # The diff keeps working with the new order
+    model.update_entries(True, error_checks([2, 6]))
+    assert lines(model) == [2, 6, 1, 3, 5, 7]
+    model.set_sort_mode(ErrorsListModel.SORT_BY_LINE)
+    assert lines(model) == [1, 2, 3, 5, 6, 7]
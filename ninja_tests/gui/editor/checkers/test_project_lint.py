@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+
+from ninja_ide.gui.editor.checkers import project_lint
+from ninja_ide.tools import lint
+
+
+@pytest.fixture
+def linter(qapp, tmpdir, monkeypatch):
+    monkeypatch.setattr(project_lint, "PROBLEMS_DB",
+                        str(tmpdir.join("problems.db")))
+    return project_lint.ProjectLinter()
+
+
+def sweep(project, paths):
+    # Run in this thread, the results are stored when it returns
+    project_lint.LintProjectThread(str(project), paths).run()
+
+
+def test_totals_and_problems(linter, tmpdir):
+    project = tmpdir.mkdir("project")
+    first = project.join("first.py")
+    first.write("import os\nx=y\n")
+    second = project.join("second.py")
+    second.write("import sys\n")
+    project.join("clean.py").write("import os\nos.sep\n")
+    assert not linter.is_indexed(str(project))
+    sweep(project, [str(path) for path in project.listdir()])
+    assert linter.is_indexed(str(project))
+    # UnusedImport x2 and UndefinedName, the E225 of first.py
+    assert linter.totals(str(project)) == (3, 1, 2)
+    assert linter.totals(str(project), "E225") == (0, 1, 1)
+    assert linter.totals(str(project), "second") == (1, 0, 1)
+    assert linter.totals(str(tmpdir.join("other"))) == (0, 0, 0)
+    problems = linter.problems(str(project))
+    # Sorted by path and line
+    assert [(path, lineno) for path, lineno, _, _, _, _ in problems] == [
+        (str(first), 0), (str(first), 1), (str(first), 1), (str(second), 0)]
+    assert sorted(code for _, _, _, _, code, _ in problems) == [
+        'E225', 'UndefinedName', 'UnusedImport', 'UnusedImport']
+    assert len(linter.problems(str(project), limit=2)) == 2
+    assert linter.problems(str(project), "E225") == [
+        (str(first), 1, 2, lint.KIND_STYLE, 'E225',
+         'missing whitespace around operator')]
+    # Removed from the project, the next full sweep forgets it
+    sweep(project, [str(second)])
+    assert linter.totals(str(project)) == (1, 0, 1)
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+import os
+
+from ninja_ide.gui.tools_dock import find_in_files
+from ninja_ide.tools import trigram_index
+
+
+class FileSystem(object):
+
+    def __init__(self, ignored):
+        self.ignored = ignored
+
+    def is_ignored(self, path):
+        return os.path.basename(path) in self.ignored
+
+
+class Ninja(object):
+
+    def __init__(self, ignored):
+        self.filesystem = FileSystem(ignored)
+
+
+def test_changed_files_ignored_are_not_indexed(qapp, tmpdir, monkeypatch):
+    ninjaide = Ninja(set())
+    monkeypatch.setattr(find_in_files.IDE, "get_service",
+                        staticmethod(lambda name: ninjaide))
+    index_path = str(tmpdir.join("trigrams.db"))
+    monkeypatch.setattr(trigram_index, "index_path", lambda path: index_path)
+    project = tmpdir.mkdir("project")
+    paths = []
+    for name in ("kept.py", "ignored.py"):
+        project.join(name).write("found = 1\n")
+        paths.append(str(project.join(name)))
+    thread = find_in_files.TrigramIndexThread()
+    thread._index_files(str(project), paths)
+    index = trigram_index.TrigramIndex(index_path)
+    assert set(index.files()) == set(paths)
+    index.close()
+    # Ignored after being indexed, a change of it removes it
+    ninjaide.filesystem.ignored.add("ignored.py")
+    thread._index_files(str(project), paths)
+    index = trigram_index.TrigramIndex(index_path)
+    assert list(index.files()) == [paths[0]]
+    index.close()
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+from ninja_ide.tools.locator import fuzzy_matcher
+
+
+NAMES = [
+    "get_the_data",
+    "GoToDefinition",
+    "gtd",
+    "go_to_definition",
+    "target_data",
+    "HTTPServer",
+    "http_server_thing",
+    "settings",
+]
+
+
+def _match(matcher, query):
+    return [NAMES[index] for index in matcher.match(query)]
+
+
+def test_subsequence_matches_only():
+    matcher = fuzzy_matcher.FuzzyMatcher(NAMES)
+    assert _match(matcher, "gotodef") == ["GoToDefinition",
+                                          "go_to_definition"]
+    assert _match(matcher, "xyz") == []
+    assert _match(matcher, "dtg") == []
+
+
+def test_boundaries_rank_higher():
+    matcher = fuzzy_matcher.FuzzyMatcher(NAMES)
+    ranked = _match(matcher, "gtd")
+    # The exact name first, then the names where gtd are word starts
+    assert ranked[0] == "gtd"
+    assert set(ranked[1:4]) == {"GoToDefinition", "go_to_definition",
+                                "get_the_data"}
+    assert ranked[-1] == "target_data"
+    assert _match(matcher, "hs") == ["HTTPServer", "http_server_thing"]
+
+
+def test_narrowing_uses_previous_hits():
+    matcher = fuzzy_matcher.FuzzyMatcher(NAMES)
+    assert "settings" in _match(matcher, "se")
+    assert _match(matcher, "sett") == ["settings"]
+    # A query that does not extend the previous one scans again
+    assert _match(matcher, "htt") == ["HTTPServer", "http_server_thing"]
+    assert _match(matcher, "") == NAMES
+
+
+def test_limit():
+    matcher = fuzzy_matcher.FuzzyMatcher(NAMES)
+    assert len(matcher.match("t", limit=3)) == 3
+
+
+def test_add_and_remove():
+    matcher = fuzzy_matcher.FuzzyMatcher(NAMES)
+    assert _match(matcher, "se") == ["settings", "HTTPServer",
+                                     "http_server_thing"]
+    # Removed, the other names keep their indexes
+    matcher.remove([NAMES.index("HTTPServer")])
+    matcher.add(["set_up", "server"])
+    names = NAMES + ["set_up", "server"]
+    assert len(matcher) == len(names) - 1
+    assert matcher.removed == 1
+    # Narrows from the last query, with the names added since
+    assert [names[index] for index in matcher.match("ser")] == [
+        "server", "http_server_thing"]
+    assert [names[index] for index in matcher.match("s")][:3] == [
+        "server", "set_up", "settings"]
+    assert "HTTPServer" not in [names[index] for index in matcher.match("")]
+
+
+def test_names_starting_with_the_query_are_scored(monkeypatch):
+    monkeypatch.setattr(fuzzy_matcher, "MAX_SCORED", 3)
+    names = ["xgxtxd", "xgtxd", "xgtd", "gxxtd", "gtd_long", "a_gtd_b"]
+    matcher = fuzzy_matcher.FuzzyMatcher(names)
+    # The shortest hits would fill MAX_SCORED, the names starting with
+    # or containing the query go first
+    ranked = [names[index] for index in matcher.match("gtd")]
+    assert ranked[:2] == ["gtd_long", "a_gtd_b"]
+    assert len(ranked) == 3
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+from ninja_ide.tools import grep_engine
+
+SOURCE = (
+    "import os\r\n"
+    "\n"
+    "def load(path):\n"
+    "    return os.path.join(path, 'load')  # load twice\n"
+    "LOADER = load")
+
+
+def test_literal_search(tmpdir):
+    path = tmpdir.join("module.py")
+    path.write_binary(SOURCE.encode("utf-8"))
+    pattern = grep_engine.compile_pattern("load(")
+    assert grep_engine.grep_file(str(path), pattern) == (
+        str(path), [(2, "def load(path):")])
+    pattern = grep_engine.compile_pattern("load", case_sensitive=False)
+    lines = grep_engine.grep_file(str(path), pattern)[1]
+    # One result per line, the last line has no end of line
+    assert [lineno for lineno, _ in lines] == [2, 3, 4]
+    assert lines[-1] == (4, "LOADER = load")
+    pattern = grep_engine.compile_pattern("os", whole_words=True)
+    assert grep_engine.grep_file(str(path), pattern)[1] == [
+        (0, "import os"),
+        (3, "    return os.path.join(path, 'load')  # load twice")]
+
+
+def test_regex_and_unreadable_files(tmpdir):
+    empty = tmpdir.join("empty.py")
+    empty.write("")
+    pattern = grep_engine.compile_pattern(r"^\w+ = ", regex=True)
+    assert grep_engine.grep_files(
+        [str(empty), str(tmpdir.join("missing.py"))], pattern) == [
+        (str(empty), []), (str(tmpdir.join("missing.py")), [])]
+    assert grep_engine.grep_buffer(SOURCE.encode("utf-8"), pattern) == [
+        (4, "LOADER = load")]
+
+
+def test_shortcuts():
+    pattern = grep_engine.compile_pattern("load(")
+    assert pattern.literal == b"load("
+    pattern = grep_engine.compile_pattern("LoadZ", case_sensitive=False)
+    assert pattern.literal is None
+    assert sorted(pattern.required) == [b"Z", b"z"]
+    assert not pattern.may_match(b"load\n")
+    assert pattern.may_match(b"loadz\n")
+    pattern = grep_engine.compile_pattern(
+        r"def (get)_\w+\(self", regex=True)
+    assert pattern.literal is None
+    assert pattern.required == (b"def get_",)
+    assert not pattern.may_match(b"def set_value(self):")
+    # Alternatives do not require anything
+    pattern = grep_engine.compile_pattern("a|b", regex=True)
+    assert pattern.may_match(b"")
+    # An inline flag ignores the case too
+    pattern = grep_engine.compile_pattern("(?i)loadz", regex=True)
+    assert sorted(pattern.required) == [b"Z", b"z"]
+
+
+def test_file_classification(tmpdir):
+    pattern = grep_engine.compile_pattern("año")
+    latin = tmpdir.join("latin.py")
+    latin.write_binary(
+        "# -*- coding: latin-1 -*-\nx = 'año'\n".encode("latin-1"))
+    wide = tmpdir.join("wide.py")
+    wide.write_binary("x = 1\ny = 'año'\n".encode("utf-16"))
+    binary = tmpdir.join("binary.py")
+    binary.write_binary(b"\0" + "año".encode("utf-8"))
+    assert grep_engine.grep_files(
+        [str(latin), str(wide), str(binary)], pattern) == [
+        (str(latin), [(1, "x = 'año'")]),
+        (str(wide), [(1, "y = 'año'")]),
+        (str(binary), [])]
+    # Over the size limit
+    assert grep_engine.grep_file(str(latin), pattern, max_size=10) == (
+        str(latin), [])
+    detect = grep_engine.detect_encoding
+    assert detect(b"#!/usr/bin/python\n# coding=ascii\n") == "ascii"
+    # Only the first two lines
+    assert detect(b"x = 1\ny = 2\n# coding: latin-1\n") == "utf-8"
+
+
+def test_grep_text():
+    pattern = grep_engine.compile_pattern("año")
+    assert grep_engine.grep_text("x = 1\ny = 'AÑO'\nz = 'año'", pattern) == [
+        (2, "z = 'año'")]
+
+
+def test_non_ascii_searches():
+    text = "x = 'AÑO'\ny = 'años'\nz = 'año'\n"
+    pattern = grep_engine.compile_pattern("año", case_sensitive=False)
+    assert pattern.decoded
+    assert grep_engine.grep_buffer(text.encode("utf-8"), pattern) == [
+        (0, "x = 'AÑO'"), (1, "y = 'años'"), (2, "z = 'año'")]
+    pattern = grep_engine.compile_pattern("año", whole_words=True)
+    assert grep_engine.grep_text(text, pattern) == [(2, "z = 'año'")]
+    pattern = grep_engine.compile_pattern(r"\w+ños", regex=True)
+    assert grep_engine.grep_text(text, pattern) == [(1, "y = 'años'")]
+    # Matching the case is still done on the bytes
+    assert not grep_engine.compile_pattern("año").decoded
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+
+from ninja_ide.tools.locator import indexer
+
+
+class FakeSymbolsHandler(object):
+
+    def __init__(self):
+        self.contents = []
+
+    def obtain_symbols(self, content, filename=None):
+        self.contents.append(content)
+        return {'functions': {'función': {'lineno': 2, 'functions': {}}}}
+
+
+@pytest.fixture
+def symbols_handler(monkeypatch):
+    handler = FakeSymbolsHandler()
+    monkeypatch.setattr(indexer.handlers, 'get_symbols_handler',
+                        lambda language: handler)
+    return handler
+
+
+@pytest.mark.parametrize("data", [
+    "\ndef función():\n".encode("utf-8"),
+    "# -*- coding: latin-1 -*-\ndef función():\n".encode("latin-1"),
+    "\ndef función():\n".encode("utf-16"),
+])
+def test_index_file_encodings(tmpdir, symbols_handler, data):
+    path = tmpdir.join("module.py")
+    path.write_binary(data)
+    _, mtime, kind, symbols = indexer.index_file(
+        str(path), 'python', True)
+    assert mtime == path.mtime()
+    assert kind == indexer.KIND_FILE
+    assert symbols == [(indexer.KIND_FUNCTION, 'función', 1, None)]
+    assert symbols_handler.contents[0].endswith("def función():\n")
+
+
+def test_index_binary_file(tmpdir, symbols_handler):
+    path = tmpdir.join("data.py")
+    path.write_binary(b"\0\1\2")
+    assert indexer.index_file(str(path), 'python', True)[2:] == (
+        indexer.KIND_FILE, [])
+    assert not symbols_handler.contents
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+import os
+
+from ninja_ide.tools.locator import line_cache
+
+
+def test_read_line(tmpdir):
+    path = tmpdir.join("module.py")
+    path.write_binary(b"import os\r\n\ndef f():\n    return '\xc3\xb1'")
+    path = str(path)
+    assert line_cache.read_line(path, 0) == "import os"
+    assert line_cache.read_line(path, 1) == ""
+    assert line_cache.read_line(path, 3) == "    return 'ñ'"
+    assert line_cache.read_line(path, 4) is None
+    assert line_cache.read_line(path + "x", 0) is None
+
+
+def test_changed_files_are_read_again(tmpdir):
+    path = tmpdir.join("module.py")
+    path.write("a\nb\n")
+    path = str(path)
+    assert line_cache.read_line(path, 1) == "b"
+    with open(path, "w") as f:
+        f.write("first line\nsecond line\n")
+    os.utime(path, (0, 0))
+    assert line_cache.read_line(path, 1) == "second line"
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+from ninja_ide.tools import lint
+
+
+def test_check_errors():
+    assert lint.check_errors("import os\n", "a.py") == [
+        (1, 0, 'UnusedImport', "'os' imported but unused")]
+    assert lint.check_errors("import os\nos.sep\n", "a.py") == []
+    lineno, _, code, _ = lint.check_errors("x = (\n", "a.py")[0]
+    assert code == 'SyntaxError'
+    assert lineno >= 1
+
+
+def test_lint_file(tmpdir):
+    source = tmpdir.join("a.py")
+    source.write("import os\nx=y\n")
+    path, mtime, problems = lint.lint_file(str(source), max_line_length=79)
+    assert path == str(source)
+    assert mtime == source.mtime()
+    # Lines are 0-based, like in the editor checkers
+    assert sorted(problem for problem in problems
+                  if problem[2] == lint.KIND_ERROR) == [
+        (0, 0, lint.KIND_ERROR, 'UnusedImport', "'os' imported but unused"),
+        (1, 2, lint.KIND_ERROR, 'UndefinedName', "undefined name 'y'")]
+    assert [problem[:4] for problem in problems
+            if problem[2] == lint.KIND_STYLE] == [
+        (1, 2, lint.KIND_STYLE, 'E225')]
+
+
+def test_lint_unreadable_file(tmpdir):
+    path = str(tmpdir.join("missing.py"))
+    assert lint.lint_file(path) == (path, None, [])
+
+
+def test_check_style_options(monkeypatch):
+    built = []
+
+    class StyleGuide(lint.pycodestyle.StyleGuide):
+
+        def __init__(self, *args, **kwargs):
+            built.append(kwargs)
+            super(StyleGuide, self).__init__(*args, **kwargs)
+
+    monkeypatch.setattr(lint.pycodestyle, "StyleGuide", StyleGuide)
+    monkeypatch.setattr(lint, "style_guides", lint.StyleGuideFactory())
+    lines = ["x = [" + "y, " * 30 + "y]\n"]
+    assert lint.check_style(lines, "a.py", max_line_length=120) == []
+    assert lint.check_style(lines, "a.py", max_line_length=120) == []
+    # One guide for both calls, its checks are not set up again per file
+    assert len(built) == 1
+    assert lint.check_style(lines, "a.py", max_line_length=79) == [
+        (1, 80, 'E501', 'line too long (97 > 79 characters)')]
+    assert len(built) == 2
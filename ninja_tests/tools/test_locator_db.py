@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+
+from ninja_ide.tools.locator import locator_db
+
+
+@pytest.fixture
+def connection(tmpdir):
+    connection = locator_db.connect(str(tmpdir.join("locator.db")))
+    locator_db.store_file(
+        connection, "/project/models.py", "/project", 1.0, "@",
+        [("<", "UserModel", 3, None), (">", "save(self)", 5, 0),
+         ("-", "name", 4, 0), (">", "load_user(path)", 10, None),
+         ("-", "users", 1, None)])
+    locator_db.store_file(
+        connection, "/project/README", "/project", 1.0, "!", [])
+    connection.commit()
+    yield connection
+    connection.close()
+
+
+def test_search_substring(connection):
+    names = [row[1] for row in locator_db.search(connection, "USER")]
+    assert names == ["UserModel", "load_user(path)", "users"]
+    # Short searches do not go through the trigram index
+    names = [row[1] for row in locator_db.search(connection, "us")]
+    assert names == ["UserModel", "load_user(path)", "users"]
+    # The arguments of functions are not searched
+    assert not locator_db.search(connection, "path")
+
+
+def test_search_filters_and_pages(connection):
+    rows = locator_db.search(connection, kinds=("@", "!"))
+    assert rows == [("!", "README", "/project/README", -1),
+                    ("@", "models.py", "/project/models.py", -1)]
+    rows = locator_db.search(connection, path="/project/models.py",
+                             limit=2, offset=1)
+    assert [row[1] for row in rows] == ["load_user(path)", "models.py"]
+
+
+def test_store_replaces_symbols(connection):
+    assert locator_db.file_mtime(connection, "/project/models.py") == 1.0
+    locator_db.store_file(
+        connection, "/project/models.py", "/project", 2.0, "@",
+        [("<", "AccountModel", 3, None)])
+    assert locator_db.file_mtime(connection, "/project/models.py") == 2.0
+    assert [row[1:] for row in locator_db.file_symbols(
+        connection, "/project/models.py")] == [
+        ("models.py", "@"), ("AccountModel", "<")]
+    assert not locator_db.search(connection, "user")
+    assert locator_db.search(connection, "account")
+    locator_db.remove_file(connection, "/project/models.py")
+    assert locator_db.file_mtime(connection, "/project/models.py") is None
+    assert not locator_db.search(connection, "account")
+
+
+def test_members(connection):
+    rows = locator_db.members(connection, "/project/models.py",
+                              "UserModel", "<")
+    assert rows == [("-", "name", "/project/models.py", 4),
+                    (">", "save(self)", "/project/models.py", 5)]
+    rows = locator_db.members(connection, "/project/models.py",
+                              "UserModel", "<", "SA", (">",))
+    assert [row[1] for row in rows] == ["save(self)"]
+    assert not locator_db.members(connection, "/project/models.py",
+                                  "load_user(path)", "<")
+
+
+def test_definitions(connection):
+    locator_db.store_file(
+        connection, "/project/views.py", "/project", 1.0, "@",
+        [("<", "usermodel(object)", 1, None),
+         (">", "load_user(path, cache=True)", 8, None)])
+    # Functions and classes are stored with their signature
+    assert sorted(locator_db.definitions(
+        connection, "load_user", (">", "<"))) == [
+        (">", "load_user(path)", "/project/models.py", 10),
+        (">", "load_user(path, cache=True)", "/project/views.py", 8)]
+    assert locator_db.definitions(connection, "UserModel", ("<",)) == [
+        ("<", "UserModel", "/project/models.py", 3)]
+    assert locator_db.definitions(connection, "users", ("-",)) == [
+        ("-", "users", "/project/models.py", 1)]
+    assert not locator_db.definitions(connection, "users", ("<",))
+    assert not locator_db.definitions(connection, "load")
+
+
+def test_old_schema_is_dropped(tmpdir):
+    path = str(tmpdir.join("old.db"))
+    connection = locator_db.sqlite3.connect(path)
+    connection.execute("create table locator("
+                       "path text PRIMARY KEY, stat integer, data blob)")
+    connection.commit()
+    connection.close()
+    connection = locator_db.connect(path)
+    tables = [row[0] for row in connection.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table'")]
+    assert "locator" not in tables
+    assert "symbols" in tables
+
+
+def test_prune_removes_missing_files_and_closed_projects(tmpdir):
+    connection = locator_db.connect(str(tmpdir.join("locator.db")))
+    kept = tmpdir.join("kept.py")
+    kept.write("")
+    closed = tmpdir.join("closed.py")
+    closed.write("")
+    locator_db.store_file(connection, str(kept), str(tmpdir), 1.0, "@", [])
+    locator_db.store_file(connection, str(closed), "/closed", 1.0, "@", [])
+    locator_db.store_file(
+        connection, str(tmpdir.join("gone.py")), str(tmpdir), 1.0, "@", [])
+    assert locator_db.prune(connection, [str(tmpdir)]) == 2
+    paths = [row[2] for row in locator_db.search(connection)]
+    assert paths == [str(kept)]
+    connection.close()
+
+
+def test_batch_committer(connection):
+    committer = locator_db.BatchCommitter(connection, max_files=2,
+                                          max_delay=60)
+    assert not committer.stored()
+    assert committer.stored()
+    assert not committer.stored()
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import sys
+
+import pytest
+
+from ninja_ide.tools import module_index
+
+
+@pytest.fixture
+def site(tmpdir):
+    package = tmpdir.mkdir("pkg")
+    package.join("__init__.py").write("")
+    package.join("sub.py").write("")
+    tmpdir.join("single.py").write("")
+    return tmpdir
+
+
+def test_resolve_modules_and_submodules(site):
+    index = module_index.ModuleIndex([str(site)])
+    assert index.resolve("pkg")
+    assert index.resolve("pkg.sub")
+    assert index.resolve("single")
+    assert not index.resolve("pkg.missing")
+    # Submodules of plain modules can not be checked (os.path)
+    assert index.resolve("single.sub")
+    assert not index.resolve("missing")
+
+
+def test_resolve_builtins():
+    index = module_index.ModuleIndex([], sys.builtin_module_names)
+    assert index.resolve("sys")
+    assert not index.resolve("sys.missing")
+
+
+def test_new_modules_are_found_after_refresh(site):
+    index = module_index.ModuleIndex([str(site)])
+    assert not index.resolve("added")
+    site.join("added.py").write("")
+    # Make sure the folder mtime changes even on coarse filesystems
+    os.utime(str(site), (0, 0))
+    index.refresh(force=True)
+    assert index.resolve("added")
+
+
+def test_resolve_relative_and_extra_paths(site):
+    index = module_index.ModuleIndex([])
+    filename = str(site.join("pkg", "sub.py"))
+    assert index.resolve("sub", level=1, filename=filename)
+    assert index.resolve("single", level=2, filename=filename)
+    assert not index.resolve("other", level=1, filename=filename)
+    assert index.resolve("pkg.sub", extra_paths=[str(site)])
+
+
+def test_find_imports_skips_guarded_imports():
+    source = (
+        "import os, sys\n"
+        "from . import sibling\n"
+        "try:\n"
+        "    import optional\n"
+        "except ImportError:\n"
+        "    optional = None\n"
+    )
+    imports = module_index.find_imports(source)
+    assert imports == [(1, "os", 0), (1, "sys", 0), (2, "", 1)]
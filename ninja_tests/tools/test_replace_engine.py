@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+import codecs
+import os
+import re
+
+import pytest
+
+from ninja_ide.tools import grep_engine
+from ninja_ide.tools import replace_engine
+
+
+def test_replacement():
+    pattern = grep_engine.compile_pattern("load(")
+    # Not a regular expression, the backslash is kept
+    replacement = replace_engine.compile_replacement(r"fetch\1(", pattern)
+    assert replace_engine.preview_line(
+        "x = load(load(1))", pattern, replacement) == (
+        r"x = fetch\1(fetch\1(1))")
+    pattern = grep_engine.compile_pattern(r"(\w+)\(", regex=True)
+    replacement = replace_engine.compile_replacement(
+        r"\1_v2(", pattern, regex=True)
+    assert replace_engine.replace_buffer(
+        b"a(b(1))", pattern, replacement) == (b"a_v2(b_v2(1))", 2)
+    with pytest.raises(re.error):
+        replace_engine.compile_replacement(r"\2", pattern, regex=True)
+
+
+def test_replace_and_undo(tmpdir):
+    changed = tmpdir.join("changed.py")
+    changed.write_binary(b"load()\r\nload\n")
+    os.chmod(str(changed), 0o755)
+    edited = tmpdir.join("edited.py")
+    edited.write_binary(b"load\n")
+    untouched = tmpdir.join("untouched.py")
+    untouched.write_binary(b"other\n")
+    pattern = grep_engine.compile_pattern("load")
+    replacement = replace_engine.compile_replacement("fetch", pattern)
+    journal = replace_engine.ReplaceJournal(str(tmpdir.join("journal")))
+    counts = [replace_engine.replace_file(str(path), pattern, replacement,
+                                          journal)
+              for path in (changed, edited, untouched)]
+    assert counts == [2, 1, 0]
+    assert changed.read_binary() == b"fetch()\r\nfetch\n"
+    assert os.stat(str(changed)).st_mode & 0o777 == 0o755
+    assert sorted(os.listdir(str(tmpdir))) == [
+        "changed.py", "edited.py", "journal", "untouched.py"]
+    # The journal survives the IDE
+    journal = replace_engine.ReplaceJournal(str(tmpdir.join("journal")))
+    assert len(journal) == 2
+    edited.write_binary(b"fetch\nmore\n")
+    assert journal.undo() == ([str(changed)], [str(edited)])
+    assert changed.read_binary() == b"load()\r\nload\n"
+    assert edited.read_binary() == b"fetch\nmore\n"
+    assert not tmpdir.join("journal").exists()
+
+
+def test_replace_keeps_encoding(tmpdir):
+    latin = tmpdir.join("latin.py")
+    latin.write_binary(
+        "# -*- coding: latin-1 -*-\nx = 'año'\n".encode("latin-1"))
+    pattern = grep_engine.compile_pattern("año")
+    replacement = replace_engine.compile_replacement("niño", pattern)
+    assert replace_engine.replace_file(str(latin), pattern, replacement) == 1
+    assert latin.read_binary() == (
+        "# -*- coding: latin-1 -*-\nx = 'niño'\n".encode("latin-1"))
+
+
+@pytest.mark.parametrize("bom, codec", [
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+    (codecs.BOM_UTF32_BE, "utf-32-be"),
+    (codecs.BOM_UTF8, "utf-8"),
+])
+def test_replace_keeps_byte_order_and_bom(tmpdir, bom, codec):
+    path = tmpdir.join("module.py")
+    path.write_binary(bom + "x = 'año'\n".encode(codec))
+    pattern = grep_engine.compile_pattern("año")
+    replacement = replace_engine.compile_replacement("niño", pattern)
+    assert replace_engine.replace_file(str(path), pattern, replacement) == 1
+    assert path.read_binary() == bom + "x = 'niño'\n".encode(codec)
+
+
+def test_replace_non_ascii_ignoring_case():
+    pattern = grep_engine.compile_pattern("ÑAME", case_sensitive=False)
+    replacement = replace_engine.compile_replacement("name", pattern)
+    assert replace_engine.replace_buffer(
+        "ñame = Ñame\n".encode("utf-8"), pattern, replacement) == (
+        b"name = name\n", 2)
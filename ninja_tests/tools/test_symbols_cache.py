@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+from ninja_ide.tools import symbols_cache
+from ninja_ide.tools.symbols_cache import SymbolsCache
+
+
+class Extractor(object):
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return {'classes': {'Foo': {'lineno': 1}}}, {3: ('bar()', 'm')}
+
+
+def test_results_are_cached_by_content_and_options(tmpdir):
+    cache = SymbolsCache(str(tmpdir.join("symbols.db")), 1)
+    extract = Extractor()
+    result = cache.get("class Foo: pass", (False,), extract)
+    assert result == extract()
+    extract.calls = 1
+    # Every caller gets its own copy
+    result[0]['classes'].clear()
+    assert cache.get("class Foo: pass", (False,), extract) == extract()
+    assert extract.calls == 2
+    cache.get("class Foo: pass", (True,), extract)
+    cache.get("class Bar: pass", (False,), extract)
+    assert extract.calls == 4
+
+
+def test_records_survive_on_disk_per_version(tmpdir):
+    path = str(tmpdir.join("symbols.db"))
+    extract = Extractor()
+    cache = SymbolsCache(path, 1)
+    cache.get("x = 1", (), extract)
+    # Written by the writer thread
+    cache.flush()
+    SymbolsCache(path, 1).get("x = 1", (), extract)
+    assert extract.calls == 1
+    SymbolsCache(path, 2).get("x = 1", (), extract)
+    assert extract.calls == 2
+
+
+def test_memory_only():
+    cache = SymbolsCache(None, 1)
+    extract = Extractor()
+    cache.get("x = 1", (), extract)
+    cache.get("x = 1", (), extract)
+    assert extract.calls == 1
+
+
+def test_prune_keeps_the_records_used(tmpdir, monkeypatch):
+    monkeypatch.setattr(symbols_cache, "MAX_RECORDS", 2)
+    monkeypatch.setattr(symbols_cache, "PRUNE_EVERY", 1)
+    monkeypatch.setattr(symbols_cache, "MEMORY_SIZE", 0)
+    path = str(tmpdir.join("symbols.db"))
+    extract = Extractor()
+    cache = SymbolsCache(path, 1)
+    cache.get("a = 1", (), extract)
+    cache.flush()
+    cache.get("b = 1", (), extract)
+    cache.flush()
+    # Read again, it is the most recently used
+    cache.get("a = 1", (), extract)
+    cache.flush()
+    cache.get("c = 1", (), extract)
+    cache.flush()
+    assert extract.calls == 3
+    cache = SymbolsCache(path, 1)
+    cache.get("a = 1", (), extract)
+    cache.get("c = 1", (), extract)
+    assert extract.calls == 3
+    cache.get("b = 1", (), extract)
+    assert extract.calls == 4
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+import os
+
+from ninja_ide.tools import grep_engine
+from ninja_ide.tools import trigram_index
+
+
+def test_literals():
+    pattern = grep_engine.compile_pattern(r"def (load)\(\w+\):", regex=True)
+    assert pattern.literals == [b"def load(", b"):"]
+    pattern = grep_engine.compile_pattern("load|fetch", regex=True)
+    assert pattern.literals == []
+
+
+def test_candidates(tmpdir):
+    files = {
+        "loader.py": b"def Load(path):\n    pass\n",
+        "other.py": b"import os\n",
+        "binary.py": b"load\0",
+        "new.py": b"",
+    }
+    for name, data in files.items():
+        tmpdir.join(name).write_binary(data)
+    paths = sorted(str(tmpdir.join(name)) for name in files)
+    index = trigram_index.TrigramIndex(str(tmpdir.join("index", "t.db")))
+    for path in paths:
+        if not path.endswith("new.py"):
+            index.store(*trigram_index.extract(path))
+    index.commit()
+    # Not indexed, or binary: always scanned
+    expected = [path for path in paths
+                if not path.endswith(("other.py", "loader.py"))]
+    assert index.candidates([b"zzz"], paths) == expected
+    # The index ignores case
+    assert index.candidates([b"def load", b"th)"], paths) == sorted(
+        expected + [str(tmpdir.join("loader.py"))])
+    # Without trigrams every file is a candidate
+    assert index.candidates([b"os"], paths) == paths
+    other = tmpdir.join("other.py")
+    other.write_binary(b"zzz\n")
+    os.utime(str(other), (1, 1))
+    assert str(other) in index.candidates([b"zzz"], paths)
+    index.store(*trigram_index.extract(str(other)))
+    index.remove(str(tmpdir.join("loader.py")))
+    assert index.files() == {
+        str(tmpdir.join(name)): os.stat(str(tmpdir.join(name))).st_mtime
+        for name in ("other.py", "binary.py")}
+    # Found, binary and not indexed
+    assert index.candidates([b"zzz"], paths) == paths
+    index.close()